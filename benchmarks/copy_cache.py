@@ -0,0 +1,128 @@
+"""
+Compares page cache residency and throughput of CopyEngine copies with and without the 'dontneed' cache mode.
+
+A hot file (standing in for a file being streamed) is read into page cache, then a large file is copied.
+Reports throughput of the copy and how much of the hot file, source and destination remain cached.
+For meaningful results the copied file should be large relative to free memory, and source/destination
+should be on different filesystems (e.g. --source-dir on the RAID, --dest-dir on staging).
+
+Usage:
+    python -m benchmarks.copy_cache --source-dir /mnt/RAID/bench --dest-dir /mnt/staging/bench --size-mib 4096
+"""
+import argparse
+import ctypes
+import logging
+import mmap
+import os
+import time
+from pathlib import Path
+
+from manager.copy_engine import CopyEngine
+
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_libc.mmap.restype = ctypes.c_void_p
+_libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_long]
+_libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+_libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte)]
+
+MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+def get_cache_residency(path: Path) -> float:
+    """
+    Returns fraction of file's pages in page cache, using mincore on a mapping of the file
+    """
+    size = path.stat().st_size
+    if not size:
+        return 0.0
+
+    with open(path, 'rb') as file:
+        address = _libc.mmap(None, size, mmap.PROT_READ, mmap.MAP_SHARED, file.fileno(), 0)
+        if address == MAP_FAILED:
+            raise OSError(ctypes.get_errno(), f'mmap failed: {path}')
+        try:
+            num_pages = (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+            pages = (ctypes.c_ubyte * num_pages)()
+            if _libc.mincore(address, size, pages) != 0:
+                raise OSError(ctypes.get_errno(), f'mincore failed: {path}')
+            return sum(page & 1 for page in pages) / num_pages
+        finally:
+            _libc.munmap(address, size)
+
+
+def create_file(path: Path, size: int) -> None:
+    block = os.urandom(2**20)
+    with open(path, 'wb') as file:
+        for _ in range(size // len(block)):
+            file.write(block)
+        file.write(block[:size % len(block)])
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def evict(path: Path) -> None:
+    with open(path, 'rb') as file:
+        os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def warm(path: Path) -> None:
+    with open(path, 'rb') as file:
+        while file.read(2**24):
+            pass
+
+
+def run(source_dir: Path, dest_dir: Path, size: int, hot_size: int, cache_mode: str) -> dict[str, float]:
+    source = source_dir / 'copy_cache_source.bin'
+    hot = source_dir / 'copy_cache_hot.bin'
+    dest = dest_dir / 'copy_cache_dest.bin'
+
+    for path in (source, hot):
+        if not path.exists() or path.stat().st_size != (size if path == source else hot_size):
+            create_file(path, size if path == source else hot_size)
+    dest.unlink(missing_ok=True)
+
+    # Source starts cold, hot file starts fully cached
+    evict(source)
+    warm(hot)
+    hot_before = get_cache_residency(hot)
+
+    start = time.monotonic()
+    CopyEngine.copy(source, dest, cache_mode=cache_mode)
+    elapsed = time.monotonic() - start
+
+    result = {
+        'throughput_mib_s': size / 2**20 / elapsed,
+        'hot_cached_before': hot_before,
+        'hot_cached_after': get_cache_residency(hot),
+        'source_cached': get_cache_residency(source),
+        'dest_cached': get_cache_residency(dest),
+    }
+    dest.unlink()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--source-dir', type=Path, required=True)
+    parser.add_argument('--dest-dir', type=Path, required=True)
+    parser.add_argument('--size-mib', type=int, default=2048, help='size of copied file')
+    parser.add_argument('--hot-mib', type=int, default=256, help='size of file kept hot in page cache')
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    # Copy logs are not part of the benchmark
+    logging.disable(logging.CRITICAL)
+
+    print(f'{"mode":<10} {"MiB/s":>8} {"hot before":>11} {"hot after":>10} {"source":>8} {"dest":>8}')
+    for cache_mode in ('default', 'dontneed'):
+        for _ in range(args.runs):
+            result = run(args.source_dir, args.dest_dir, args.size_mib * 2**20, args.hot_mib * 2**20, cache_mode)
+            print(
+                f'{cache_mode:<10} {result["throughput_mib_s"]:>8.1f} {result["hot_cached_before"]:>11.0%} '
+                f'{result["hot_cached_after"]:>10.0%} {result["source_cached"]:>8.0%} {result["dest_cached"]:>8.0%}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,5 @@
 from tree.node import Node
+from models.child_stats import ChildStats
 from logger.logger import Logger
 
 
@@ -96,15 +97,13 @@ class NodeClassifier:
         cls._logger.debug(f"Episode number: {node.media_metadata.episode}")
         cls._logger.debug(f"Extras patterns: {node.media_metadata.extras_patterns}")
         
-        # Count children types
-        num_video = cls._get_num_video_files(node.children_nodes)
-        num_subtitle = cls._get_num_subtitle_files(node.children_nodes)
-        num_season = cls._get_num_season_dir(node.children_nodes)
+        # Children are counted once, bottom-up, when the tree is parsed
+        child_stats = node.get_child_stats()
         
         cls._logger.debug(f"Children: {len(node.children_nodes)} total")
-        cls._logger.debug(f"Video files: {num_video}")
-        cls._logger.debug(f"Subtitle files: {num_subtitle}")
-        cls._logger.debug(f"Season directories: {num_season}")
+        cls._logger.debug(f"Video files: {child_stats.num_video}")
+        cls._logger.debug(f"Subtitle files: {child_stats.num_subtitle}")
+        cls._logger.debug(f"Season directories: {child_stats.num_season_dir}")
 
         # Check directory types in order of specificity
         if cls._is_series_dir(node):
@@ -258,9 +257,9 @@ class NodeClassifier:
         return bool(
                 node.path_metadata.is_dir and
                 node.media_metadata.title and
-                cls._get_num_video_files(node.children_nodes) == 0 and
-                cls._get_num_subtitle_files(node.children_nodes) == 0 and
-                cls._get_num_season_dir(node.children_nodes) >= 1
+                node.get_child_stats().num_video == 0 and
+                node.get_child_stats().num_subtitle == 0 and
+                node.get_child_stats().num_season_dir >= 1
                 )
 
     @classmethod
@@ -268,12 +267,7 @@ class NodeClassifier:
         if not node or not node.media_metadata or not node.path_metadata:
             raise ValueError('Media metadata or path metadata not extracted for node')
 
-        return bool(
-                node.path_metadata.is_dir and
-                (node.media_metadata.season_patterns or node.media_metadata.season) and
-                not node.media_metadata.episode and
-                cls._get_num_video_files(node.children_nodes) >= 1
-                )
+        return ChildStats.is_season_dir(node)
 
     @classmethod
     def _is_subtitle_dir(cls, node: Node) -> bool:
@@ -282,8 +276,8 @@ class NodeClassifier:
 
         return bool(
                 node.path_metadata.is_dir and
-                cls._get_num_video_files(node.children_nodes) == 0 and
-                cls._get_num_subtitle_files(node.children_nodes) >= 1
+                node.get_child_stats().num_video == 0 and
+                node.get_child_stats().num_subtitle >= 1
                 )
 
     @classmethod
@@ -294,7 +288,7 @@ class NodeClassifier:
         return bool(
                 node.path_metadata.is_dir and
                 node.media_metadata.extras_patterns and
-                cls._get_num_video_files(node.children_nodes) >= 1
+                node.get_child_stats().num_video >= 1
                 )
 
     @classmethod
@@ -305,8 +299,8 @@ class NodeClassifier:
         return bool(
                 node.path_metadata.is_dir and
                 node.media_metadata.title and
-                cls._get_num_video_files(node.children_nodes) == 1 and
-                cls._get_num_season_dir(node.children_nodes) == 0
+                node.get_child_stats().num_video == 1 and
+                node.get_child_stats().num_season_dir == 0
                 )
 
     @classmethod
@@ -328,33 +322,3 @@ class NodeClassifier:
                 node.path_metadata.is_file and
                 node.path_metadata.format_type == 'SUBTITLE'
                 )
-
-    """
-    _get_num_* helper functions
-    """
-    @classmethod
-    def _get_num_video_files(cls, nodes: list[Node]) -> int:
-        total_video_files = 0
-        for node in nodes:
-            if cls._is_video_file(node):
-                total_video_files += 1
-        return total_video_files
-
-    @classmethod
-    def _get_num_subtitle_files(cls, nodes: list[Node]) -> int:
-        total_subtitle_files = 0
-        for node in nodes:
-            if cls._is_subtitle_file(node):
-                total_subtitle_files += 1
-        return total_subtitle_files
-
-    @classmethod
-    def _get_num_season_dir(cls, nodes: list[Node]) -> int:
-        """
-        Returns number of directories with season pattern and no episode pattern
-        """
-        total_season_dir = 0
-        for node in nodes:
-            if cls._is_season_dir(node):
-                total_season_dir += 1
-        return total_season_dir
@@ -0,0 +1,151 @@
+from pathlib import Path
+from typing import BinaryIO, Union
+
+# Decoded value: integers, byte strings, lists and dicts with byte string keys
+BencodeValue = Union[int, bytes, list['BencodeValue'], dict[bytes, 'BencodeValue']]
+# Dict keys leading to a value, e.g. (b'info', b'name')
+KeyPath = tuple[bytes, ...]
+
+_CHUNK_SIZE = 64 * 1024
+# Nested lists/dicts deeper than this are rejected rather than exhausting the stack
+_MAX_DEPTH = 256
+_DIGITS = b'0123456789'
+
+
+class BencodeError(ValueError):
+    pass
+
+
+class BencodeDecoder:
+    """
+    Decodes one bencoded value from a binary stream, reading it in chunks instead of loading the whole file.
+    Values at key paths in skip (keys of nested dicts from the top-level dict, list items keep their list's path)
+    are read past without being decoded or kept, e.g. (b'info', b'pieces') of a .torrent file, which holds
+    20 bytes for every piece of the payload.
+    """
+
+    def __init__(self, stream: BinaryIO, skip: frozenset[KeyPath] = frozenset()) -> None:
+        self._stream = stream
+        self._skip = skip
+        self._buffer = b''
+        self._position = 0
+
+    @classmethod
+    def decode_file(cls, path: Path, skip: frozenset[KeyPath] = frozenset()) -> BencodeValue:
+        with open(path, 'rb') as file:
+            return cls(file, skip).decode()
+
+    def decode(self) -> BencodeValue:
+        """
+        Raises:
+            BencodeError: If the stream does not start with a valid bencoded value
+        """
+        return self._decode_value((), 0, keep=True)
+
+    def _decode_value(self, key_path: KeyPath, depth: int, keep: bool) -> BencodeValue | None:
+        """
+        Decodes next value, or only reads past it if not keep
+        """
+        if depth > _MAX_DEPTH:
+            raise BencodeError('Bencoded value nested too deeply')
+
+        token = self._peek()
+        if token == b'i':
+            self._position += 1
+            value = self._read_integer(b'e')
+            return value if keep else None
+
+        if token == b'l':
+            self._position += 1
+            items = []
+            while self._peek() != b'e':
+                item = self._decode_value(key_path, depth + 1, keep)
+                if keep:
+                    items.append(item)
+            self._position += 1
+            return items if keep else None
+
+        if token == b'd':
+            self._position += 1
+            entries = {}
+            while self._peek() != b'e':
+                key = self._read_string(keep=True)
+                value_path = key_path + (key,)
+                keep_value = keep and value_path not in self._skip
+                value = self._decode_value(value_path, depth + 1, keep_value)
+                if keep_value:
+                    entries[key] = value
+            self._position += 1
+            return entries if keep else None
+
+        if token and token in _DIGITS:
+            return self._read_string(keep)
+
+        raise BencodeError(f'Unexpected token {token!r}' if token else 'Unexpected end of data')
+
+    def _read_string(self, keep: bool) -> bytes | None:
+        length = self._read_integer(b':')
+        if length < 0:
+            raise BencodeError(f'Negative string length {length}')
+        if keep:
+            return self._read(length)
+        self._skip_bytes(length)
+        return None
+
+    def _read_integer(self, terminator: bytes) -> int:
+        digits = bytearray()
+        while (byte := self._read(1)) != terminator:
+            if not byte:
+                raise BencodeError('Unexpected end of data')
+            digits += byte
+            if len(digits) > 32:
+                raise BencodeError('Integer too long')
+        try:
+            return int(digits)
+        except ValueError:
+            raise BencodeError(f'Invalid integer {bytes(digits)!r}') from None
+
+    def _peek(self) -> bytes:
+        if self._position >= len(self._buffer):
+            self._fill()
+        return self._buffer[self._position:self._position + 1]
+
+    def _read(self, length: int) -> bytes:
+        end = self._position + length
+        if end > len(self._buffer) and length <= _CHUNK_SIZE:
+            self._fill()
+            end = length
+        if end > len(self._buffer):
+            # Large strings are read directly after the buffered part
+            data = self._buffer[self._position:] + self._stream.read(end - len(self._buffer))
+            self._buffer = b''
+            self._position = 0
+            if len(data) < length:
+                raise BencodeError('Unexpected end of data')
+            return data
+        data = self._buffer[self._position:end]
+        self._position = end
+        return data
+
+    def _skip_bytes(self, length: int) -> None:
+        buffered = len(self._buffer) - self._position
+        if length <= buffered:
+            self._position += length
+            return
+
+        remaining = length - buffered
+        self._buffer = b''
+        self._position = 0
+        if self._stream.seekable():
+            # Truncated data is noticed by the next read
+            self._stream.seek(remaining, 1)
+            return
+        while remaining:
+            skipped = len(self._stream.read(min(remaining, _CHUNK_SIZE)))
+            if not skipped:
+                raise BencodeError('Unexpected end of data')
+            remaining -= skipped
+
+    def _fill(self) -> None:
+        self._buffer = self._buffer[self._position:] + self._stream.read(_CHUNK_SIZE)
+        self._position = 0
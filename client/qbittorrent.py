@@ -0,0 +1,227 @@
+import os
+from pathlib import Path
+from client.bencode import BencodeDecoder, BencodeError, BencodeValue
+from models.client_torrent import ClientTorrent
+
+# Peer lists and hashes are never needed, and are the bulk of resume data and metainfo
+_RESUME_SKIP = frozenset({
+    (b'peers',), (b'peers6',), (b'banned_peers',), (b'banned_peers6',),
+    (b'trees',), (b'unfinished',), (b'info', b'pieces'),
+})
+_METAINFO_SKIP = frozenset({(b'info', b'pieces'), (b'piece layers',)})
+
+# (path components relative to the torrent's name, length, offset in the torrent's pieces, is padding)
+_FileEntry = tuple[tuple[str, ...], int, int, bool]
+
+# (mtime_ns, size) of the .fastresume and .torrent files a torrent was read from
+_FileKey = tuple[tuple[int, int], tuple[int, int] | None]
+
+
+class ClientTorrents:
+    """
+    Torrents of the client by their top-level entries
+    """
+
+    def __init__(self, torrents: list[ClientTorrent]) -> None:
+        self._by_path: dict[Path, ClientTorrent] = {}
+        self._by_name: dict[str, list[ClientTorrent]] = {}
+        for torrent in torrents:
+            for content_path in torrent.content_paths:
+                self._by_path[content_path] = torrent
+                self._by_name.setdefault(content_path.name, []).append(torrent)
+
+    def find(self, path: Path) -> ClientTorrent | None:
+        """
+        Returns torrent downloaded to top-level entry path. Falls back to matching the entry's name,
+        since the client may see the download path under another path (e.g. in a container);
+        of several torrents with that name an incomplete one is returned, so it is not staged early.
+        """
+        torrent = self._by_path.get(path)
+        if torrent is not None:
+            return torrent
+
+        candidates = self._by_name.get(path.name)
+        if not candidates:
+            return None
+        return next((torrent for torrent in candidates if not torrent.complete), candidates[0])
+
+    def __len__(self) -> int:
+        return len({id(torrent) for torrent in self._by_path.values()})
+
+
+class QBittorrentBackup:
+    """
+    Reads the torrents of qBittorrent's BT_backup directory, where each torrent has an <info hash>.fastresume
+    (libtorrent resume data: save path, downloaded pieces, file priorities and renamed files) and,
+    once its metadata is known, an <info hash>.torrent (metainfo: names, sizes and piece length).
+    Completion is read from the downloaded pieces, payload files are never stat'ed or hashed.
+    Files are parsed again only when their mtime or size changed since the previous read.
+    """
+
+    def __init__(self, bt_backup_path: Path) -> None:
+        self._bt_backup_path = bt_backup_path
+        self._cache: dict[str, tuple[_FileKey, ClientTorrent]] = {}
+        self.errors: list[str] = [] # Files that could not be read by the last read
+
+    def read(self) -> ClientTorrents:
+        """
+        Raises:
+            OSError: If BT_backup directory can not be listed
+        """
+        stats: dict[str, os.stat_result] = {}
+        with os.scandir(self._bt_backup_path) as iterator:
+            for entry in iterator:
+                if entry.name.endswith(('.fastresume', '.torrent')):
+                    try:
+                        stats[entry.name] = entry.stat()
+                    except OSError:
+                        continue
+
+        self.errors = []
+        cache: dict[str, tuple[_FileKey, ClientTorrent]] = {}
+        for name, resume_stat in stats.items():
+            info_hash, _, suffix = name.rpartition('.')
+            if suffix != 'fastresume':
+                continue
+
+            metainfo_stat = stats.get(info_hash + '.torrent')
+            key: _FileKey = (
+                (resume_stat.st_mtime_ns, resume_stat.st_size),
+                (metainfo_stat.st_mtime_ns, metainfo_stat.st_size) if metainfo_stat else None,
+            )
+            cached = self._cache.get(info_hash)
+            if cached is not None and cached[0] == key:
+                cache[info_hash] = cached
+                continue
+
+            try:
+                torrent = self.parse(
+                    info_hash,
+                    self._bt_backup_path / name,
+                    self._bt_backup_path / (info_hash + '.torrent') if metainfo_stat else None,
+                )
+            except (OSError, BencodeError, KeyError, TypeError, ValueError) as e:
+                self.errors.append(f'{self._bt_backup_path / name}: {e}')
+                continue
+            cache[info_hash] = (key, torrent)
+
+        self._cache = cache
+        return ClientTorrents([torrent for _, torrent in cache.values()])
+
+    @classmethod
+    def parse(cls, info_hash: str, resume_path: Path, metainfo_path: Path | None) -> ClientTorrent:
+        """
+        Raises:
+            BencodeError, KeyError, TypeError: If resume data or metainfo is malformed
+        """
+        resume = BencodeDecoder.decode_file(resume_path, _RESUME_SKIP)
+        if not isinstance(resume, dict):
+            raise BencodeError('Resume data is not a dictionary')
+
+        save_path = Path(os.fsdecode(resume.get(b'save_path', b'')))
+
+        # Metainfo is embedded in resume data by newer libtorrent versions
+        info = resume.get(b'info')
+        if not isinstance(info, dict) and metainfo_path is not None:
+            metainfo = BencodeDecoder.decode_file(metainfo_path, _METAINFO_SKIP)
+            info = metainfo.get(b'info') if isinstance(metainfo, dict) else None
+
+        if not isinstance(info, dict):
+            # Magnet link still fetching metadata, nothing downloaded yet
+            name = os.fsdecode(resume.get(b'name') or resume.get(b'qBt-name') or b'')
+            return ClientTorrent(info_hash, name, save_path, [save_path / name] if name else [], [], False)
+
+        name = os.fsdecode(info.get(b'name.utf-8') or info[b'name'])
+        piece_length = info[b'piece length']
+        entries = cls._get_file_entries(info, piece_length)
+        priorities = resume.get(b'file_priority') or []
+        mapped_files = resume.get(b'mapped_files') or []
+
+        content_paths: dict[Path, None] = {}
+        files: list[tuple[Path, int]] = []
+        wanted: list[_FileEntry] = []
+        for index, entry in enumerate(entries):
+            parts, length, _, is_pad = entry
+            if is_pad:
+                continue
+
+            # Renamed files (and torrents downloaded without their top folder) are listed relative to save path
+            mapped = mapped_files[index] if index < len(mapped_files) else b''
+            path = save_path / os.fsdecode(mapped) if mapped else save_path.joinpath(name, *parts)
+            relative = path.relative_to(save_path) if path.is_relative_to(save_path) else None
+            content_paths[save_path / relative.parts[0] if relative and relative.parts else path] = None
+
+            # Unset priorities default to normal
+            if index >= len(priorities) or priorities[index] > 0:
+                files.append((path, length))
+                wanted.append(entry)
+
+        return ClientTorrent(
+            info_hash,
+            name,
+            save_path,
+            list(content_paths),
+            files,
+            cls._is_complete(resume, entries, wanted, piece_length),
+        )
+
+    @classmethod
+    def _get_file_entries(cls, info: dict[bytes, BencodeValue], piece_length: int) -> list[_FileEntry]:
+        """
+        Returns files of metainfo in piece order, from the v1 file list (hybrid torrents included) or the v2 file tree
+        """
+        if b'files' in info:
+            entries: list[_FileEntry] = []
+            offset = 0
+            for file in info[b'files']:
+                parts = tuple(os.fsdecode(part) for part in file.get(b'path.utf-8') or file[b'path'])
+                length = file[b'length']
+                entries.append((parts, length, offset, b'p' in file.get(b'attr', b'')))
+                offset += length
+            return entries
+
+        if b'length' in info:
+            return [((), info[b'length'], 0, False)]
+
+        if b'file tree' in info:
+            entries = []
+            offset = 0
+            # Depth first in key order, each file of a v2 torrent starts on a piece boundary
+            stack: list[tuple[tuple[str, ...], dict[bytes, BencodeValue]]] = [((), info[b'file tree'])]
+            while stack:
+                parts, tree = stack.pop()
+                if b'' in tree:
+                    length = tree[b''][b'length']
+                    entries.append((parts, length, offset, False))
+                    offset += -(-length // piece_length) * piece_length
+                    continue
+                stack.extend((parts + (os.fsdecode(key),), tree[key]) for key in sorted(tree, reverse=True))
+
+            # Single file torrents list the file under the torrent's name
+            if len(entries) == 1 and len(entries[0][0]) == 1:
+                entries = [((), entries[0][1], 0, False)]
+            return entries
+
+        raise KeyError('Metainfo has no files')
+
+    @classmethod
+    def _is_complete(cls, resume: dict[bytes, BencodeValue], entries: list[_FileEntry], wanted: list[_FileEntry], piece_length: int) -> bool:
+        """
+        Returns whether every piece of the wanted files is downloaded
+        """
+        total = max((offset + length for _, length, offset, _ in entries), default=0)
+        num_pieces = -(-total // piece_length)
+        pieces = resume.get(b'pieces')
+
+        # One byte per piece, lowest bit set if downloaded
+        if isinstance(pieces, bytes) and len(pieces) == num_pieces:
+            for _, length, offset, _ in wanted:
+                if not length:
+                    continue
+                first, last = offset // piece_length, (offset + length - 1) // piece_length
+                if not all(piece & 1 for piece in pieces[first:last + 1]):
+                    return False
+            return True
+
+        # Resume data without a piece map, set once the torrent finished downloading
+        return bool(resume.get(b'completed_time'))
@@ -7,3 +7,71 @@ MEDIA_PATH = os.getenv('MEDIA_SERVER_PATH', '/mnt/RAID/jelly/media')
 
 # Dry run mode - set to 'true' to only log actions without moving files
 DRY_RUN = os.getenv('TORRENT_MANAGER_DRY_RUN', 'true').lower() == 'true'
+
+# Max number of sanitized names kept in each extractor's metadata cache, 0 disables caching
+EXTRACTION_CACHE_SIZE = int(os.getenv('TORRENT_MANAGER_EXTRACTION_CACHE_SIZE', '4096'))
+
+# Batches of more names than the threshold are extracted across a process pool
+EXTRACTION_PROCESS_THRESHOLD = int(os.getenv('TORRENT_MANAGER_EXTRACTION_PROCESS_THRESHOLD', '512'))
+# Number of extraction processes, 0 uses all cores
+EXTRACTION_PROCESS_WORKERS = int(os.getenv('TORRENT_MANAGER_EXTRACTION_PROCESS_WORKERS', '0'))
+
+# Parser used to build node trees: 'scandir' (file types from directory entries, iterative),
+# 'threaded' (scandir with sibling directories listed concurrently, for NFS/SMB mounts) or 'walk' (legacy, recursive)
+PARSER_MODE = os.getenv('TORRENT_MANAGER_PARSER_MODE', 'scandir').lower()
+
+# Threads listing directories in threaded parser mode, shared by all torrents
+PARSER_WALK_WORKERS = int(os.getenv('TORRENT_MANAGER_PARSER_WALK_WORKERS', '8'))
+# Max directory listings of a single torrent in flight at once in threaded parser mode
+PARSER_WALK_TORRENT_CAP = int(os.getenv('TORRENT_MANAGER_PARSER_WALK_TORRENT_CAP', '4'))
+# Listings and metadata of parsed torrents are saved (MANAGER_PATH/snapshots) so directories unchanged since
+# the last parse are not listed or extracted again (scandir and threaded parser modes)
+PARSER_SNAPSHOTS = os.getenv('TORRENT_MANAGER_PARSER_SNAPSHOTS', 'true').lower() == 'true'
+
+# Garbage collection while parsing and classifying node trees: 'tuned' (objects alive at startup are frozen
+# out of collections and the young generation threshold is raised), 'disabled' (collector paused) or 'default'
+GC_MODE = os.getenv('TORRENT_MANAGER_GC_MODE', 'tuned').lower()
+# Young generation threshold used in tuned GC mode
+GC_TUNED_THRESHOLD = int(os.getenv('TORRENT_MANAGER_GC_TUNED_THRESHOLD', '50000'))
+
+# Torrents processed concurrently, 1 processes torrents one at a time
+# (concurrently processed torrents extract metadata in-process, see EXTRACTION_PROCESS_THRESHOLD)
+TORRENT_WORKERS = int(os.getenv('TORRENT_MANAGER_TORRENT_WORKERS', '1'))
+
+# Cross-device moves (copies) running at once between each pair of source and destination devices,
+# moves within one device are renames and run immediately
+MOVE_DEVICE_CONCURRENCY = int(os.getenv('TORRENT_MANAGER_MOVE_DEVICE_CONCURRENCY', '2'))
+
+# Bytes copied per system call when copying files across filesystems
+COPY_CHUNK_SIZE = int(os.getenv('TORRENT_MANAGER_COPY_CHUNK_SIZE', str(64 * 2**20)))
+# Seconds between progress logs of a file copy
+COPY_PROGRESS_INTERVAL = float(os.getenv('TORRENT_MANAGER_COPY_PROGRESS_INTERVAL', '10'))
+# Page cache use of copies: 'default' or 'dontneed' (copied pages are dropped as the copy progresses,
+# so large copies do not evict files being streamed)
+COPY_CACHE_MODE = os.getenv('TORRENT_MANAGER_COPY_CACHE_MODE', 'default').lower()
+# I/O priority of copying threads: 'default', 'low' (lowest best-effort level) or 'idle' (only uses idle disk time)
+COPY_IO_PRIORITY = os.getenv('TORRENT_MANAGER_COPY_IO_PRIORITY', 'default').lower()
+# Bytes per second shared by all copies, with optional K/M/G suffix (decimal, 50M = 50 MB/s), 0 is unlimited
+COPY_BANDWIDTH_LIMIT = os.getenv('TORRENT_MANAGER_COPY_BANDWIDTH_LIMIT', '0')
+# Limits by local time of day overriding COPY_BANDWIDTH_LIMIT, comma separated 'HH:MM-HH:MM=rate' windows,
+# e.g. '18:00-23:00=50M,23:00-07:00=0' (50 MB/s in the evening, unlimited overnight)
+COPY_BANDWIDTH_SCHEDULE = os.getenv('TORRENT_MANAGER_COPY_BANDWIDTH_SCHEDULE', '')
+
+# How files are staged: 'move' (files are moved out of the download path) or 'link' (files are hardlinked,
+# or copied across devices, so originals keep seeding, originals are removed once removed from the client)
+STAGING_MODE = os.getenv('TORRENT_MANAGER_STAGING_MODE', 'move').lower()
+# qBittorrent BT_backup directory, used to skip torrents still downloading, and in link mode to find torrents removed from the client
+QBITTORRENT_BT_BACKUP_PATH = os.getenv('QBITTORRENT_BT_BACKUP_PATH', '')
+
+# 'true' records outcomes of processed torrents in a ledger (MANAGER_PATH/ledger.sqlite3), torrents whose
+# top-level entry is unchanged since they were recorded are skipped. Files changing deeper in a directory torrent
+# do not change its top-level entry, only enable if torrents are complete when they appear in the download path
+LEDGER_ENABLED = os.getenv('TORRENT_MANAGER_LEDGER', 'false').lower() == 'true'
+
+# Daemon mode (run.py --daemon): seconds without inotify events in a torrent before it is processed,
+# so torrents still being written or moved in are not staged half complete
+WATCH_QUIET_PERIOD = float(os.getenv('TORRENT_MANAGER_WATCH_QUIET_PERIOD', '60'))
+
+# Torrents still downloading are planned from their metainfo (needs QBITTORRENT_BT_BACKUP_PATH), plans are saved
+# (MANAGER_PATH/plans) so a torrent is staged without parsing or classifying it once complete
+PLAN_AHEAD = os.getenv('TORRENT_MANAGER_PLAN_AHEAD', 'true').lower() == 'true'
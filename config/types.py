@@ -27,3 +27,9 @@ NodeType = DirectoryType | FileType | UnknownType
 #TODO, Audio files currently disabled
 FormatType = Literal['VIDEO', 'SUBTITLE'] | UnknownType
 
+
+# Reason a move plan could not be built for a torrent
+PlanFailure = Literal['VALIDATION', 'PROCESSING']
+
+# Outcome of processing a torrent, same as the run stats it is counted in
+TorrentOutcome = Literal['processed', 'failed_validation', 'failed_processing', 'skipped', 'already_staged']
@@ -1,11 +1,17 @@
 import re
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Match, Any, Dict 
+from typing import Any, Callable, Dict 
 from config.constants import (
     VIDEO_EXTENSIONS,
     SUBTITLE_EXTENSIONS,
-    AUDIO_EXTENSIONS
     )
+from config.settings import EXTRACTION_PROCESS_THRESHOLD, EXTRACTION_PROCESS_WORKERS, TORRENT_WORKERS
+from models.sanitized_name import SanitizedName
+from extractor.metadata_cache import MetadataCache
+from config.types import FormatType
 from logger.logger import Logger
 
 
@@ -15,6 +21,16 @@ Contains base extractor helper functions to be used by all extractors
 class BaseExtractor:
     
     _logger: Logger | None = None
+    # Extractors define their own cache of extracted metadata
+    _cache: MetadataCache | None = None
+
+    # Suffix index of known extensions (one or more '.' separated parts) -> format type
+    # TODO Audio files currently disabled, add AUDIO_EXTENSIONS when enabled
+    _extension_index: Dict[str, FormatType] = {
+        **{ext: 'SUBTITLE' for ext in SUBTITLE_EXTENSIONS},
+        **{ext: 'VIDEO' for ext in VIDEO_EXTENSIONS},
+    }
+    _max_extension_parts: int = max(len(ext.split('.')) for ext in _extension_index)
 
     @classmethod
     def _get_logger(cls) -> Logger:
@@ -22,6 +38,15 @@ class BaseExtractor:
             cls._logger = Logger.get_logger()
         return cls._logger
 
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, int | float]:
+        """
+        Returns size, capacity, hits, misses, evictions and hit rate of extractor's metadata cache
+        """
+        if cls._cache is None:
+            return {}
+        return cls._cache.get_stats()
+
     """
     Specific reusable helper functions
     """
@@ -43,147 +68,61 @@ class BaseExtractor:
         return None
 
     @classmethod
-    def _get_sanitized_path_parts(cls, path: Path) -> list[str]:
-        sanitized_name = cls._get_sanitized_path(path)
-        if sanitized_name:
-            parts = sanitized_name.split('.')
-            cls._get_logger().debug(f'Sanitized path parts: {parts}')
-            return parts
-
-        return []
-
-    @classmethod
-    def _get_sanitized_stem_parts(cls, path: Path) -> list[str]:
+    def sanitize(cls, path: Path) -> SanitizedName:
+        """
+        Sanitizes path name and detects its extension, result is shared by all extractors of a node
+        """
         sanitized_name = cls._get_sanitized_path(path)
+        name = SanitizedName(sanitized_name, sanitized_name.split('.') if sanitized_name else [])
 
-        parts = []
-        if sanitized_name:
-            parts = sanitized_name.split('.')
-
-        for i, _ in enumerate(parts):
-            if (match := cls._is_ext(i, parts)):
-                num_ext_parts = len(match.group(0).split('.'))
-                parts = parts[:num_ext_parts * -1]
+        if (match := cls._match_ext(name.parts)):
+            name.format_type, name.ext = match
+            name.stem_parts = name.parts[:len(name.ext.split('.')) * -1]
+            cls._get_logger().debug(f'Matched {name.format_type.lower()} extension: {name.ext}')
 
-        if parts:
-            cls._get_logger().debug(f'Sanitized stem parts: {parts}')
-        return parts
+        return name
 
     @classmethod
-    def _is_ext(cls, index: int, parts: list[str]) -> Match[str] | None:
-
-        if (match := cls._is_video_ext(index, parts)):
-            return match
-        if (match := cls._is_subtitle_ext(index, parts)):
-            return match
-        #if (match := cls._is_audio_ext(index, parts)): # TODO add ext
-        #    return match
+    def _match_ext(cls, parts: list[str]) -> tuple[FormatType, str] | None:
+        """
+        Looks up the last part(s) of filename in the extension suffix index, longest extension wins
+        Returns:
+            (format type, extension) if known extension, None otherwise
+        """
+        for num_ext_parts in range(min(cls._max_extension_parts, len(parts)), 0, -1):
+            ext = '.'.join(parts[-num_ext_parts:])
+            if (format_type := cls._extension_index.get(ext)):
+                return format_type, ext
 
         return None
 
-    @classmethod
-    def _is_video_ext(cls, index: int, parts: list[str]) -> Match[str] | None:
-        for pattern in VIDEO_EXTENSIONS:
-            if cls._is_matching_tail_len(pattern, index, parts) and (match := cls._match_regex(pattern, index, parts)):
-                cls._get_logger().debug(f'Matched video extension: {pattern}')
-                return match
-
-        return None
 
     @classmethod
-    def _is_subtitle_ext(cls, index: int, parts: list[str]) -> Match[str] | None:
-        for pattern in SUBTITLE_EXTENSIONS:
-            if cls._is_matching_tail_len(pattern, index, parts) and (match := cls._match_regex(pattern, index, parts)):
-                cls._get_logger().debug(f'Matched subtitle extension: {pattern}')
-                return match
-
-        return None
+    def _map_batch(cls, function: Callable[..., Any], *iterables: list[Any]) -> list[Any]:
+        """
+        Maps function over a batch, in-process for small batches, otherwise chunked across a process pool
+        """
+        batch_size = len(iterables[0]) if iterables else 0
+        workers = EXTRACTION_PROCESS_WORKERS or os.cpu_count() or 1
 
-    @classmethod
-    def _is_audio_ext(cls, index: int, parts: list[str]) -> Match[str] | None:
-        for pattern in AUDIO_EXTENSIONS:
-            if cls._is_matching_tail_len(pattern, index, parts) and (match := cls._match_regex(pattern, index, parts)):
-                cls._get_logger().debug(f'Matched audio extension: {pattern}')
-                return match
+        # Torrents processed concurrently are extracted in-process, forking while other torrents
+        # are processed would copy locks (logging, caches) held by their threads into the workers
+        if batch_size <= EXTRACTION_PROCESS_THRESHOLD or workers <= 1 or TORRENT_WORKERS > 1:
+            return list(map(function, *iterables))
 
-        return None
+        cls._get_logger().debug(f'Extracting batch of {batch_size} across {workers} processes')
 
+        # Forked workers inherit compiled patterns and logger, nothing is re-initialized per worker
+        chunksize = max(1, batch_size // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            return list(pool.map(function, *iterables, chunksize=chunksize))
 
     """
     Generic reusable helper functions
     """
-    @classmethod
-    def _is_matching_tail_len(cls, pattern: str, index: int, parts: list[str]) -> int | None:
-        """
-        Enables matching end of parts array only by ensuring pattern to match has as many parts as are left in filename array 
-        """
-        if (num_pattern_parts := len(pattern.split('.')) == len(parts) - index):
-            return num_pattern_parts
-        
-        return None
-
-    @classmethod
-    def _match_regex(cls, pattern: str, index: int, parts: list[str]) -> Match[str] | None:
-        """
-        Matches pattern on one or more full parts of filename
-        Parameters:
-            - pattern: Pattern to match
-            - index: index in parts array to start matching
-            - parts: array of filename parts previously separated by '.'
-        """
-
-        # Filename parts are split by '.', in order to match patterns containing '.', filename parts must be recombined
-        parts_to_match = len(pattern.split('.'))
-        combined_parts = ''
-        for i in range(index, min(index + parts_to_match, len(parts))):
-            if not combined_parts:
-                combined_parts = parts[i]
-            else:
-                combined_parts = combined_parts + '.' + parts[i]
-
-        # Match recombined or individual, filename parts with pattern
-        match = re.fullmatch(pattern, combined_parts)
-        if match:
-            cls._get_logger().debug(f'Regex match: pattern={pattern}, matched={combined_parts}')
-        return match
-
     @classmethod
     def _get_next_element(cls, index: int, array: list[Any]) -> Any | None:
         if index < len(array) - 1:
             return array[index + 1]
         else:
             return None
-
-    @classmethod
-    def _match_pattern_dict(cls, parts: list[str], pattern_dict: Dict[str, str]) -> str | None:
-
-        for i, _ in enumerate(parts):
-            for pattern in pattern_dict:
-                if cls._match_regex(pattern, i, parts):
-                    cls._get_logger().debug(f'Matched pattern dict: pattern={pattern}')
-                    return pattern
-
-        return None
-
-    @classmethod
-    def _match_pattern_list(cls, parts: list[str], pattern_list: list[str]) -> str | None:
-
-        for i, _ in enumerate(parts):
-            for pattern in pattern_list:
-                if cls._match_regex(pattern, i, parts):
-                    cls._get_logger().debug(f'Matched pattern list: pattern={pattern}')
-                    return pattern
-
-        return None
-
-    @classmethod
-    def _match_pattern_dict_list(cls, parts: list[str], pattern_dict_list: Dict[str, list[str]]) -> str | None:
-
-        for i, _ in enumerate(parts):
-            for res in pattern_dict_list:
-                for pattern in pattern_dict_list[res]:
-                    if cls._match_regex(pattern, i, parts):
-                        cls._get_logger().debug(f'Matched pattern dict list: key={res}, pattern={pattern}')
-                        return res
-
-        return None
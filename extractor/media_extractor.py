@@ -1,54 +1,83 @@
-from typing import Match
 from pathlib import Path
 from extractor.base_extractor import BaseExtractor
+from extractor.tokenizer import Token, Tokenizer
 from models.media_metadata import MediaMetadata
-from datetime import datetime
-from config.constants import (
-    # Quality descriptor patterns
-    EXTRAS_PATTERNS,
-    RESOLUTION_PATTERNS,
-    CODEC_PATTERNS,
-    SOURCE_PATTERNS,
-    AUDIO_PATTERNS,
+from models.sanitized_name import SanitizedName
+from extractor.metadata_cache import MetadataCache
+from config.settings import EXTRACTION_CACHE_SIZE
 
-    # Series patterns
-    SEASONS_PATTERNS,
-    EPISODES_PATTERNS,
-
-    )
-
-
-from config.language import LANGUAGE_PATTERNS
 
 class MediaExtractor(BaseExtractor):
 
+    # Media metadata only depends on sanitized name
+    _cache = MetadataCache(EXTRACTION_CACHE_SIZE)
+
     """
     Main extraction function
     """
     @classmethod
-    def extract_metadata(cls, path: Path) -> MediaMetadata:
+    def extract_metadata(cls, path: Path, name: SanitizedName | None = None) -> MediaMetadata:
         cls._get_logger().debug(f'Extracting media metadata for: {path}')
 
+        name = name or cls.sanitize(path)
+        cache_key = name.name or ''
+        if (cached := cls._cache.get(cache_key)):
+            cls._get_logger().debug(f'Media metadata cache hit: {cache_key}')
+            return cached
+
+        # Cached metadata is shared between nodes with the same sanitized name
+        metadata = cls._extract(name).freeze()
+        cls._cache.put(cache_key, metadata)
+        return metadata
+
+    @classmethod
+    def extract_many(cls, paths: list[Path], names: list[SanitizedName] | None = None) -> list[MediaMetadata]:
+        """
+        Extracts media metadata for a batch of paths, cache misses are extracted across a
+        process pool when the batch is larger than EXTRACTION_PROCESS_THRESHOLD
+        """
+        names = names or [cls.sanitize(path) for path in paths]
+        cache_keys = [name.name or '' for name in names]
+        results: list[MediaMetadata | None] = [cls._cache.get(cache_key) for cache_key in cache_keys]
+
+        # Same name can appear more than once in a batch, extract it once
+        misses: dict[str, int] = {}
+        for i, result in enumerate(results):
+            if result is None:
+                misses.setdefault(cache_keys[i], i)
+
+        extracted = cls._map_batch(cls._extract, [names[i] for i in misses.values()])
+        extracted_by_key = {}
+        for cache_key, metadata in zip(misses, extracted):
+            extracted_by_key[cache_key] = metadata.freeze()
+            cls._cache.put(cache_key, metadata)
+
+        return [result or extracted_by_key[cache_key] for result, cache_key in zip(results, cache_keys)]
+
+    @classmethod
+    def _extract(cls, name: SanitizedName) -> MediaMetadata:
         metadata = MediaMetadata()
         # Parts do not include ext, not needed for media identification
-        parts = cls._get_sanitized_stem_parts(path)
+        parts = name.stem_parts
+        # Each part is matched against every pattern category once, all fields are derived from the tokens
+        tokens = Tokenizer.tokenize(parts)
 
-        metadata.title = cls._extract_title(parts) 
-        metadata.year = cls._extract_year(parts)
-        metadata.season = cls._extract_season(parts)
-        metadata.episode = cls._extract_episode(parts)
+        metadata.title = cls._extract_title(tokens) 
+        metadata.year = cls._extract_year(tokens)
+        metadata.season = cls._extract_season(tokens)
+        metadata.episode = cls._extract_episode(tokens)
 
-        metadata.resolution = cls._extract_resolution(parts)
-        metadata.codec = cls._extract_codec(parts)
-        metadata.source = cls._extract_source(parts)
-        metadata.audio = cls._extract_audio(parts)
+        metadata.resolution = cls._extract_resolution(tokens)
+        metadata.codec = cls._extract_codec(tokens)
+        metadata.source = cls._extract_source(tokens)
+        metadata.audio = cls._extract_audio(tokens)
 
-        metadata.language = cls._extract_language(parts)
+        metadata.language = cls._extract_language(tokens)
 
         # Extensible pattern matching variables
-        metadata.season_patterns = bool(cls._match_pattern_list(parts, SEASONS_PATTERNS))
-        metadata.episode_patterns = bool(cls._match_pattern_list(parts, EPISODES_PATTERNS))
-        metadata.extras_patterns = bool(cls._match_pattern_list(parts, EXTRAS_PATTERNS))
+        metadata.season_patterns = any(token.season_match for token in tokens)
+        metadata.episode_patterns = any(token.episode_match for token in tokens)
+        metadata.extras_patterns = any(token.extras for token in tokens)
 
         cls._get_logger().debug(f'Extracted metadata - title: {metadata.title}, year: {metadata.year}, '
                                 f'season: {metadata.season}, episode: {metadata.episode}')
@@ -59,7 +88,7 @@ class MediaExtractor(BaseExtractor):
     Extraction functions
     """
     @classmethod
-    def _extract_title(cls, parts: list[str]) -> str | None:
+    def _extract_title(cls, tokens: list[Token]) -> str | None:
         """
         Extracts title of movie or series from filename.
 
@@ -88,26 +117,18 @@ class MediaExtractor(BaseExtractor):
 
         title = []
 
-        for i, part in enumerate(parts):
+        for i, token in enumerate(tokens):
 
             # Skips over year to check for only terminators or end of filename parts
-            part_to_match = part
-            index_to_match = i
-            if cls._is_valid_year(part_to_match):
-                part_to_match = cls._get_next_element(i, parts)
-                index_to_match = i + 1
+            token_to_match = token
+            if token.year:
+                token_to_match = cls._get_next_element(i, tokens)
 
-            
             # If teminator after title or year
-            if (
-                not part_to_match or
-                cls._is_quality_descriptor(index_to_match, parts) or
-                cls._extract_season_num(index_to_match, parts) or
-                cls._extract_episode_num(index_to_match, parts)
-                ):
+            if not token_to_match or token_to_match.is_terminator:
                 break
             else:
-                title.append(part)
+                title.append(token.part)
 
         if len(title) == 0:
             cls._get_logger().debug('No title found')
@@ -118,7 +139,7 @@ class MediaExtractor(BaseExtractor):
         return title_str
     
     @classmethod
-    def _extract_year(cls, parts: list[str]) -> int | None:
+    def _extract_year(cls, tokens: list[Token]) -> int | None:
         """
         Extracts year of movie or series from filename.
 
@@ -151,16 +172,12 @@ class MediaExtractor(BaseExtractor):
             None if no year found
         """
 
-        for i, _ in enumerate(parts):
+        for i, token in enumerate(tokens):
 
             # If terminator found
-            if (
-                cls._is_quality_descriptor(i, parts) or
-                cls._extract_season_num(i, parts) or
-                cls._extract_episode_num(i, parts)
-                ):
+            if token.is_terminator:
                 # If previous part is year, return year
-                if (i > 0 and (year := cls._is_valid_year(parts[i - 1]))):
+                if (i > 0 and (year := tokens[i - 1].year)):
                     cls._get_logger().debug(f'Extracted year: {year}')
                     return year
                 # If previous part is not year, no year can come after terminator, return None
@@ -168,160 +185,77 @@ class MediaExtractor(BaseExtractor):
                     cls._get_logger().debug('No year found')
                     return None
             # Returns year if year is last part in filename
-            if not cls._get_next_element(i, parts):
-                if (year := cls._is_valid_year(parts[i])):
+            if not cls._get_next_element(i, tokens):
+                if (year := token.year):
                     cls._get_logger().debug(f'Extracted year (end of parts): {year}')
                     return year
+
+        return None
     
     @classmethod
-    def _extract_season(cls, parts: list[str]) -> int | None:
-
-        for i, _ in enumerate(parts):
-            match = cls._extract_season_num(i, parts)
-            if match and len(match.groups()) >= 1 and match.group(1):
-                season = int(match.group(1))
-                cls._get_logger().debug(f'Extracted season: {season}')
-                return season
+    def _extract_season(cls, tokens: list[Token]) -> int | None:
+
+        for token in tokens:
+            if token.season is not None:
+                cls._get_logger().debug(f'Extracted season: {token.season}')
+                return token.season
         return None
     
     @classmethod
-    def _extract_episode(cls, parts: list[str]) -> int | None:
-
-        for i, _ in enumerate(parts):
-            match = cls._extract_episode_num(i, parts)
-            if match and len(match.groups()) >= 1 and match.group(1):
-                episode = int(match.group(1))
-                cls._get_logger().debug(f'Extracted episode: {episode}')
-                return episode
+    def _extract_episode(cls, tokens: list[Token]) -> int | None:
+
+        for token in tokens:
+            if token.episode is not None:
+                cls._get_logger().debug(f'Extracted episode: {token.episode}')
+                return token.episode
         return None
     
     @classmethod
-    def _extract_resolution(cls, parts: list[str]) -> str | None:
+    def _extract_resolution(cls, tokens: list[Token]) -> str | None:
 
-        for i, _ in enumerate(parts):
-            resolution = cls._is_resolution_descriptor(i, parts)
-            if resolution:
-                cls._get_logger().debug(f'Extracted resolution: {resolution}')
-                return resolution
+        for token in tokens:
+            if token.resolution:
+                cls._get_logger().debug(f'Extracted resolution: {token.resolution}')
+                return token.resolution
         
         return None
             
     @classmethod
-    def _extract_codec(cls, parts: list[str]) -> str | None:
+    def _extract_codec(cls, tokens: list[Token]) -> str | None:
 
-        for i, _ in enumerate(parts):
-            codec = cls._is_codec_descriptor(i, parts)
-            if codec:
-                cls._get_logger().debug(f'Extracted codec: {codec}')
-                return codec
+        for token in tokens:
+            if token.codec:
+                cls._get_logger().debug(f'Extracted codec: {token.codec}')
+                return token.codec
         
         return None
     
     @classmethod
-    def _extract_source(cls, parts: list[str]) -> str | None:
+    def _extract_source(cls, tokens: list[Token]) -> str | None:
 
-        for i, _ in enumerate(parts):
-            source = cls._is_source_descriptor(i, parts)
-            if source:
-                cls._get_logger().debug(f'Extracted source: {source}')
-                return source
+        for token in tokens:
+            if token.source:
+                cls._get_logger().debug(f'Extracted source: {token.source}')
+                return token.source
         
         return None
     
     @classmethod
-    def _extract_audio(cls, parts: list[str]) -> str | None:
+    def _extract_audio(cls, tokens: list[Token]) -> str | None:
 
-        for i, _ in enumerate(parts):
-            audio = cls._is_audio_descriptor(i, parts)
-            if audio:
-                cls._get_logger().debug(f'Extracted audio: {audio}')
-                return audio
+        for token in tokens:
+            if token.audio:
+                cls._get_logger().debug(f'Extracted audio: {token.audio}')
+                return token.audio
         
         return None
 
     @classmethod
-    def _extract_language(cls, parts: list[str]) -> str | None:
+    def _extract_language(cls, tokens: list[Token]) -> str | None:
 
-        for i, _ in enumerate(parts):
-            for language in LANGUAGE_PATTERNS:
-                for pattern in LANGUAGE_PATTERNS[language]:
-                    if cls._match_regex(pattern, i, parts):
-                        cls._get_logger().debug(f'Extracted language: {language}')
-                        return language
+        for token in tokens:
+            if token.language:
+                cls._get_logger().debug(f'Extracted language: {token.language}')
+                return token.language
 
         return None
-    
-    """
-    Extraction helper functions
-    """
-    @classmethod
-    def _is_valid_year(cls, year: str) -> int | None: 
-        if not year.isdigit():
-            return False
-
-        year_num = int(year)
-        if year_num > 1900 and year_num <= datetime.now().year:
-            return year_num
-        return None
-
-    @classmethod
-    def _extract_season_num(cls, index: int, parts: list[str]) -> Match[str] | None:
-        for pattern in SEASONS_PATTERNS:
-            match = cls._match_regex(pattern, index, parts)
-            if match:
-                return match
-
-        return None
-                
-    @classmethod
-    def _extract_episode_num(cls, index: int, parts: list[str]):
-        for pattern in EPISODES_PATTERNS:
-            match = cls._match_regex(pattern, index, parts)
-            if match:
-                return match
-
-        return None
-
-    @classmethod
-    def _is_quality_descriptor(cls, index: int, parts: list[str]) -> str | None:
-        if (
-            (descriptor := cls._is_resolution_descriptor(index, parts)) or
-            (descriptor := cls._is_codec_descriptor(index, parts)) or
-            (descriptor := cls._is_source_descriptor(index, parts)) or
-            (descriptor := cls._is_audio_descriptor(index, parts))
-            ):
-            return descriptor
-
-        return None
-
-    @classmethod
-    def _is_resolution_descriptor(cls, index: int, parts: list[str]) -> str | None:
-        for resolution in RESOLUTION_PATTERNS:
-            for pattern in RESOLUTION_PATTERNS[resolution]:
-                if cls._match_regex(pattern, index, parts):
-                    return resolution
-        return None
-
-    @classmethod
-    def _is_codec_descriptor(cls, index: int, parts: list[str]) -> str | None:
-        for codec in CODEC_PATTERNS:
-            for pattern in CODEC_PATTERNS[codec]:
-                if cls._match_regex(pattern, index, parts):
-                    return codec
-        return None
-
-    @classmethod
-    def _is_source_descriptor(cls, index: int, parts: list[str]) -> str | None:
-        for source in SOURCE_PATTERNS:
-            for pattern in SOURCE_PATTERNS[source]:
-                if cls._match_regex(pattern, index, parts):
-                    return source
-        return None
-
-    @classmethod
-    def _is_audio_descriptor(cls, index: int, parts: list[str]) -> str | None:
-        for audio in AUDIO_PATTERNS:
-            for pattern in AUDIO_PATTERNS[audio]:
-                if cls._match_regex(pattern, index, parts):
-                    return audio
-        return None
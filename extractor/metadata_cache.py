@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable
+
+
+class MetadataCache:
+    """
+    Thread-safe, size-bounded LRU cache for extracted metadata, keyed on sanitized names.
+    Cached values must be immutable (frozen) since every lookup returns the same instance.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = max(capacity, 0)
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        # Capacity of 0 disables caching
+        if not self.capacity:
+            return
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self) -> Dict[str, int | float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
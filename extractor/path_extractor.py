@@ -1,53 +1,75 @@
 from pathlib import Path
 from extractor.base_extractor import BaseExtractor
-from models.path_metadata import PathMetadata, FormatType
-from config.types import UnknownType
+from models.path_metadata import PathMetadata
+from models.sanitized_name import SanitizedName
+from extractor.metadata_cache import MetadataCache
+from config.settings import EXTRACTION_CACHE_SIZE
 
 class PathExtractor(BaseExtractor):
 
+    # Path metadata depends on sanitized name and file type of path
+    _cache = MetadataCache(EXTRACTION_CACHE_SIZE)
+
     @classmethod
-    def extract_metadata(cls, path: Path) -> PathMetadata:
+    def extract_metadata(
+        cls,
+        path: Path,
+        name: SanitizedName | None = None,
+        is_dir: bool | None = None,
+        is_file: bool | None = None,
+    ) -> PathMetadata:
+        """
+        Parameters:
+            - is_dir, is_file: file type if already known (e.g. from os.DirEntry), path is only stat'ed if missing
+        """
         cls._get_logger().debug(f'Extracting path metadata for: {path}')
         
-        metadata = PathMetadata()
-        # Parts includes ext to enable file/mime type extraction
-        parts = cls._get_sanitized_path_parts(path)
+        # Extension is detected from the last part(s) of the sanitized name, shared with media extraction
+        name = name or cls.sanitize(path)
+        is_dir = path.is_dir() if is_dir is None else is_dir
+        is_file = path.is_file() if is_file is None else is_file
 
-        metadata.is_dir = path.is_dir()
-        metadata.is_file = path.is_file()
-        metadata.format_type = cls._extract_format_type(parts) 
-        metadata.ext = cls._extract_ext(parts)
-
-        cls._get_logger().debug(f'Extracted path metadata - is_dir: {metadata.is_dir}, '
-                                f'is_file: {metadata.is_file}, format_type: {metadata.format_type}, '
-                                f'ext: {metadata.ext}')
+        cache_key = (name.name or '', is_dir, is_file)
+        if (cached := cls._cache.get(cache_key)):
+            cls._get_logger().debug(f'Path metadata cache hit: {cache_key}')
+            return cached
 
+        # Cached metadata is shared between nodes with the same sanitized name and file type
+        metadata = cls._extract(name, is_dir, is_file).freeze()
+        cls._cache.put(cache_key, metadata)
         return metadata
 
     @classmethod
-    def _extract_format_type(cls, parts: list[str]) -> FormatType | UnknownType:
-
-        for i, _ in enumerate(parts):
-            if cls._is_video_ext(i, parts):
-                cls._get_logger().debug('Detected format type: VIDEO')
-                return 'VIDEO'
-            elif cls._is_subtitle_ext(i, parts):
-                cls._get_logger().debug('Detected format type: SUBTITLE')
-                return 'SUBTITLE'
-            # TODO Audio files currently disabled
-            #elif cls._is_audio_ext(i, parts):
-            #    return 'AUDIO'
-
-        return 'UNKNOWN'
-
+    def extract_many(
+        cls,
+        paths: list[Path],
+        names: list[SanitizedName] | None = None,
+        file_types: list[tuple[bool, bool]] | None = None,
+    ) -> list[PathMetadata]:
+        """
+        Extracts path metadata for a batch of paths.
+        Path metadata is bound by the is_dir/is_file stats, which are cheaper in-process than
+        shipping to a process pool, so batches are never fanned out.
+        Parameters:
+            - file_types: (is_dir, is_file) of each path if already known
+        """
+        names = names or [cls.sanitize(path) for path in paths]
+        file_types = file_types or [(None, None)] * len(paths)
+        return [
+            cls.extract_metadata(path, name, is_dir, is_file)
+            for path, name, (is_dir, is_file) in zip(paths, names, file_types)
+        ]
 
     @classmethod
-    def _extract_ext(cls, parts: list[str]) -> str:
+    def _extract(cls, name: SanitizedName, is_dir: bool, is_file: bool) -> PathMetadata:
+        metadata = PathMetadata()
+        metadata.is_dir = is_dir
+        metadata.is_file = is_file
+        metadata.format_type = name.format_type
+        metadata.ext = name.ext
 
-        for i, _ in enumerate(parts):
-            if (match := cls._is_ext(i, parts)):
-                ext = match.group(0)
-                cls._get_logger().debug(f'Extracted extension: {ext}')
-                return ext
+        cls._get_logger().debug(f'Extracted path metadata - is_dir: {metadata.is_dir}, '
+                                f'is_file: {metadata.is_file}, format_type: {metadata.format_type}, '
+                                f'ext: {metadata.ext}')
 
-        return ''
+        return metadata
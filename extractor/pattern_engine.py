@@ -0,0 +1,150 @@
+import re
+from typing import Dict
+
+
+"""
+Precompiled pattern matching for one category of filename patterns (resolution, codec, season, etc.)
+"""
+class PatternEngine:
+    """
+    Compiles a pattern dict (canonical key -> list of patterns) or pattern list once, into one
+    alternation per window width, so matching a token window costs one regex call per width
+    instead of one call per pattern.
+
+    Patterns that only describe literal tokens (e.g. HEVC, 1080[PI]?, DTS.HD.MA) are expanded into a
+    dict lookup per window width, only the remaining (numeric) patterns such as season and episode
+    numbers are compiled into the alternations.
+
+    Matching semantics:
+        - A pattern containing n '.' separated parts is matched against n joined filename parts
+        - The first pattern (in dict/list order) that fully matches wins
+        - If the pattern has a capture group, its value is returned with the match (e.g. season number)
+    """
+
+    def __init__(self, patterns: Dict[str, list[str]] | list[str]) -> None:
+        # Flatten patterns to (key, pattern) in match priority order, lists use the pattern as its own key
+        if isinstance(patterns, dict):
+            entries = [(key, pattern) for key in patterns for pattern in patterns[key]]
+        else:
+            entries = [(pattern, pattern) for pattern in patterns]
+
+        # Group name -> (priority, key, capture group name)
+        self._groups: dict[str, tuple[int, str, str | None]] = {}
+        alternatives_by_width: dict[int, list[str]] = {}
+        # Window width -> literal token(s) -> (priority, key)
+        self._literals_by_width: dict[int, dict[str, tuple[int, str]]] = {}
+
+        for priority, (key, pattern) in enumerate(entries):
+            width = len(pattern.split('.'))
+
+            if (literals := self._expand_literal(pattern)) is not None:
+                literals_for_width = self._literals_by_width.setdefault(width, {})
+                for literal in literals:
+                    # Earlier pattern wins if the same literal is listed twice
+                    literals_for_width.setdefault(literal, (priority, key))
+                continue
+
+            group_name = f'p{priority}'
+            capture_name = f'c{priority}'
+            named_pattern, has_capture = self._name_capture_group(pattern, capture_name)
+
+            self._groups[group_name] = (priority, key, capture_name if has_capture else None)
+            alternatives_by_width.setdefault(width, []).append(f'(?P<{group_name}>{named_pattern})')
+
+        # Widths are matched in ascending order, priority decides between widths
+        self._regex_by_width: dict[int, re.Pattern[str]] = {
+            width: re.compile('|'.join(alternatives))
+            for width, alternatives in alternatives_by_width.items()
+        }
+        self._widths: list[int] = sorted(set(self._literals_by_width) | set(self._regex_by_width))
+
+    @classmethod
+    def _expand_literal(cls, pattern: str, max_literals: int = 64) -> list[str] | None:
+        """
+        Expands a pattern made only of characters, escaped dots and character classes (optionally '?')
+        into every token sequence it matches
+        Returns:
+            list of literal strings, None if pattern needs regex matching
+        """
+        literals = ['']
+        i = 0
+
+        while i < len(pattern):
+            char = pattern[i]
+
+            if pattern.startswith('\\.', i):
+                choices = ['.']
+                i += 2
+            elif char == '[':
+                end = pattern.find(']', i)
+                class_chars = pattern[i + 1:end]
+                if end == -1 or not class_chars.isalnum():
+                    return None
+                choices = list(class_chars)
+                i = end + 1
+                if pattern.startswith('?', i):
+                    choices.append('')
+                    i += 1
+            elif char.isalnum() or char == '-':
+                choices = [char]
+                i += 1
+            else:
+                return None
+
+            literals = [literal + choice for literal in literals for choice in choices]
+            if len(literals) > max_literals:
+                return None
+
+        return literals
+
+    @classmethod
+    def _name_capture_group(cls, pattern: str, capture_name: str) -> tuple[str, bool]:
+        """
+        Renames the capture group of a pattern (if any) so groups stay unique inside the alternation
+        """
+        named_pattern = re.sub(r'(?<!\\)\((?!\?)', f'(?P<{capture_name}>', pattern, count=1)
+        return named_pattern, named_pattern != pattern
+
+    def match(self, index: int, parts: list[str]) -> tuple[str, str | None] | None:
+        """
+        Matches highest priority pattern on one or more full parts of filename
+        Parameters:
+            - index: index in parts array to start matching
+            - parts: array of filename parts previously separated by '.'
+        Returns:
+            (key, captured value or None) of the matched pattern, None if no pattern matches
+        """
+        best: tuple[int, str, str | None] | None = None
+
+        for width in self._widths:
+            window = parts[index] if width == 1 else '.'.join(parts[index:index + width])
+
+            if (literals := self._literals_by_width.get(width)) and (literal := literals.get(window)):
+                priority, key = literal
+                if best is None or priority < best[0]:
+                    best = (priority, key, None)
+
+            if not (regex := self._regex_by_width.get(width)):
+                continue
+            match = regex.fullmatch(window)
+            if not match or not match.lastgroup:
+                continue
+
+            priority, key, capture_name = self._groups[match.lastgroup]
+            if best is None or priority < best[0]:
+                best = (priority, key, match.group(capture_name) if capture_name else None)
+
+        if best is None:
+            return None
+
+        return best[1], best[2]
+
+    def search(self, parts: list[str]) -> tuple[str, str | None] | None:
+        """
+        Returns first match in parts array (lowest index, then highest priority)
+        """
+        for i, _ in enumerate(parts):
+            if (result := self.match(i, parts)):
+                return result
+
+        return None
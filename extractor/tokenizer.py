@@ -0,0 +1,142 @@
+from datetime import datetime
+from extractor.base_extractor import BaseExtractor
+from extractor.pattern_engine import PatternEngine
+from config.constants import (
+    # Quality descriptor patterns
+    EXTRAS_PATTERNS,
+    RESOLUTION_PATTERNS,
+    CODEC_PATTERNS,
+    SOURCE_PATTERNS,
+    AUDIO_PATTERNS,
+
+    # Series patterns
+    SEASONS_PATTERNS,
+    EPISODES_PATTERNS,
+
+    )
+from config.language import LANGUAGE_PATTERNS
+
+
+class Token:
+    """
+    Tags of one filename part, every tag is matched starting at the part's index
+    """
+    __slots__ = (
+        'part',
+        'resolution',
+        'codec',
+        'source',
+        'audio',
+        'season_match',
+        'season',
+        'episode_match',
+        'episode',
+        'year',
+        'language',
+        'extras',
+    )
+
+    def __init__(self, part: str) -> None:
+        self.part: str = part
+
+        # Quality descriptors (canonical key of matched pattern)
+        self.resolution: str | None = None
+        self.codec: str | None = None
+        self.source: str | None = None
+        self.audio: str | None = None
+
+        # Series descriptors, *_match is True even if pattern has no number (e.g. SEASON)
+        self.season_match: bool = False
+        self.season: int | None = None
+        self.episode_match: bool = False
+        self.episode: int | None = None
+
+        self.year: int | None = None
+        self.language: str | None = None
+        self.extras: bool = False
+
+    @property
+    def is_quality(self) -> bool:
+        return bool(self.resolution or self.codec or self.source or self.audio)
+
+    @property
+    def is_terminator(self) -> bool:
+        """
+        True if part ends a title (quality descriptor, season or episode indicator)
+        """
+        return self.is_quality or self.season_match or self.episode_match
+
+
+class Tokenizer(BaseExtractor):
+    """
+    Classifies each filename part once against every pattern category
+    """
+
+    # Pattern categories compiled once at load
+    _resolution_engine = PatternEngine(RESOLUTION_PATTERNS)
+    _codec_engine = PatternEngine(CODEC_PATTERNS)
+    _source_engine = PatternEngine(SOURCE_PATTERNS)
+    _audio_engine = PatternEngine(AUDIO_PATTERNS)
+    _language_engine = PatternEngine(LANGUAGE_PATTERNS)
+    _season_engine = PatternEngine(SEASONS_PATTERNS)
+    _episode_engine = PatternEngine(EPISODES_PATTERNS)
+    _extras_engine = PatternEngine(EXTRAS_PATTERNS)
+
+    @classmethod
+    def tokenize(cls, parts: list[str]) -> list[Token]:
+        current_year = datetime.now().year
+        tokens = []
+
+        for i, part in enumerate(parts):
+            token = Token(part)
+
+            token.resolution = cls._match_key(cls._resolution_engine, i, parts)
+            token.codec = cls._match_key(cls._codec_engine, i, parts)
+            token.source = cls._match_key(cls._source_engine, i, parts)
+            token.audio = cls._match_key(cls._audio_engine, i, parts)
+
+            if (match := cls._season_engine.match(i, parts)):
+                token.season_match = True
+                token.season = int(match[1]) if match[1] else None
+            if (match := cls._episode_engine.match(i, parts)):
+                token.episode_match = True
+                token.episode = int(match[1]) if match[1] else None
+
+            token.year = cls._get_valid_year(part, current_year)
+            token.language = cls._match_key(cls._language_engine, i, parts)
+            token.extras = bool(cls._extras_engine.match(i, parts))
+
+            tokens.append(token)
+
+        cls._get_logger().debug(f'Tokenized parts: {[cls._format_token(token) for token in tokens]}')
+        return tokens
+
+    @classmethod
+    def _match_key(cls, engine: PatternEngine, index: int, parts: list[str]) -> str | None:
+        if (match := engine.match(index, parts)):
+            return match[0]
+        return None
+
+    @classmethod
+    def _get_valid_year(cls, part: str, current_year: int) -> int | None:
+        if not part.isdigit():
+            return None
+
+        year_num = int(part)
+        if year_num > 1900 and year_num <= current_year:
+            return year_num
+        return None
+
+    @classmethod
+    def _format_token(cls, token: Token) -> str:
+        tags = [
+            tag for tag, is_set in (
+                ('QUALITY', token.is_quality),
+                ('SEASON', token.season_match),
+                ('EPISODE', token.episode_match),
+                ('YEAR', token.year),
+                ('LANGUAGE', token.language),
+                ('EXTRAS', token.extras),
+            ) if is_set
+        ]
+        return f'{token.part}:{"|".join(tags) if tags else "WORD"}'
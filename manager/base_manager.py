@@ -1,10 +1,22 @@
 import shutil
 import re
+import os
+import errno
+import gc
+import resource
+from contextlib import contextmanager
+from functools import partial
+from threading import Lock
 from pathlib import Path
 from abc import ABC
+from typing import Iterator
 from logger.logger import Logger
-from config.settings import (MANAGER_PATH, DRY_RUN, MANAGER_PATH, MEDIA_PATH, TORRENT_PATH)
+from config.settings import (MANAGER_PATH, DRY_RUN, MANAGER_PATH, MEDIA_PATH, TORRENT_PATH, GC_MODE, GC_TUNED_THRESHOLD, MOVE_DEVICE_CONCURRENCY)
 from tree.node import Node
+from manager.move_scheduler import MoveScheduler
+from manager.copy_engine import CopyEngine
+from manager.link_manifest import LinkManifest
+from manager.staging_index import StagingIndex
 
 
 class BaseManager(ABC):
@@ -25,6 +37,23 @@ class BaseManager(ABC):
     _series_path = Path(MEDIA_PATH) / 'shows'
     _movies_path = Path(MEDIA_PATH) / 'movies'
 
+    # Garbage collector settings are process wide, stages using them are counted so they are
+    # only restored when the last stage exits
+    _gc_lock = Lock()
+    _gc_users: int = 0
+    _gc_thresholds: tuple[int, int, int] | None = None
+    _gc_frozen = False # Objects alive before the first run were frozen, see _freeze_gc
+
+    # Names in destination directories, existing and picked by moves, so unique destinations are picked
+    # without probing the disk and concurrently processed torrents never pick the same path
+    _staging_index = StagingIndex()
+
+    # Moves are grouped by source and destination device, see MoveScheduler
+    _move_scheduler = MoveScheduler(MOVE_DEVICE_CONCURRENCY)
+
+    # Link staging mode, torrents staged as hardlinks and (device, inode) of their linked files
+    _link_manifest = LinkManifest(Path(MANAGER_PATH) / 'links.json')
+
     @classmethod
     def _get_logger(cls) -> Logger:
         if cls._logger is None:
@@ -34,6 +63,69 @@ class BaseManager(ABC):
     """
     Base class providing common file management utilities.
     """
+    @classmethod
+    def _freeze_gc(cls) -> None:
+        """
+        Moves objects alive before the first run (compiled patterns, constants, caches) out of
+        garbage collections, so collections only scan objects created while processing
+        """
+        # Once per process, objects frozen by later runs (e.g. daemon batches) would never be collected
+        if GC_MODE != 'tuned' or BaseManager._gc_frozen:
+            return
+        gc.collect()
+        gc.freeze()
+        BaseManager._gc_frozen = True
+        cls._get_logger().debug(f'Froze {gc.get_freeze_count()} objects out of garbage collection')
+
+    @classmethod
+    @contextmanager
+    def _tuned_gc(cls) -> Iterator[None]:
+        """
+        Tunes or pauses the garbage collector (see GC_MODE) while node trees are built and classified.
+        Node trees have no reference cycles, they are freed by reference counting
+        """
+        with cls._gc_lock:
+            if cls._gc_users == 0:
+                cls._gc_thresholds = gc.get_threshold()
+                if GC_MODE == 'tuned':
+                    gc.set_threshold(max(GC_TUNED_THRESHOLD, cls._gc_thresholds[0]), *cls._gc_thresholds[1:])
+                elif GC_MODE == 'disabled':
+                    gc.disable()
+            cls._gc_users += 1
+
+        try:
+            yield
+        finally:
+            with cls._gc_lock:
+                cls._gc_users -= 1
+                if cls._gc_users == 0 and cls._gc_thresholds:
+                    gc.set_threshold(*cls._gc_thresholds)
+                    if GC_MODE == 'disabled':
+                        gc.enable()
+
+    @classmethod
+    def _get_peak_rss(cls) -> int:
+        """
+        Returns peak resident set size of process in bytes, since the process started (not per run)
+        """
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @classmethod
+    def _get_rss(cls) -> int:
+        """
+        Returns current resident set size of process in bytes, 0 if /proc is not available
+        """
+        try:
+            with open('/proc/self/statm', encoding='ascii') as file:
+                return int(file.read().split()[1]) * resource.getpagesize()
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    @classmethod
+    def _get_gc_collections(cls) -> int:
+        return sum(generation['collections'] for generation in gc.get_stats())
+
     @classmethod
     def _validate_paths(cls, paths_to_validate: list[tuple[Path, str]]) -> None:
         """
@@ -67,34 +159,31 @@ class BaseManager(ABC):
             path.mkdir(parents=True, exist_ok=True)
 
     @classmethod
-    def _get_unique_path(cls, path: Path) -> Path:
+    def _reserve_path(cls, path: Path) -> Path:
         """
-        Get a unique path by appending a counter if the path already exists.
+        Reserve a unique path for a move by appending a counter if the path is taken
+        (exists or reserved by another move), e.g. name_1.ext, see StagingIndex.
         
         Args:
             path: The desired path
             
         Returns:
-            A unique path that doesn't conflict with existing files
+            A unique path that doesn't conflict with existing files or other moves
             
         Raises:
             RuntimeError: If unable to find a unique path within 1000 attempts
         """
-        if not path.exists():
-            return path
-            
-        counter = 1
-        stem = path.stem
-        suffix = path.suffix
-        parent = path.parent
-
-        while counter < 1000:
-            new_path = parent / f"{stem}_{counter}{suffix}"
-            if not new_path.exists():
-                return new_path
-            counter += 1
-                
-        raise RuntimeError(f"Could not find unique path for {path}")
+        return cls._staging_index.reserve(path)
+
+    @classmethod
+    def _reserve_exact_path(cls, path: Path) -> bool:
+        """
+        Reserve path itself for a move.
+        
+        Returns:
+            False if path exists or is reserved by another move
+        """
+        return cls._staging_index.reserve_exact(path)
 
     @classmethod
     def _move_to_directory(cls, source: Path, dest_dir: Path) -> bool:
@@ -108,23 +197,56 @@ class BaseManager(ABC):
         Returns:
             True if successfully moved, False otherwise
         """
-        dest = dest_dir / source.name
-        dest = cls._get_unique_path(dest)
-        
+        dest = cls._reserve_path(dest_dir / source.name)
         if cls._dry_run:
             cls._get_logger().info(f'[DRY RUN] Would move {source} to {dest}')
             return True
 
+        # Waits for the move, copies across devices wait for a free slot of their device queue
+        return cls._move_scheduler.submit(source, dest, partial(cls._move, source, dest)).result()
+
+    @classmethod
+    def _move(cls, source: Path, dest: Path) -> bool:
         try:
             # CHANGED: Use shutil.move for both files and directories
             # This will be fast when source and dest are on the same filesystem
-            shutil.move(source, dest)
+            shutil.move(source, dest, copy_function=CopyEngine.copy)
+            cls._staging_index.remove(source)
             cls._get_logger().info(f'Moved: {source} -> {dest}')
             return True
         except Exception as e:
             cls._get_logger().error(f'Failed to move {source} to {dest}: {e}')
             return False
 
+    @classmethod
+    def _rename(cls, source: Path, dest: Path) -> bool:
+        """
+        Rename a file or directory (with its contents) on the same device.
+        
+        Args:
+            source: Source file or directory path
+            dest: Destination path, must not exist
+            
+        Returns:
+            True if successfully renamed, False otherwise
+        """
+        if cls._dry_run:
+            cls._get_logger().info(f'[DRY RUN] Would rename: {source} -> {dest}')
+            return True
+
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            os.rename(source, dest)
+            cls._staging_index.remove(source)
+            # Listings of a renamed directory are stale at both paths
+            cls._staging_index.invalidate(source)
+            cls._staging_index.invalidate(dest)
+            cls._get_logger().info(f'Renamed: {source} -> {dest}')
+            return True
+        except OSError as e:
+            cls._get_logger().error(f'Failed to rename {source} to {dest}: {e}')
+            return False
+
     @classmethod
     def _copy_file(cls, source: Path, dest: Path) -> bool:
         """
@@ -146,13 +268,69 @@ class BaseManager(ABC):
             dest.parent.mkdir(parents=True, exist_ok=True)
             # CHANGED: Use shutil.move instead of copy2 for faster operation
             # On same filesystem, this is instant instead of copying all bytes
-            shutil.move(source, dest)
+            # Across filesystems, data is copied by the kernel (reflink/copy_file_range) where supported
+            shutil.move(source, dest, copy_function=CopyEngine.copy)
+            cls._staging_index.remove(source)
             cls._get_logger().info(f'Moved file: {source} -> {dest}')
             return True
         except Exception as e:
             cls._get_logger().error(f'Failed to move file {source} to {dest}: {e}')
             return False
 
+    @classmethod
+    def _link_file(cls, source: Path, dest: Path) -> bool:
+        """
+        Hardlink a file to a destination path, the original stays in place (e.g. for seeding).
+        Files on another device than the destination are copied instead.
+        
+        Args:
+            source: Source file path
+            dest: Destination file path
+            
+        Returns:
+            True if successfully linked or copied, False otherwise
+        """
+        if cls._dry_run:
+            cls._get_logger().info(f'[DRY RUN] Would link file: {source} -> {dest}')
+            return True
+
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(source, dest)
+                cls._get_logger().info(f'Linked file: {source} -> {dest}')
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                CopyEngine.copy(source, dest)
+                cls._get_logger().info(f'Copied file (cannot link across devices): {source} -> {dest}')
+            return True
+        except Exception as e:
+            cls._get_logger().error(f'Failed to link file {source} to {dest}: {e}')
+            return False
+
+    @classmethod
+    def _find_linked(cls, source: Path) -> Path | None:
+        """
+        Find a hardlink of source already staged, matched by device and inode against the link manifest,
+        so linked files are found after the media server moved them into the library, without scanning it.
+        
+        Args:
+            source: Source file path
+            
+        Returns:
+            Path the hardlink was staged at, None if source is not linked yet
+        """
+        try:
+            source_stat = os.stat(source)
+        except OSError:
+            return None
+
+        # No other links left, staged link was deleted since
+        if source_stat.st_nlink <= 1:
+            return None
+        return cls._link_manifest.find_linked(source_stat.st_dev, source_stat.st_ino)
+
     @classmethod
     def _create_directory(cls, path: Path) -> bool:
         """
@@ -194,8 +372,10 @@ class BaseManager(ABC):
         try:
             if path.is_dir():
                 shutil.rmtree(path)
+                cls._staging_index.invalidate(path)
             else:
                 path.unlink()
+            cls._staging_index.remove(path)
             cls._get_logger().info(f'Removed: {path}')
             return True
         except Exception as e:
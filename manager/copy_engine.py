@@ -0,0 +1,329 @@
+import ctypes
+import errno
+import fcntl
+import mmap
+import os
+import platform
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+from logger.logger import Logger
+from manager.token_bucket import BandwidthSchedule, TokenBucket
+from models.run_stats import RunStats
+from config.settings import (
+    COPY_CHUNK_SIZE,
+    COPY_PROGRESS_INTERVAL,
+    COPY_CACHE_MODE,
+    COPY_IO_PRIORITY,
+    COPY_BANDWIDTH_LIMIT,
+    COPY_BANDWIDTH_SCHEDULE,
+)
+
+
+# ioctl request cloning a whole file (reflink) on filesystems sharing extents (btrfs, xfs, bcachefs)
+FICLONE = 0x40049409
+
+# Errors meaning a copy method is not supported between the two files, next method is tried
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY, errno.EBADF, errno.EPERM}
+
+# fallocate(2) of libc, None if not provided. Used instead of os.posix_fallocate, which emulates
+# preallocation by writing every block on filesystems without fallocate support (e.g. NFS, SMB)
+_libc = ctypes.CDLL(None, use_errno=True)
+# 64-bit offsets, libcs with only a 64-bit off_t (musl) have no fallocate64
+_fallocate = getattr(_libc, 'fallocate64', None) or getattr(_libc, 'fallocate', None)
+if _fallocate is not None:
+    _fallocate.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64)
+    _fallocate.restype = ctypes.c_int
+
+# ioprio_set/ioprio_get syscall numbers, not exposed by the os module
+_IOPRIO_SYSCALLS = {
+    'x86_64': (251, 252),
+    'aarch64': (30, 31),
+}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_SHIFT = 13
+# COPY_IO_PRIORITY -> ioprio value (class << 13 | level)
+_IO_PRIORITIES = {
+    'idle': 3 << _IOPRIO_CLASS_SHIFT,
+    'low': (2 << _IOPRIO_CLASS_SHIFT) | 7,
+}
+
+
+class CopyEngine:
+    """
+    Copies files across filesystems without passing data through userspace where possible,
+    methods are tried in order: reflink, copy_file_range, sendfile, buffered read/write.
+    Copies can optionally drop their pages from page cache and run at a lower I/O priority,
+    so staging does not evict or starve files being streamed.
+    Copied bytes are throttled by a token bucket shared by all concurrent copies (see COPY_BANDWIDTH_SCHEDULE).
+    """
+
+    _logger: Logger | None = None
+
+    _schedule = BandwidthSchedule(COPY_BANDWIDTH_LIMIT, COPY_BANDWIDTH_SCHEDULE)
+    _throttle = TokenBucket(_schedule.get_rate)
+
+    # Copies of the current run, copy time is wall time during which at least one copy was running
+    stats = RunStats('files_copied', 'bytes_copied', 'copy_ns', 'throttled_ns')
+    _active_copies = 0
+    _active_since = 0
+    _active_lock = threading.Lock()
+
+    @classmethod
+    def _get_logger(cls) -> Logger:
+        if cls._logger is None:
+            cls._logger = Logger.get_logger()
+        return cls._logger
+
+    @classmethod
+    def copy(cls, source: str | Path, dest: str | Path, cache_mode: str | None = None) -> str | Path:
+        """
+        Copies file data and metadata, same signature as shutil.copy2 (used as shutil.move copy_function)
+        Parameters:
+            - cache_mode: 'dontneed' drops copied pages from page cache as the copy progresses,
+              so copies do not evict files being streamed, defaults to COPY_CACHE_MODE
+        Returns:
+            dest
+        """
+        if os.path.isdir(dest):
+            dest = os.path.join(dest, os.path.basename(source))
+        if os.path.islink(source):
+            return shutil.copy2(source, dest, follow_symlinks=False)
+
+        drop_cache = (cache_mode or COPY_CACHE_MODE) == 'dontneed'
+
+        with cls._track_copy(), cls._io_priority(), open(source, 'rb') as source_file, open(dest, 'wb') as dest_file:
+            source_fd, dest_fd = source_file.fileno(), dest_file.fileno()
+            size = os.fstat(source_fd).st_size
+            start = time.monotonic()
+
+            if drop_cache:
+                os.posix_fadvise(source_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            method = cls._copy_data(source_fd, dest_fd, size, Path(source).name, start, drop_cache)
+
+        shutil.copystat(source, dest)
+        cls._log_throughput(Path(source).name, size, start, method)
+
+        cls.stats.increment('files_copied')
+        # Reflinks share extents, no data is transferred
+        if method != 'reflink':
+            cls.stats.increment('bytes_copied', size)
+        return dest
+
+    @classmethod
+    def get_stats(cls) -> dict[str, float]:
+        """
+        Returns files and bytes copied in the current run, seconds spent copying and waiting on the throttle,
+        and achieved throughput (bytes per second of copy time)
+        """
+        stats = cls.stats.as_dict()
+        copy_seconds = stats['copy_ns'] / 1e9
+        return {
+            'files_copied': stats['files_copied'],
+            'bytes_copied': stats['bytes_copied'],
+            'copy_seconds': copy_seconds,
+            'throttled_seconds': stats['throttled_ns'] / 1e9,
+            'throughput': stats['bytes_copied'] / copy_seconds if copy_seconds else 0.0,
+        }
+
+    @classmethod
+    def reset_stats(cls) -> None:
+        cls.stats = RunStats('files_copied', 'bytes_copied', 'copy_ns', 'throttled_ns')
+
+    @classmethod
+    @contextmanager
+    def _track_copy(cls) -> Iterator[None]:
+        """
+        Counts wall time during which at least one copy is running, concurrent copies are counted once
+        """
+        with cls._active_lock:
+            if not cls._active_copies:
+                cls._active_since = time.monotonic_ns()
+            cls._active_copies += 1
+        try:
+            yield
+        finally:
+            with cls._active_lock:
+                cls._active_copies -= 1
+                if not cls._active_copies:
+                    cls.stats.increment('copy_ns', time.monotonic_ns() - cls._active_since)
+
+    @classmethod
+    def _copy_data(cls, source_fd: int, dest_fd: int, size: int, name: str, start: float, drop_cache: bool = False) -> str:
+        """
+        Returns:
+            name of the method that copied the data
+        """
+        if cls._reflink(source_fd, dest_fd):
+            return 'reflink'
+
+        # Extents are reserved up front, avoids fragmentation of large files and fails early if out of space
+        if size:
+            cls._preallocate(dest_fd, size)
+
+        progress = _Progress(cls._get_logger(), name, size, start)
+        chunk_size = cls._get_chunk_size(cls._schedule.get_rate())
+        copied = 0
+        methods: list[tuple[str, Callable[[int, int, int, int], int]]] = [
+            ('copy_file_range', cls._copy_file_range),
+            ('sendfile', cls._sendfile),
+            ('buffered', cls._buffered),
+        ]
+
+        for method_name, method in methods:
+            try:
+                while copied < size:
+                    count = min(chunk_size, size - copied)
+                    throttled = cls._throttle.consume(count)
+                    if throttled:
+                        cls.stats.increment('throttled_ns', int(throttled * 1e9))
+                    written = method(source_fd, dest_fd, copied, count)
+                    if not written:
+                        break
+                    if drop_cache:
+                        cls._drop_cache(source_fd, dest_fd, copied, written)
+                    copied += written
+                    progress.update(copied)
+            except OSError as e:
+                # Fall back only if method is unsupported, not on errors such as a full disk
+                if e.errno not in _UNSUPPORTED_ERRNOS or method_name == 'buffered':
+                    raise
+                cls._get_logger().debug(f'{method_name} not supported for {name}: {e}, falling back')
+                continue
+
+            if copied == size:
+                return method_name
+            # Filesystems without real support may copy nothing instead of failing (e.g. copy_file_range on FUSE)
+            if not copied and method_name != 'buffered':
+                cls._get_logger().debug(f'{method_name} copied no data for {name}, falling back')
+                continue
+            # Source shrank or method stopped midway, the move fails so the source is kept
+            raise OSError(errno.EIO, f'Copied {copied} of {size} bytes of {name}')
+
+        return 'buffered'
+
+    @classmethod
+    def _preallocate(cls, dest_fd: int, size: int) -> None:
+        """
+        Reserves size bytes of dest with fallocate (mode 0), skipped if the filesystem does not support it
+        Raises:
+            OSError: If extents could not be reserved, e.g. out of space
+        """
+        if _fallocate is None or _fallocate(dest_fd, 0, 0, size) == 0:
+            return
+        error = ctypes.get_errno()
+        if error not in _UNSUPPORTED_ERRNOS:
+            raise OSError(error, f'fallocate failed: {os.strerror(error)}')
+
+    @classmethod
+    def _get_chunk_size(cls, rate: int = 0) -> int:
+        """
+        Parameters:
+            - rate: bandwidth limit, throttled copies use chunks of at most a quarter second of transfer,
+              so copies are not sent in long bursts at full speed
+        """
+        chunk_size = min(COPY_CHUNK_SIZE, rate // 4) if rate else COPY_CHUNK_SIZE
+        # Chunks are multiples of the page size, so every chunk starts on a page boundary
+        return max(mmap.PAGESIZE, chunk_size - chunk_size % mmap.PAGESIZE)
+
+    @classmethod
+    def _drop_cache(cls, source_fd: int, dest_fd: int, offset: int, length: int) -> None:
+        """
+        Drops a copied range of source and destination from page cache
+        """
+        os.posix_fadvise(source_fd, offset, length, os.POSIX_FADV_DONTNEED)
+        # Dirty pages can not be dropped, range is written back first
+        os.fdatasync(dest_fd)
+        os.posix_fadvise(dest_fd, offset, length, os.POSIX_FADV_DONTNEED)
+
+    @classmethod
+    @contextmanager
+    def _io_priority(cls) -> Iterator[None]:
+        """
+        Lowers I/O priority of the copying thread (see COPY_IO_PRIORITY) during the copy
+        """
+        priority = _IO_PRIORITIES.get(COPY_IO_PRIORITY)
+        syscalls = _IOPRIO_SYSCALLS.get(platform.machine())
+        if priority is None or syscalls is None:
+            yield
+            return
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        ioprio_set, ioprio_get = syscalls
+        thread_id = threading.get_native_id()
+
+        previous = libc.syscall(ioprio_get, _IOPRIO_WHO_PROCESS, thread_id)
+        if previous < 0 or libc.syscall(ioprio_set, _IOPRIO_WHO_PROCESS, thread_id, priority) < 0:
+            cls._get_logger().debug(f'Unable to set I/O priority {COPY_IO_PRIORITY}: {os.strerror(ctypes.get_errno())}')
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            libc.syscall(ioprio_set, _IOPRIO_WHO_PROCESS, thread_id, previous)
+
+    @classmethod
+    def _reflink(cls, source_fd: int, dest_fd: int) -> bool:
+        try:
+            fcntl.ioctl(dest_fd, FICLONE, source_fd)
+            return True
+        except OSError:
+            return False
+
+    @classmethod
+    def _copy_file_range(cls, source_fd: int, dest_fd: int, offset: int, count: int) -> int:
+        if not hasattr(os, 'copy_file_range'):
+            raise OSError(errno.ENOSYS, 'copy_file_range not available')
+        return os.copy_file_range(source_fd, dest_fd, count, offset, offset)
+
+    @classmethod
+    def _sendfile(cls, source_fd: int, dest_fd: int, offset: int, count: int) -> int:
+        os.lseek(dest_fd, offset, os.SEEK_SET)
+        return os.sendfile(dest_fd, source_fd, offset, count)
+
+    @classmethod
+    def _buffered(cls, source_fd: int, dest_fd: int, offset: int, count: int) -> int:
+        data = os.pread(source_fd, count, offset)
+        written = 0
+        while written < len(data):
+            written += os.pwrite(dest_fd, data[written:], offset + written)
+        return written
+
+    @classmethod
+    def _log_throughput(cls, name: str, size: int, start: float, method: str) -> None:
+        elapsed = max(time.monotonic() - start, 1e-6)
+        cls._get_logger().info(
+            f'Copied {name}: {size / 2**20:.1f} MiB in {elapsed:.1f}s '
+            f'({size / 2**20 / elapsed:.1f} MiB/s, {method})'
+        )
+
+
+class _Progress:
+    """
+    Logs progress and ETA of a copy every COPY_PROGRESS_INTERVAL seconds
+    """
+
+    def __init__(self, logger: Logger, name: str, size: int, start: float) -> None:
+        self._logger = logger
+        self._name = name
+        self._size = size
+        self._start = start
+        self._last_log = start
+
+    def update(self, copied: int) -> None:
+        now = time.monotonic()
+        if now - self._last_log < COPY_PROGRESS_INTERVAL or copied >= self._size:
+            return
+        self._last_log = now
+
+        rate = copied / max(now - self._start, 1e-6)
+        eta = (self._size - copied) / rate if rate else 0
+        self._logger.info(
+            f'Copying {self._name}: {copied / self._size:.0%} of {self._size / 2**20:.1f} MiB, '
+            f'{rate / 2**20:.1f} MiB/s, ETA {eta:.0f}s'
+        )
@@ -0,0 +1,165 @@
+import ctypes
+import errno
+import os
+import select
+import struct
+from pathlib import Path
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# Events of files arriving or being written, and of watched directories leaving the tree.
+# Clients keep downloading files open, writes to them are only seen as IN_MODIFY
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+_CHANGE_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# struct inotify_event header: wd, mask, cookie, len (name follows, padded with NULs)
+_EVENT_HEADER = struct.Struct('iIII')
+_READ_SIZE = 64 * 1024
+
+
+class InotifyWatcher:
+    """
+    Watches a directory tree with Linux inotify (through libc, no external service) and reports
+    the top-level entries of root whose files were created, written or moved in, events of one read
+    are coalesced per top-level entry.
+    Directories created or moved into the tree are watched as they appear,
+    directories moved out of the tree or deleted stop being watched.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError(errno.ENOSYS, 'inotify is not available on this platform')
+
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_init1 failed: {os.strerror(ctypes.get_errno())}')
+
+        # Watch descriptor -> watched directory
+        self._watches: dict[int, Path] = {}
+        self._add_tree(root)
+
+    def read(self, timeout: float | None = None) -> set[Path]:
+        """
+        Waits up to timeout seconds (None waits indefinitely) for events
+        Returns:
+            top-level entries of root with changes, all top-level entries if events were lost (queue overflow)
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed: set[Path] = set()
+        while True:
+            try:
+                data = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            if self._handle_events(data, changed):
+                # Events were dropped, anything may have changed, including directories created without being watched
+                self._add_tree(self._root)
+                changed.update(Path(entry.path) for entry in os.scandir(self._root))
+
+        return changed
+
+    def get_num_watches(self) -> int:
+        return len(self._watches)
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+            self._watches.clear()
+
+    def _handle_events(self, data: bytes, changed: set[Path]) -> bool:
+        """
+        Adds top-level entries changed by events in data to changed
+        Returns:
+            True if the event queue overflowed
+        """
+        overflowed = False
+        offset = 0
+
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + name_length].rstrip(b'\0')
+            offset += _EVENT_HEADER.size + name_length
+
+            if mask & IN_Q_OVERFLOW:
+                overflowed = True
+                continue
+
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                continue
+
+            # Watched directory left the tree, watch would report events of paths outside of root
+            if mask & (IN_MOVE_SELF | IN_DELETE_SELF):
+                if directory != self._root:
+                    self._libc.inotify_rm_watch(self._fd, wd)
+                    self._watches.pop(wd, None)
+                continue
+
+            if not mask & _CHANGE_MASK or not name:
+                continue
+
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self._add_tree(path)
+
+            top_level = self._get_top_level(path)
+            if top_level is not None:
+                changed.add(top_level)
+
+        return overflowed
+
+    def _get_top_level(self, path: Path) -> Path | None:
+        try:
+            relative = path.relative_to(self._root)
+        except ValueError:
+            return None
+        return self._root / relative.parts[0] if relative.parts else None
+
+    def _add_tree(self, path: Path) -> None:
+        """
+        Watches directory path and all directories below it
+        """
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            if not self._add_watch(directory):
+                continue
+            try:
+                with os.scandir(directory) as iterator:
+                    stack.extend(Path(entry.path) for entry in iterator if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+
+    def _add_watch(self, directory: Path) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            # Removed or replaced before it could be watched
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return False
+            raise OSError(error, f'Unable to watch {directory}: {os.strerror(error)}')
+        self._watches[wd] = directory
+        return True
@@ -0,0 +1,108 @@
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from logger.logger import Logger
+from storage.state_file import StateFile
+
+# Staged link: [staged path, device, inode], device and inode are None if the staged path could not be stat'ed
+ManifestLink = list[str | int | None]
+
+
+class LinkManifest:
+    """
+    Torrents staged as hardlinks, persisted as JSON so originals can be removed by a later run
+    once their torrent is removed from the client.
+    Maps original torrent path -> staged links of its files, with their device and inode, so files
+    already linked are found by inode (also once moved into the library) without scanning staging or library.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._lock = Lock()
+        self._entries: dict[str, list[ManifestLink]] | None = None
+        # (device, inode) -> staged path, of all links in entries
+        self._inodes: dict[tuple[int, int], Path] = {}
+
+    def add(self, torrent_path: Path, staged_paths: list[Path]) -> None:
+        links = [self._get_link(Path(path)) for path in staged_paths]
+        with self._lock:
+            entries = self._load()
+            entries.setdefault(str(torrent_path), []).extend(links)
+            self._index(links)
+            self._save(entries)
+
+    def remove(self, torrent_path: Path) -> None:
+        with self._lock:
+            entries = self._load()
+            links = entries.pop(str(torrent_path), None)
+            if links is not None:
+                for _, device, inode in links:
+                    self._inodes.pop((device, inode), None)
+                self._save(entries)
+
+    def get_torrent_paths(self) -> list[Path]:
+        with self._lock:
+            return [Path(torrent_path) for torrent_path in self._load()]
+
+    def find_linked(self, device: int, inode: int) -> Path | None:
+        """
+        Returns staged path of the link with device and inode, None if not staged by a recorded torrent
+        """
+        with self._lock:
+            self._load()
+            return self._inodes.get((device, inode))
+
+    def _load(self) -> dict[str, list[ManifestLink]]:
+        """
+        Loads manifest on first use, lock must be held
+        """
+        if self._entries is None:
+            try:
+                with open(self._path, encoding='utf-8') as file:
+                    entries = json.load(file)
+                if not isinstance(entries, dict) or not all(isinstance(links, list) for links in entries.values()):
+                    raise ValueError('manifest is not an object of lists')
+
+                # Manifests written before inodes were recorded list staged paths only
+                migrated = False
+                for links in entries.values():
+                    for index, link in enumerate(links):
+                        if isinstance(link, str):
+                            links[index] = self._get_link(Path(link))
+                            migrated = True
+                        elif not (isinstance(link, list) and len(link) == 3):
+                            raise ValueError(f'invalid link {link!r}')
+
+                self._entries = entries
+                for links in entries.values():
+                    self._index(links)
+                if migrated:
+                    self._save(entries)
+            except FileNotFoundError:
+                self._entries = {}
+            except ValueError as e:
+                # Truncated or hand-edited, kept aside so the linked torrents can be recovered by hand,
+                # their originals are not removed until then
+                corrupt_path = self._path.with_name(self._path.name + '.corrupt')
+                Logger.get_logger().warning(f'Unable to read link manifest {self._path}, moved to {corrupt_path}: {e}')
+                os.replace(self._path, corrupt_path)
+                self._entries = {}
+                self._inodes = {}
+        return self._entries
+
+    def _index(self, links: list[ManifestLink]) -> None:
+        for path, device, inode in links:
+            if device is not None:
+                self._inodes.setdefault((device, inode), Path(path))
+
+    @classmethod
+    def _get_link(cls, path: Path) -> ManifestLink:
+        try:
+            path_stat = os.stat(path)
+        except OSError:
+            return [str(path), None, None]
+        return [str(path), path_stat.st_dev, path_stat.st_ino]
+
+    def _save(self, entries: dict[str, list[ManifestLink]]) -> None:
+        StateFile.write(self._path, json.dumps(entries, indent=1).encode('utf-8'))
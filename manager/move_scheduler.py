@@ -0,0 +1,100 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar('T')
+
+
+class MoveScheduler:
+    """
+    Schedules moves by the devices of their source and destination.
+    Moves within one device are renames, they run immediately in the calling thread.
+    Moves across devices are copies, they are queued per (source device, destination device)
+    pair with a concurrency limit, so a saturated disk only delays copies from/to that disk.
+    """
+
+    def __init__(self, device_concurrency: int) -> None:
+        self._device_concurrency = max(1, device_concurrency)
+        # (source device, destination device) -> queue of copies between them
+        self._queues: dict[tuple[int, int], ThreadPoolExecutor] = {}
+        # Device pairs copied between, also those whose queue was shut down
+        self._device_pairs: set[tuple[int, int]] = set()
+        self._lock = Lock()
+
+        self._renames = 0
+        self._copies = 0
+
+    def submit(self, source: Path, dest: Path, move: Callable[[], T]) -> 'Future[T]':
+        """
+        Parameters:
+            - source, dest: paths moved by move, used to find their devices
+            - move: function moving source to dest
+        Returns:
+            future of move's result, already done for same device moves
+        """
+        devices = self._get_devices(source, dest)
+
+        if devices is None or devices[0] == devices[1]:
+            with self._lock:
+                self._renames += 1
+            future: Future[T] = Future()
+            try:
+                future.set_result(move())
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+
+        with self._lock:
+            self._copies += 1
+            self._device_pairs.add(devices)
+            if devices not in self._queues:
+                self._queues[devices] = ThreadPoolExecutor(
+                    max_workers=self._device_concurrency,
+                    thread_name_prefix=f'move-{devices[0]}-{devices[1]}',
+                )
+            queue = self._queues[devices]
+
+        return queue.submit(move)
+
+    def shutdown(self) -> None:
+        """
+        Waits for queued copies and stops the threads of all queues, later copies create their queue again
+        """
+        with self._lock:
+            queues = list(self._queues.values())
+            self._queues.clear()
+
+        for queue in queues:
+            queue.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Returns number of same device moves (renames), cross device moves (copies) and device pairs copied between
+        """
+        with self._lock:
+            return {
+                'renames': self._renames,
+                'copies': self._copies,
+                'device_pairs': len(self._device_pairs),
+            }
+
+    @classmethod
+    def _get_devices(cls, source: Path, dest: Path) -> tuple[int, int] | None:
+        """
+        Returns (source device, destination device), destination device is the device of its nearest
+        existing parent, None if source does not exist (move fails the same way on any device)
+        """
+        try:
+            source_device = os.lstat(source).st_dev
+        except OSError:
+            return None
+
+        for parent in (dest, *dest.parents):
+            try:
+                return source_device, os.stat(parent).st_dev
+            except OSError:
+                continue
+
+        return None
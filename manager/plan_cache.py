@@ -0,0 +1,93 @@
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from threading import Lock
+from models.move_plan import MovePlan
+from storage.state_file import StateFile
+
+
+class PlanCache:
+    """
+    Move plans of torrents planned ahead from their metainfo while still downloading, one pickle per torrent,
+    so the run that finds a torrent complete stages it without parsing or classifying it.
+    A plan is only valid for the file list it was planned from (see get_signature), and is used once.
+    """
+
+    def __init__(self, plan_dir: Path) -> None:
+        self._plan_dir = plan_dir
+        self._lock = Lock()
+
+    @classmethod
+    def get_signature(cls, files: list[tuple[Path, int]]) -> str:
+        """
+        Returns digest of file paths and sizes
+        """
+        digest = hashlib.sha1()
+        for path, size in files:
+            digest.update(os.fsencode(path) + b'\0' + str(size).encode() + b'\0')
+        return digest.hexdigest()
+
+    def has(self, torrent_path: Path, signature: str) -> bool:
+        return self._get_path(torrent_path, signature).exists()
+
+    def put(self, torrent_path: Path, signature: str, plan: MovePlan) -> None:
+        """
+        Saves plan, replacing plans of torrent_path made from other file lists
+        """
+        path = self._get_path(torrent_path, signature)
+        with self._lock:
+            self._remove(torrent_path)
+            StateFile.write(path, pickle.dumps(plan, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def take(self, torrent_path: Path, signature: str) -> MovePlan | None:
+        """
+        Returns and removes plan of torrent_path made from the same file list, None if there is none
+        """
+        path = self._get_path(torrent_path, signature)
+        with self._lock:
+            try:
+                with open(path, 'rb') as file:
+                    plan = pickle.load(file)
+            except FileNotFoundError:
+                return None
+            except Exception:
+                # Stale format or truncated file, torrent is planned from disk instead
+                plan = None
+            self._remove(torrent_path)
+        return plan if isinstance(plan, MovePlan) else None
+
+    def prune(self, torrent_paths: list[Path]) -> int:
+        """
+        Removes plans of torrents other than torrent_paths
+        Returns:
+            number of plans removed
+        """
+        keep = {StateFile.get_key(torrent_path) for torrent_path in torrent_paths}
+        removed = 0
+        with self._lock:
+            try:
+                with os.scandir(self._plan_dir) as iterator:
+                    for entry in iterator:
+                        if entry.name.partition('-')[0] not in keep:
+                            os.unlink(entry.path)
+                            removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _remove(self, torrent_path: Path) -> None:
+        """
+        Removes all plans of torrent_path, lock must be held
+        """
+        prefix = StateFile.get_key(torrent_path) + '-'
+        try:
+            with os.scandir(self._plan_dir) as iterator:
+                for entry in iterator:
+                    if entry.name.startswith(prefix):
+                        os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
+    def _get_path(self, torrent_path: Path, signature: str) -> Path:
+        return self._plan_dir / f'{StateFile.get_key(torrent_path)}-{signature}.pickle'
@@ -0,0 +1,105 @@
+import os
+from pathlib import Path
+from threading import Lock
+
+
+class StagingIndex:
+    """
+    In-memory index of names in destination directories, used to pick unique destination paths
+    without probing the disk for every candidate name.
+    Each directory is listed once with os.scandir when first used, then kept up to date as
+    destinations are reserved and moved away. Reserved names stay taken, also if the move fails.
+    Safe to use from concurrently processed torrents.
+    """
+
+    def __init__(self, max_attempts: int = 1000) -> None:
+        self._max_attempts = max_attempts
+        # Directory -> names of its entries, existing and reserved
+        self._names: dict[Path, set[str]] = {}
+        # (directory, stem, suffix) -> next counter to try, so repeated collisions do not rescan taken counters
+        self._next_counter: dict[tuple[Path, str, str], int] = {}
+        self._lock = Lock()
+        self._scans = 0
+
+    def reserve(self, path: Path) -> Path:
+        """
+        Reserve a unique path, path itself if free, otherwise with a counter appended to its stem (name_1.ext)
+        Raises:
+            RuntimeError: If unable to find a unique path within max_attempts
+        """
+        with self._lock:
+            names = self._get_names(path.parent)
+            if path.name not in names:
+                names.add(path.name)
+                return path
+
+            key = (path.parent, path.stem, path.suffix)
+            counter = self._next_counter.get(key, 1)
+            while counter < self._max_attempts:
+                name = f'{path.stem}_{counter}{path.suffix}'
+                counter += 1
+                if name not in names:
+                    names.add(name)
+                    self._next_counter[key] = counter
+                    return path.parent / name
+
+        raise RuntimeError(f'Could not find unique path for {path}')
+
+    def reserve_exact(self, path: Path) -> bool:
+        """
+        Reserve path itself
+        Returns:
+            False if path exists or is already reserved
+        """
+        with self._lock:
+            names = self._get_names(path.parent)
+            if path.name in names:
+                return False
+            names.add(path.name)
+            return True
+
+    def remove(self, path: Path) -> None:
+        """
+        Mark path as free after it was moved away or deleted, directories not listed yet are left unlisted
+        """
+        with self._lock:
+            names = self._names.get(path.parent)
+            if names is not None:
+                names.discard(path.name)
+
+    def invalidate(self, path: Path) -> None:
+        """
+        Drop listings of directory path and its subdirectories, e.g. after a directory was renamed,
+        they are listed again when next used
+        """
+        with self._lock:
+            for directory in [directory for directory in self._names if directory == path or path in directory.parents]:
+                del self._names[directory]
+            for key in [key for key in self._next_counter if key[0] == path or path in key[0].parents]:
+                del self._next_counter[key]
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Returns number of directory listings and of directories indexed
+        """
+        with self._lock:
+            return {'scans': self._scans, 'directories': len(self._names)}
+
+    def _get_names(self, directory: Path) -> set[str]:
+        """
+        Returns names in directory, listing it if not indexed yet, lock must be held
+        (listing under the lock keeps a reservation from racing the listing of its directory)
+        """
+        names = self._names.get(directory)
+        if names is None:
+            names = self._names[directory] = self._scan(directory)
+            self._scans += 1
+        return names
+
+    @classmethod
+    def _scan(cls, directory: Path) -> set[str]:
+        try:
+            with os.scandir(directory) as iterator:
+                return {entry.name for entry in iterator}
+        except (FileNotFoundError, NotADirectoryError):
+            return set()
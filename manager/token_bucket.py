@@ -0,0 +1,98 @@
+import re
+import time
+from datetime import datetime
+from threading import Lock
+from typing import Callable
+
+
+# Rate suffixes are decimal, like disk throughput (50M = 50 MB/s)
+_RATE_UNITS = {'': 1, 'K': 10**3, 'M': 10**6, 'G': 10**9}
+_RATE_PATTERN = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?)B?\s*$', re.IGNORECASE)
+_WINDOW_PATTERN = re.compile(r'^\s*(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})\s*=\s*(.+)$')
+
+
+class BandwidthSchedule:
+    """
+    Bytes per second limit by time of day.
+    Schedule is a comma separated list of 'HH:MM-HH:MM=rate' windows, e.g. '18:00-23:00=50M,23:00-07:00=0',
+    windows may wrap past midnight, first matching window wins, default rate applies outside all windows.
+    Rates are bytes per second with an optional K/M/G suffix, 0 is unlimited.
+    """
+
+    def __init__(self, default_rate: str, schedule: str = '') -> None:
+        self._default_rate = self.parse_rate(default_rate)
+        # (start minute, end minute, rate) of each window
+        self._windows: list[tuple[int, int, int]] = []
+
+        for window in filter(str.strip, schedule.split(',')):
+            match = _WINDOW_PATTERN.match(window)
+            if not match:
+                raise ValueError(f'Invalid bandwidth schedule window: {window!r}')
+            start_hour, start_minute, end_hour, end_minute, rate = match.groups()
+            self._windows.append((
+                int(start_hour) * 60 + int(start_minute),
+                int(end_hour) * 60 + int(end_minute),
+                self.parse_rate(rate),
+            ))
+
+    @classmethod
+    def parse_rate(cls, rate: str) -> int:
+        match = _RATE_PATTERN.match(rate)
+        if not match:
+            raise ValueError(f'Invalid bandwidth rate: {rate!r}')
+        return int(float(match.group(1)) * _RATE_UNITS[match.group(2).upper()])
+
+    def get_rate(self, now: datetime | None = None) -> int:
+        """
+        Returns bytes per second limit at now (defaults to current local time), 0 if unlimited
+        """
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+
+        for start, end, rate in self._windows:
+            in_window = start <= minute < end if start <= end else (minute >= start or minute < end)
+            if in_window:
+                return rate
+
+        return self._default_rate
+
+    def is_unlimited(self) -> bool:
+        return not self._default_rate and not any(rate for _, _, rate in self._windows)
+
+
+class TokenBucket:
+    """
+    Token bucket shared by concurrent copies, one token per byte.
+    Bucket holds at most one second of tokens (allowed burst), and refills at the rate returned by get_rate,
+    which is read on every call so schedule changes apply to copies already running.
+    Callers reserve their bytes up front and sleep off the deficit outside the lock, so waiting
+    copies are served in the order they asked.
+    """
+
+    def __init__(self, get_rate: Callable[[], int]) -> None:
+        self._get_rate = get_rate
+        self._tokens = 0.0
+        self._last_refill = time.monotonic()
+        self._lock = Lock()
+
+    def consume(self, amount: int) -> float:
+        """
+        Blocks until amount bytes may be transferred
+        Returns:
+            seconds waited
+        """
+        rate = self._get_rate()
+        # Unlimited, bucket is left untouched so the next limited period starts with a full bucket
+        if not rate:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(rate), self._tokens + (now - self._last_refill) * rate)
+            self._last_refill = now
+            self._tokens -= amount
+            wait = -self._tokens / rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
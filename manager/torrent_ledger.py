@@ -0,0 +1,72 @@
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Iterable
+from config.types import TorrentOutcome
+
+# (inode, size, mtime_ns) of a top-level entry of the download path
+Fingerprint = tuple[int, int, int]
+
+
+class TorrentLedger:
+    """
+    Outcome of every processed torrent, persisted in SQLite so later runs can skip torrents that did not change.
+    Torrents are keyed by their top-level path and fingerprinted by inode, size and mtime of the top-level entry,
+    so checking a torrent costs no more than listing the download path. Fingerprints of directories only change
+    when entries are added, removed or renamed directly in them, not when files deeper in them change.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._lock = Lock()
+        self._connection: sqlite3.Connection | None = None
+
+    def get_fingerprints(self) -> dict[Path, Fingerprint]:
+        """
+        Returns fingerprint of every recorded torrent, read in one query
+        """
+        with self._lock:
+            rows = self._connect().execute('SELECT path, inode, size, mtime_ns FROM torrents').fetchall()
+        return {Path(path): (inode, size, mtime_ns) for path, inode, size, mtime_ns in rows}
+
+    def record(self, torrent_path: Path, fingerprint: Fingerprint, outcome: TorrentOutcome) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO torrents (path, inode, size, mtime_ns, outcome, recorded_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (str(torrent_path), *fingerprint, outcome, time.time()),
+            )
+
+    def prune(self, torrent_paths: Iterable[Path]) -> int:
+        """
+        Removes torrents that are no longer in the download path
+        Parameters:
+            - torrent_paths: all top-level paths currently in the download path
+        Returns:
+            number of torrents removed
+        """
+        current = {str(torrent_path) for torrent_path in torrent_paths}
+        with self._lock, self._connect() as connection:
+            stale = [(path,) for (path,) in connection.execute('SELECT path FROM torrents') if path not in current]
+            connection.executemany('DELETE FROM torrents WHERE path = ?', stale)
+        return len(stale)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens the database on first use, lock must be held
+        """
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            # Shared by torrent worker threads, access is serialized by the lock
+            self._connection = sqlite3.connect(self._path, check_same_thread=False)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS torrents ('
+                'path TEXT PRIMARY KEY, '
+                'inode INTEGER NOT NULL, '
+                'size INTEGER NOT NULL, '
+                'mtime_ns INTEGER NOT NULL, '
+                'outcome TEXT NOT NULL, '
+                'recorded_at REAL NOT NULL)'
+            )
+        return self._connection
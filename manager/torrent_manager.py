@@ -1,41 +1,93 @@
-from os import walk
-from os.path import join
+import sqlite3
+import time
+from os import DirEntry, scandir
+from os.path import lexists
 from pathlib import Path
-from typing import Callable, Dict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from threading import Event
+from typing import Dict
 from tree.node import Node
 from tree.parser import Parser
+from tree.snapshot import ParserSnapshot
+from models.move_plan import MovePlan, MoveOperation
+from models.run_stats import RunStats
+from extractor.media_extractor import MediaExtractor
+from extractor.path_extractor import PathExtractor
 from classifier.node_classifier import NodeClassifier
 from manager.base_manager import BaseManager
-
+from manager.copy_engine import CopyEngine
+from manager.staging_index import StagingIndex
+from manager.torrent_ledger import TorrentLedger, Fingerprint
+from manager.inotify_watcher import InotifyWatcher
+from manager.plan_cache import PlanCache
+from client.qbittorrent import QBittorrentBackup, ClientTorrents
+from models.client_torrent import ClientTorrent
+from config.settings import GC_MODE, TORRENT_WORKERS, STAGING_MODE, QBITTORRENT_BT_BACKUP_PATH, LEDGER_ENABLED, MANAGER_PATH, PARSER_SNAPSHOTS, WATCH_QUIET_PERIOD, PLAN_AHEAD
+from config.types import TorrentOutcome
+
+# Classifications only valid as children, not at root level
+_CHILD_ONLY_CLASSIFICATIONS = frozenset({
+    'SUBTITLE_FOLDER', 'EXTRAS_FOLDER', 'SUBTITLE_FILE', 'EXTRAS_FILE'
+})
 
 class TorrentManager(BaseManager):
 
-    @classmethod
-    def validate(cls, node: Node) -> bool:
-        """
-        Validate that all nodes are properly classified.
-        """
+    # Outcomes of processed torrents, so unchanged torrents are skipped by later runs
+    _ledger = TorrentLedger(Path(MANAGER_PATH) / 'ledger.sqlite3')
+    # Outcomes recorded in the ledger, torrents skipped after an exception are retried by later runs
+    _final_outcomes: set[TorrentOutcome] = {'processed', 'already_staged', 'failed_validation', 'failed_processing'}
+
+    # Torrents of the client, read every run to skip torrents still downloading
+    _client_backup = QBittorrentBackup(Path(QBITTORRENT_BT_BACKUP_PATH)) if QBITTORRENT_BT_BACKUP_PATH else None
+    _client_torrents: ClientTorrents | None = None
+
+    # Move plans of torrents planned while still downloading
+    _plan_cache = PlanCache(Path(MANAGER_PATH) / 'plans')
+
+    # Classifications valid at root level, others fail processing
+    _root_classifications = {
+        'MOVIE_FOLDER', 'SERIES_FOLDER', 'SEASON_FOLDER', 'MOVIE_FILE', 'EPISODE_FILE'
+    }
+
+    # Folder classification -> (required child classifications, allowed child classifications)
+    _folder_children: Dict[str, tuple[set[str], set[str]]] = {
+        'MOVIE_FOLDER': (
+            {'MOVIE_FILE'},
+            {'MOVIE_FILE', 'SUBTITLE_FILE', 'SUBTITLE_FOLDER', 'EXTRAS_FOLDER'},
+        ),
+        'SERIES_FOLDER': (
+            {'SEASON_FOLDER'},
+            {'SEASON_FOLDER', 'SUBTITLE_FOLDER', 'EXTRAS_FOLDER'},
+        ),
+        'SEASON_FOLDER': (
+            {'EPISODE_FILE'},
+            {'EPISODE_FILE', 'SUBTITLE_FILE', 'SUBTITLE_FOLDER', 'EXTRAS_FOLDER'},
+        ),
+        'SUBTITLE_FOLDER': (
+            {'SUBTITLE_FILE'},
+            {'SUBTITLE_FILE'},
+        ),
+        # TODO - Add check for extras file OR season folder
+        'EXTRAS_FOLDER': (
+            set(),
+            {'EXTRAS_FILE', 'SUBTITLE_FILE', 'SUBTITLE_FOLDER', 'SEASON_FOLDER'},
+        ),
+    }
 
+    @classmethod
+    def _validate_node(cls, node: Node) -> bool:
         if node.classification == 'UNKNOWN':
             cls._get_logger().error(f'Node has unknown classification: {node.original_path}')
             return False
-        
-        # These classifications are only valid as children, not at root level
-        child_only_classifications = {
-            'SUBTITLE_FOLDER', 'EXTRAS_FOLDER', 'SUBTITLE_FILE', 'EXTRAS_FILE'
-        }
-        
-        if not node.parent_node and node.classification in child_only_classifications:
+
+
+        if not node.parent_node and node.classification in _CHILD_ONLY_CLASSIFICATIONS:
             cls._get_logger().error(
                 f'Invalid root classification {node.classification}: {node.original_path}'
             )
             return False
 
-        # Recursively validate children
-        for child_node in node.children_nodes:
-            if not cls.validate(child_node):
-                return False
-
         return True
 
     @classmethod
@@ -56,42 +108,307 @@ class TorrentManager(BaseManager):
         ])
 
 
-        cls.stats = {
-            'processed': 0,
-            'failed_validation': 0,
-            'failed_processing': 0,
-            'skipped': 0,
-        }
+        gc_collections = cls._begin_run()
 
         try:
-            root, dirs, files = next(walk(cls._torrent_path))
-        except StopIteration:
+            entries = cls._scan_torrent_path()
+        except OSError:
             cls._get_logger().warning(f'Torrent directory is empty or inaccessible: {cls._torrent_path}')
             return
         
-        if not dirs and not files:
+        if not entries:
             cls._get_logger().info('No torrents found to process')
-    
-        # Process directories
-        for dir_name in dirs:
-            dir_path = Path(join(root, dir_name))
-            cls._process_torrent(dir_path)
-
-        # Process files
-        for file_name in files:
-            file_path = Path(join(root, file_name))
-            cls._process_torrent(file_path)
-        
+
+        if PARSER_SNAPSHOTS:
+            ParserSnapshot.prune(Parser._snapshot_dir, [path for path, _ in entries])
+        if PLAN_AHEAD:
+            cls._plan_cache.prune([path for path, _ in entries])
+
+        ledger = cls._get_run_ledger()
+        if ledger:
+            try:
+                entries = cls._skip_unchanged(ledger, entries)
+            except sqlite3.Error as e:
+                cls._get_logger().warning(f'Unable to read ledger, processing all torrents: {e}')
+                ledger = None
+
+        cls._process_torrent_paths(cls._skip_incomplete(entries), ledger)
+        # After complete torrents, so planning never delays staging them
+        cls._plan_incomplete(entries)
+        # Copy threads are not kept between runs
+        cls._move_scheduler.shutdown()
+        cls._log_summary(gc_collections, ledger)
+
+    @classmethod
+    def watch(cls, stop: Event | None = None) -> None:
+        """
+        Run as a daemon: process all torrents once, then watch the download path with inotify and
+        process torrents whose files were created, written or moved in, once they have been quiet
+        for WATCH_QUIET_PERIOD seconds. Runs until stop is set.
+        """
+        stop = stop or Event()
+
+        # Watched before the initial run, so torrents arriving while it runs are processed after it
+        watcher = InotifyWatcher(cls._torrent_path)
+        # Top-level path -> monotonic time of its last event
+        pending: dict[Path, float] = {}
+
+        try:
+            cls.process_torrents()
+            cls._get_logger().info(
+                f'Watching {cls._torrent_path} ({watcher.get_num_watches()} directories), quiet period {WATCH_QUIET_PERIOD:g}s'
+            )
+
+            while not stop.is_set():
+                now = time.monotonic()
+                # Wake when the next pending torrent becomes quiet, and at least every second to notice stop
+                timeout = min([WATCH_QUIET_PERIOD - (now - last_event) for last_event in pending.values()] + [1.0])
+                changed = watcher.read(max(timeout, 0.0))
+
+                now = time.monotonic()
+                for path in changed:
+                    pending[path] = now
+
+                ready = cls._pop_quiet(pending, now, WATCH_QUIET_PERIOD)
+                if ready:
+                    cls._process_changed(ready)
+        finally:
+            watcher.close()
+
+    @classmethod
+    def _pop_quiet(cls, pending: dict[Path, float], now: float, quiet_period: float) -> list[Path]:
+        """
+        Removes and returns pending paths without events for quiet_period seconds, oldest first
+        """
+        ready = sorted((path for path, last_event in pending.items() if now - last_event >= quiet_period), key=pending.__getitem__)
+        for path in ready:
+            del pending[path]
+        return ready
+
+    @classmethod
+    def _process_changed(cls, paths: list[Path]) -> None:
+        """
+        Process torrents reported by the watcher. Their events are the change, so the ledger is
+        not consulted (files deeper in a torrent change without changing its fingerprint), only updated.
+        """
+        cls._get_logger().info(f'Processing {len(paths)} changed torrents')
+        gc_collections = cls._begin_run()
+
+        entries: list[tuple[Path, Fingerprint | None]] = []
+        for path in paths:
+            # Moved away or deleted before it became quiet
+            if not lexists(path):
+                continue
+            entries.append((path, cls._get_fingerprint(path)))
+
+        cls._process_torrent_paths(cls._skip_incomplete(entries), cls._get_run_ledger())
+        cls._plan_incomplete(entries)
+        # Copy threads are not kept between runs
+        cls._move_scheduler.shutdown()
+        cls._log_summary(gc_collections, None)
+
+    @classmethod
+    def _begin_run(cls) -> int:
+        """
+        Resets statistics and per-run state before processing torrents
+        Returns:
+            garbage collections so far, for the run summary
+        """
+        cls.stats = RunStats(
+            'processed',
+            'failed_validation',
+            'failed_processing',
+            'skipped',
+            'already_staged',
+            # Torrents skipped by the ledger
+            'unchanged',
+            # Torrents the client is still downloading
+            'incomplete',
+            # Move plans made while downloading, and used once complete
+            'planned_ahead',
+            'plans_used',
+            # Parsed nodes and their memory size, for the run summary
+            'nodes',
+            'node_bytes',
+            'node_dict_bytes',
+        )
+        CopyEngine.reset_stats()
+        Parser.snapshot_stats = RunStats('dirs_reused', 'dirs_listed', 'entries_reused', 'entries_extracted')
+        # Staging may have changed since last run
+        cls._staging_index = StagingIndex()
+        cls._freeze_gc()
+        gc_collections = cls._get_gc_collections()
+        cls._client_torrents = cls._read_client_torrents()
+
+        if STAGING_MODE == 'link':
+            cls._cleanup_linked_torrents()
+
+        return gc_collections
+
+    @classmethod
+    def _get_run_ledger(cls) -> TorrentLedger | None:
+        # Ledger is not written in dry run, nothing was moved
+        return cls._ledger if LEDGER_ENABLED and not cls._dry_run else None
+
+    @classmethod
+    def _log_summary(cls, gc_collections: int, ledger: TorrentLedger | None) -> None:
         cls._get_logger().info(f'Processing complete')
         cls._get_logger().info(f'Successfully processed: {cls.stats['processed']}')
         cls._get_logger().info(f'Failed validation: {cls.stats['failed_validation']}')
         cls._get_logger().info(f'Failed Processing: {cls.stats['failed_processing']}')
         cls._get_logger().info(f'Skipped: {cls.stats['skipped']}')
+        if ledger:
+            cls._get_logger().info(f'Unchanged since last run: {cls.stats['unchanged']}')
+        if cls._client_torrents is not None:
+            cls._get_logger().info(f'Still downloading: {cls.stats['incomplete']}')
+            if PLAN_AHEAD:
+                cls._get_logger().info(f'Planned ahead: {cls.stats['planned_ahead']}, plans used: {cls.stats['plans_used']}')
+        if STAGING_MODE == 'link':
+            cls._get_logger().info(f'Already staged: {cls.stats['already_staged']}')
+        cls._log_cache_stats()
+        if PARSER_SNAPSHOTS:
+            snapshot_stats = Parser.snapshot_stats.as_dict()
+            cls._get_logger().info(
+                f'Parser snapshots: {snapshot_stats['dirs_reused']} directories reused, {snapshot_stats['dirs_listed']} listed, '
+                f'{snapshot_stats['entries_reused']} entries reused, {snapshot_stats['entries_extracted']} extracted'
+            )
+        cls._log_node_memory()
+        move_stats = cls._move_scheduler.get_stats()
+        cls._get_logger().info(
+            f'Moves: {move_stats['renames']} within a device, {move_stats['copies']} across devices '
+            f'({move_stats['device_pairs']} device pairs), '
+            f'{cls._staging_index.get_stats()['scans']} destination directories listed'
+        )
+        copy_stats = CopyEngine.get_stats()
+        if copy_stats['files_copied']:
+            cls._get_logger().info(
+                f'Copies: {copy_stats['files_copied']} files, {copy_stats['bytes_copied'] / 2**20:.1f} MiB '
+                f'in {copy_stats['copy_seconds']:.1f}s ({copy_stats['throughput'] / 2**20:.1f} MiB/s), '
+                f'{copy_stats['throttled_seconds']:.1f}s throttled'
+            )
+        cls._get_logger().info(
+            # Peak is kept for the lifetime of the process, a daemon's later runs report the largest peak so far
+            f'RSS: {cls._get_rss() / 2**20:.1f} MiB (peak since start: {cls._get_peak_rss() / 2**20:.1f} MiB), '
+            f'{cls._get_gc_collections() - gc_collections} garbage collections (GC mode: {GC_MODE})'
+        )
 
     @classmethod
-    def _process_torrent(cls, path: Path):
+    def _scan_torrent_path(cls) -> list[tuple[Path, Fingerprint | None]]:
+        """
+        Lists top-level entries of the download path with one scandir, directories first like os.walk
+        Returns:
+            (path, fingerprint) of each entry, fingerprint is None if entry can not be stat'ed
+        """
+        dirs: list[tuple[Path, Fingerprint | None]] = []
+        files: list[tuple[Path, Fingerprint | None]] = []
+
+        with scandir(cls._torrent_path) as iterator:
+            for entry in iterator:
+                fingerprint = cls._get_fingerprint(entry)
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                (dirs if is_dir else files).append((Path(entry.path), fingerprint))
+
+        return dirs + files
+
+    @classmethod
+    def _get_fingerprint(cls, entry: DirEntry | Path) -> Fingerprint | None:
+        """
+        Returns (inode, size, mtime) of entry, following symlinks, None if it can not be stat'ed
+        """
+        try:
+            entry_stat = entry.stat()
+        except OSError:
+            return None
+        return (entry_stat.st_ino, entry_stat.st_size, entry_stat.st_mtime_ns)
+
+    @classmethod
+    def _skip_unchanged(cls, ledger: TorrentLedger, entries: list[tuple[Path, Fingerprint | None]]) -> list[tuple[Path, Fingerprint | None]]:
+        """
+        Drops torrents whose fingerprint is unchanged since their outcome was recorded,
+        and forgets recorded torrents no longer in the download path
+        Returns:
+            entries to process
+        """
+        recorded = ledger.get_fingerprints()
+        ledger.prune(path for path, _ in entries)
+
+        changed = []
+        for path, fingerprint in entries:
+            if fingerprint is not None and recorded.get(path) == fingerprint:
+                cls._get_logger().debug(f'Unchanged since last run, skipping: {path}')
+                cls.stats.increment('unchanged')
+                continue
+            changed.append((path, fingerprint))
+        return changed
+
+    @classmethod
+    def _process_torrent_paths(cls, entries: list[tuple[Path, Fingerprint | None]], ledger: TorrentLedger | None = None) -> None:
+        """
+        Process torrents one at a time, or concurrently on TORRENT_WORKERS threads.
+        Each torrent is parsed, classified, planned and staged independently.
+        Outcomes are recorded in ledger if given.
+        """
+        process = partial(cls._process_torrent_entry, ledger=ledger)
+
+        if TORRENT_WORKERS <= 1 or len(entries) <= 1:
+            for entry in entries:
+                process(entry)
+            return
+
+        cls._get_logger().info(f'Processing {len(entries)} torrents on {TORRENT_WORKERS} workers')
+        with ThreadPoolExecutor(max_workers=TORRENT_WORKERS, thread_name_prefix='torrent') as pool:
+            # Exceptions are handled per torrent, result only waits for completion
+            list(pool.map(process, entries))
+
+    @classmethod
+    def _process_torrent_entry(cls, entry: tuple[Path, Fingerprint | None], ledger: TorrentLedger | None = None) -> None:
+        path, fingerprint = entry
+        outcome = cls._process_torrent(path)
+
+        if ledger and outcome in cls._final_outcomes and fingerprint is not None:
+            try:
+                ledger.record(path, fingerprint, outcome)
+            except sqlite3.Error as e:
+                cls._get_logger().warning(f'Unable to record {path} in ledger: {e}')
+
+    @classmethod
+    def _log_cache_stats(cls) -> None:
+        """Log hit rate of extractor metadata caches for this run."""
+        for extractor in (MediaExtractor, PathExtractor):
+            cache_stats = extractor.get_cache_stats()
+            cls._get_logger().info(
+                f'{extractor.__name__} cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, '
+                f'{cache_stats['evictions']} evictions, hit rate {cache_stats['hit_rate']:.1%} '
+                f'({cache_stats['size']}/{cache_stats['capacity']} entries)'
+            )
+
+    @classmethod
+    def _log_node_memory(cls) -> None:
+        """Log average memory per parsed node, and an estimate for nodes storing attributes in a __dict__."""
+        if not cls.stats['nodes']:
+            return
+        cls._get_logger().info(
+            f'Node memory: {cls.stats['nodes']} nodes, {cls.stats['node_bytes'] // cls.stats['nodes']} bytes/node '
+            f'(estimated without slots: {cls.stats['node_dict_bytes'] // cls.stats['nodes']} bytes/node)'
+        )
+
+    @classmethod
+    def _record_node_memory(cls, head: Node) -> None:
+        for node in head.iter_tree():
+            size, dict_backed_size = node.get_memory_size()
+            cls.stats.increment('nodes')
+            cls.stats.increment('node_bytes', size)
+            cls.stats.increment('node_dict_bytes', dict_backed_size)
+
+    @classmethod
+    def _process_torrent(cls, path: Path) -> TorrentOutcome | None:
         """
         Process torrent file or directory.
+        Returns:
+            outcome of processing the torrent, None if its nodes could not be parsed
         """
 
         cls._get_logger().debug("=" * 80)
@@ -102,312 +419,486 @@ class TorrentManager(BaseManager):
         try:
             cls._get_logger().info(f'Processing: {path}')
             
-            # Stage 1: Parse
-            cls._get_logger().debug("-" * 40)
-            cls._get_logger().debug("STAGE 1: PARSING NODE TREE")
-            cls._get_logger().debug("-" * 40)
-            head = Parser.process_nodes(None, path)
-
-            if not head:
-                cls._get_logger().error(f'Unable to process nodes for path {path}, moving to error dir')
-                cls._move_path_to_error_dir(path)
-                return
+            plan = cls._take_planned(path) if PLAN_AHEAD else None
+            if plan is not None:
+                cls._get_logger().info(f'Using move plan made while downloading: {path}')
+                cls.stats.increment('plans_used')
+            else:
+                # Stage 1: Parse
+                cls._get_logger().debug("-" * 40)
+                cls._get_logger().debug("STAGE 1: PARSING NODE TREE")
+                cls._get_logger().debug("-" * 40)
+                with cls._tuned_gc():
+                    head = Parser.parse(path)
+
+                if not head:
+                    cls._get_logger().error(f'Unable to process nodes for path {path}, moving to error dir')
+                    cls._move_path_to_error_dir(path)
+                    return None
+                cls._record_node_memory(head)
             
-            # Stage 2: Classify
-            cls._get_logger().debug("-" * 40)
-            cls._get_logger().debug("STAGE 2: CLASSIFYING NODE TREE")
-            cls._get_logger().debug("-" * 40)
-            head = NodeClassifier.classify(head)
+                # Stage 2: Classify
+                cls._get_logger().debug("-" * 40)
+                cls._get_logger().debug("STAGE 2: CLASSIFYING NODE TREE")
+                cls._get_logger().debug("-" * 40)
+                with cls._tuned_gc():
+                    head = NodeClassifier.classify(head)
             
-            # Stage 3: Validate
+                # Stage 3: Validate, assign paths and plan moves
+                cls._get_logger().debug("-" * 40)
+                cls._get_logger().debug("STAGE 3: VALIDATING AND PLANNING MOVES")
+                cls._get_logger().debug("-" * 40)
+                plan = cls._plan_moves(head)
+
+                if plan.failure == 'VALIDATION':
+                    cls._get_logger().error(f'Validation failed, moving to error dir: {path}')
+                    cls._move_to_error_dir(head)
+                    cls.stats.increment('failed_validation')
+                    return 'failed_validation'
+
+                if plan.failure == 'PROCESSING':
+                    cls._get_logger().error(f'Processing failed, moving to error dir: {path}')
+                    cls._move_to_error_dir(head)
+                    cls.stats.increment('failed_processing')
+                    return 'failed_processing'
+
+            # Stage 4: Move to staging
             cls._get_logger().debug("-" * 40)
-            cls._get_logger().debug("STAGE 3: VALIDATING CLASSIFICATIONS")
+            cls._get_logger().debug("STAGE 4: MOVING TO STAGING")
             cls._get_logger().debug("-" * 40)
-            if not cls.validate(head):
-                cls._get_logger().error(f'Validation failed, moving to error dir: {path}')
-                cls._move_to_error_dir(head)
-                cls.stats['failed_validation'] += 1
-                return
-
-            # Stage 4: Process
-            cls._get_logger().debug("-" * 40)
-            cls._get_logger().debug("STAGE 4: PROCESSING NODE TREE")
-            cls._get_logger().debug("-" * 40)
-            if not cls._assign_paths(head):
-                cls._get_logger().error(f'Processing failed, moving to error dir: {path}')
-                cls._move_to_error_dir(head)
-                cls.stats['failed_processing'] += 1
-                return
-
-            # Stage 5: Move to staging
-            cls._get_logger().debug("-" * 40)
-            cls._get_logger().debug("STAGE 5: MOVING TO STAGING")
-            cls._get_logger().debug("-" * 40)
-            cls._move_to_staging(head)
-            cls.stats['processed'] += 1
+            if cls._execute_plan(plan):
+                cls.stats.increment('processed')
+                return 'processed'
+            cls.stats.increment('already_staged')
+            return 'already_staged'
 
                     
         except Exception as e:
             cls._get_logger().error(f'Exception processing {path}: {e}', exc_info=True)
-            cls.stats['skipped'] += 1
+            cls.stats.increment('skipped')
+            return 'skipped'
 
     @classmethod
-    def _assign_paths(cls, node: Node) -> bool:
+    def _plan_moves(cls, head: Node) -> MovePlan:
         """
-        Recursively process a torrent node and assign new_path to all nodes.
+        Validates classifications, assigns new_path and plans staging moves of all nodes in one
+        pre-order traversal, stopping at the first failure.
+        A processing failure is reported as a validation failure if any node of the tree is invalid,
+        same as validating the whole tree before processing it.
         """
-        cls._get_logger().info(f'Processing node: {node.original_path}')
-        
+        plan = MovePlan()
 
-        if node.classification == 'MOVIE_FOLDER':
-            return cls._process_movie_folder(node)
-        elif node.classification == 'SERIES_FOLDER':
-            return cls._process_series_folder(node)
-        elif node.classification == 'SEASON_FOLDER':
-            return cls._process_season_folder(node)
-        elif node.classification == 'MOVIE_FILE':
-            return cls._process_movie_file(node)
-        elif node.classification == 'EPISODE_FILE':
-            return cls._process_episode_file(node)
-        else:
-            cls._get_logger().warning(f'No root handler for classification: {node.classification}')
-            return False
+        # (node, index of parent's operation, classifications allowed by parent or None for root)
+        stack: list[tuple[Node, int, set[str] | None]] = [(head, -1, None)]
 
-    @classmethod
-    def _process_movie_folder(cls, node: Node) -> bool:
-        # Get relative path for folder
-        parent_node = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        node.new_path = parent_node / cls._get_formatted_folder_name(node)
+        while stack:
+            node, parent_index, allowed_classifications = stack.pop()
 
-        cls._get_logger().info(f'Processing movie folder: {node.original_path} -> {node.new_path}')
+            if not cls._validate_node(node):
+                plan.failure = 'VALIDATION'
+                return plan
 
-        # Validate all required children exist
-        required_classifications = {
-            'MOVIE_FILE'
-        }
+            if allowed_classifications is None and node.classification not in cls._root_classifications:
+                cls._get_logger().warning(f'No root handler for classification: {node.classification}')
+                return cls._fail_processing(node, stack, plan)
 
-        if not cls._validate_required_children(node, required_classifications):
-            return False
+            if allowed_classifications is not None and node.classification not in allowed_classifications:
+                parent_classification = node.parent_node.classification if node.parent_node else None
+                cls._get_logger().error(f' Unexpected node type {node.classification} for {parent_classification}')
+                return cls._fail_processing(node, stack, plan)
 
-        # Process children with handlers appropriate to classifications
-        child_handlers = {
-            'MOVIE_FILE': cls._process_movie_file,
-            'SUBTITLE_FILE': cls._process_subtitle_file,
-            'SUBTITLE_FOLDER': cls._process_subtitle_folder,
-            'EXTRAS_FOLDER': cls._process_extras_folder
-        }
+            cls._assign_path(node)
 
-        return cls._process_children(node, child_handlers)
+            required_children, allowed_children = cls._folder_children.get(node.classification, (set(), set()))
+            if required_children:
+                child_classifications = {child.classification for child in node.children_nodes}
+                for classification in required_children - child_classifications:
+                    cls._get_logger().error(f'Child classification {classification} not found in node {node.classification}')
+                    return cls._fail_processing(node, stack, plan)
 
-    @classmethod
-    def _process_series_folder(cls, node: Node) -> bool: 
-        # Get relative path for folder
-        parent_node = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        node.new_path = parent_node / cls._get_formatted_folder_name(node)
+            if node.path_metadata.is_dir or node.path_metadata.is_file:
+                is_complete = bool(node.path_metadata.is_dir) and node.get_child_stats().num_filtered == 0
+                plan.operations.append(MoveOperation(node.original_path, node.new_path, bool(node.path_metadata.is_dir), parent_index, is_complete))
+                parent_index = len(plan.operations) - 1
 
-        cls._get_logger().info(f'Processing series folder: {node.original_path} -> {node.new_path}')
+            # Reversed so children are visited in order
+            stack.extend((child, parent_index, allowed_children) for child in reversed(node.children_nodes))
 
-        required_classifications = {
-            'SEASON_FOLDER'
-        }
+        return plan
 
-        if not cls._validate_required_children(node, required_classifications):
-            return False
-        
-        child_handlers = {
-            'SEASON_FOLDER': cls._process_season_folder,
-            'SUBTITLE_FOLDER': cls._process_subtitle_folder,
-            'EXTRAS_FOLDER': cls._process_extras_folder,
-        }
-        
-        return cls._process_children(node, child_handlers)
+    @classmethod
+    def _fail_processing(cls, node: Node, stack: list[tuple[Node, int, set[str] | None]], plan: MovePlan) -> MovePlan:
+        """
+        Fails plan at node, as a validation failure if any node not visited yet (children of node and subtrees
+        left on the stack) is invalid, visited nodes are already validated
+        """
+        unvisited = node.children_nodes + [stack_node for stack_node, _, _ in stack]
+        is_valid = all(cls._validate_node(tree_node) for subtree in unvisited for tree_node in subtree.iter_tree())
+        plan.failure = 'PROCESSING' if is_valid else 'VALIDATION'
+        return plan
 
     @classmethod
-    def _process_season_folder(cls, node: Node) -> bool:
-        parent_node = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        node.new_path = parent_node / f'S{node.media_metadata.get_formatted_season_num()}'
+    def _assign_path(cls, node: Node) -> None:
+        """
+        Assign new_path of node, parent's new_path must already be assigned.
+        """
+        parent_path = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
 
-        cls._get_logger().info(f'Processing season folder: {node.original_path} -> {node.new_path}')
+        if node.classification in ('MOVIE_FOLDER', 'SERIES_FOLDER'):
+            name = cls._get_formatted_folder_name(node)
+        elif node.classification == 'SEASON_FOLDER':
+            name = f'S{node.media_metadata.get_formatted_season_num()}'
+        elif node.classification == 'SUBTITLE_FOLDER':
+            name = 'Subtitles'
+        elif node.classification == 'EXTRAS_FOLDER':
+            name = 'Extras'
+        elif node.classification in ('MOVIE_FILE', 'EPISODE_FILE'):
+            name = cls._get_formatted_file_name(node)
+        elif node.classification == 'SUBTITLE_FILE':
+            name = cls._sanitize_name(node.original_path.stem) + '.' + node.path_metadata.ext.lower()
+            if node.media_metadata.language:
+                name = 'subtitle_' + node.media_metadata.language
+        else:
+            name = cls._sanitize_name(node.original_path.stem) + '.' + node.path_metadata.ext
 
-        required_classifications = {
-            'EPISODE_FILE'
-        }
-    
-        if not cls._validate_required_children(node, required_classifications):
-            return False
+        node.new_path = parent_path / name
 
-        child_handlers = {
-            'EPISODE_FILE': cls._process_episode_file,
-            'SUBTITLE_FILE': cls._process_subtitle_file,
-            'SUBTITLE_FOLDER': cls._process_subtitle_folder,
-            'EXTRAS_FOLDER': cls._process_extras_folder,
-        }
-        
-        return cls._process_children(node, child_handlers)
+        cls._get_logger().info(f'Processing {node.classification}: {node.original_path} -> {node.new_path}')
 
     @classmethod
-    def _process_subtitle_folder(cls, node: Node) -> bool:
-        # Get relative path for folder
-        parent_node = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        node.new_path = parent_node / 'Subtitles'
-
-        cls._get_logger().info(f'Processing subtitle folder: {node.original_path} -> {node.new_path}')
+    def _execute_plan(cls, plan: MovePlan) -> bool:
+        """
+        Move planned nodes to staging, parents before children.
+        Creates directories as needed, moves files (hardlinks them in link staging mode).
+        Returns:
+            False if all files are already linked in link staging mode, True otherwise
+        """
+        link_mode = STAGING_MODE == 'link'
 
-        required_classifications = {
-            'SUBTITLE_FILE'
-        }
-    
-        if not cls._validate_required_children(node, required_classifications):
+        # Operations whose directory could not be created (or already linked in link mode), their subtrees are skipped
+        skipped: set[int] = cls._get_linked_operations(plan) if link_mode else set()
+        if link_mode and plan.operations and len(skipped) == len(plan.operations):
+            cls._get_logger().info(f'Already staged, nothing to link: {plan.operations[0].source}')
             return False
-        
-        child_handlers = {
-            'SUBTITLE_FILE': cls._process_subtitle_file,
-        }
-        
-        return cls._process_children(node, child_handlers)
 
-    @classmethod
-    def _process_extras_folder(cls, node: Node) -> bool:
-        # Get relative path for folder
-        parent_node = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        node.new_path = parent_node / 'Extras'
+        if not link_mode:
+            cls._coalesce_moves(plan)
+
+        # File moves queued behind other copies across the same devices, with their destination
+        pending: list[tuple[Future, Path]] = []
+
+        for index, operation in enumerate(plan.operations):
+            if index in skipped or operation.parent in skipped:
+                skipped.add(index)
+                continue
+
+            # Renamed along with an ancestor directory, name is unchanged
+            if operation.source == cls._get_staging_dest(operation.new_path):
+                continue
+
+            if operation.rename:
+                dest_path = cls._get_staging_dest(operation.new_path)
+                # Renamed from outside of staging were reserved by _coalesce_moves, renamed in place are reserved here
+                in_place = operation.parent >= 0 and plan.operations[operation.parent].rename
+                if in_place and not cls._reserve_exact_path(dest_path):
+                    skipped.add(index)
+                    continue
+                if not cls._move_scheduler.submit(operation.source, dest_path, partial(cls._rename, operation.source, dest_path)).result():
+                    skipped.add(index)
+                continue
+
+            # Ensure path is unique, also across torrents staged concurrently
+            if operation.is_dir:
+                if not cls._create_directory(cls._reserve_path(cls._get_staging_dest(operation.new_path))):
+                    skipped.add(index)
+                continue
+
+            dest_path = cls._reserve_path(cls._get_staging_dest(operation.new_path))
+            stage_file = cls._link_file if link_mode else cls._copy_file
+            future = cls._move_scheduler.submit(operation.source, dest_path, partial(stage_file, operation.source, dest_path))
+            pending.append((future, dest_path))
+
+        wait([future for future, _ in pending])
+        staged_paths = [dest_path for future, dest_path in pending if future.result()]
+
+        # Originals are removed by a later run, once the torrent is removed from the client
+        if link_mode and staged_paths and not cls._dry_run:
+            cls._link_manifest.add(plan.operations[0].source, staged_paths)
 
-        cls._get_logger().info(f'Processing extras folder: {node.original_path} -> {node.new_path}')
-        
+        return True
+
+    @classmethod
+    def _coalesce_moves(cls, plan: MovePlan) -> None:
         """
-        # TODO - Add check for extras file OR season folder
-        required_classifications = {
-            'EXTRAS_FILE'
-        }
-    
-        if not cls._validate_required_children(node, required_classifications):
-            return False
+        Replaces creating a directory and moving each of its files with one rename of the directory,
+        followed by renames of its entries in place, wherever the source subtree maps one-to-one onto
+        its destination: no entries dropped by the parser, sibling names can be renamed in place
+        without clashing, source on the same device as staging and destination not taken.
+        Subtrees that do not qualify keep their per-file moves.
+        Destinations of directories renamed from outside of staging are reserved.
         """
-        
-        child_handlers = {
-            'EXTRAS_FILE': cls._process_extras_file,
-            'SUBTITLE_FILE': cls._process_subtitle_file,
-            'SUBTITLE_FOLDER': cls._process_subtitle_folder,
-            'SEASON_FOLDER': cls._process_season_folder,
-        }
-        
-        return cls._process_children(node, child_handlers)
+        operations = plan.operations
+        children: list[list[int]] = [[] for _ in operations]
+        for index, operation in enumerate(operations):
+            if operation.parent >= 0:
+                children[operation.parent].append(index)
+
+        # Children come after their parents, so reversed order decides children first
+        coalescable = [False] * len(operations)
+        for index in reversed(range(len(operations))):
+            operation = operations[index]
+            coalescable[index] = (
+                operation.is_dir and
+                operation.is_complete and
+                all(coalescable[child] for child in children[index] if operations[child].is_dir) and
+                cls._can_rename_in_place([operations[child] for child in children[index]])
+            )
 
-    @classmethod
-    def _process_movie_file(cls, node: Node) -> bool:
-        parent_path = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        node.new_path = parent_path / cls._get_formatted_file_name(node) 
-            
-        cls._get_logger().info(f'Processing movie file: {node.original_path} -> {node.new_path}')
+        # Staging may not exist before the first directory is staged, it is created on the device of its nearest ancestor
+        staging_device = cls._get_device(cls._staging_path)
+        if staging_device is None:
+            return
 
-        return True
+        # Index of operation -> source of its entries once renamed
+        renamed_dirs: dict[int, Path] = {}
 
-    @classmethod
-    def _process_episode_file(cls, node: Node) -> bool:
-        parent_path = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        node.new_path = parent_path / cls._get_formatted_file_name(node) 
-        
-        cls._get_logger().info(f'Processing episode file: {node.original_path} -> {node.new_path}')
+        for index, operation in enumerate(operations):
+            # Moved along with renamed parent, renamed in place
+            if operation.parent in renamed_dirs:
+                operation.source = renamed_dirs[operation.parent] / operation.source.name
+                if operation.is_dir:
+                    operation.rename = True
+                    renamed_dirs[index] = cls._get_staging_dest(operation.new_path)
+                continue
 
-        return True
+            if not coalescable[index]:
+                continue
 
-    @classmethod
-    def _process_subtitle_file(cls, node: Node) -> bool:
-        parent_path = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        file_name = cls._sanitize_name(node.original_path.stem) + '.' + node.path_metadata.ext.lower()
-        if node.media_metadata.language:
-            file_name = 'subtitle_' + node.media_metadata.language
-        node.new_path = parent_path / file_name
-            
-        cls._get_logger().info(f'Processing subtitle file: {node.original_path} -> {node.new_path}')
+            try:
+                if operation.source.stat().st_dev != staging_device:
+                    continue
+            except OSError:
+                continue
 
-        return True
+            dest_path = cls._get_staging_dest(operation.new_path)
+            if not cls._reserve_exact_path(dest_path):
+                continue
+
+            cls._get_logger().info(f'Coalescing moves of {operation.source} into one directory rename -> {dest_path}')
+            operation.rename = True
+            renamed_dirs[index] = dest_path
 
     @classmethod
-    def _process_extras_file(cls, node: Node) -> bool:
-        parent_path = node.parent_node.new_path if (node.parent_node and node.parent_node.new_path) else Path('/')
-        file_name = cls._sanitize_name(node.original_path.stem) + '.' + node.path_metadata.ext
-        node.new_path = parent_path / file_name
-        
-        cls._get_logger().info(f'Processing extras file: {node.original_path} -> {node.new_path}')
+    def _get_device(cls, path: Path) -> int | None:
+        """
+        Returns device of path, or of its nearest existing ancestor if path does not exist yet
+        """
+        for candidate in (path, *path.parents):
+            try:
+                return candidate.stat().st_dev
+            except FileNotFoundError:
+                continue
+            except OSError:
+                return None
+        return None
 
-        return True
+    @classmethod
+    def _can_rename_in_place(cls, operations: list[MoveOperation]) -> bool:
+        """
+        Returns True if entries of one directory can be renamed one after another in place:
+        new names are unique, and no entry is renamed to the current name of another entry
+        """
+        new_names = [operation.new_path.name for operation in operations]
+        if len(set(new_names)) != len(new_names):
+            return False
+
+        current_names = {operation.source.name: operation for operation in operations}
+        return all(
+            current_names.get(new_name, operation) is operation
+            for new_name, operation in zip(new_names, operations)
+        )
 
     @classmethod
-    def _move_to_staging(cls, node: Node) -> None:
+    def _get_linked_operations(cls, plan: MovePlan) -> set[int]:
         """
-        Move a single node and its children to staging.
-        Creates directories as needed, copies files.
+        Returns indexes of operations already in staging or library, files already hardlinked
+        and directories without any file left to link
         """
-        if not node.original_path or not node.new_path:
-            cls._get_logger().error(f'Node missing original_path or new_path: {node}')
-            raise ValueError(f'Node missing original_path or new_path: {node}')
+        linked: set[int] = set()
+        # Directories with at least one file left to link
+        unlinked_dirs: set[int] = set()
 
-        # Calculate the full destination path
-        relative_new_path = node.new_path
-        if str(relative_new_path).startswith('/'):
-            relative_new_path = Path(str(relative_new_path)[1:])
-        
-        dest_path = cls._staging_path / relative_new_path
-        
-        # Ensure path is unique
-        dest_path = cls._get_unique_path(dest_path)
+        # Reversed so children are checked before their parents
+        for index in range(len(plan.operations) - 1, -1, -1):
+            operation = plan.operations[index]
+
+            if operation.is_dir and index not in unlinked_dirs:
+                linked.add(index)
+            elif not operation.is_dir and (linked_path := cls._find_linked(operation.source)):
+                cls._get_logger().info(f'Already linked: {operation.source} -> {linked_path}')
+                linked.add(index)
+
+            if index not in linked and operation.parent >= 0:
+                unlinked_dirs.add(operation.parent)
 
-        if node.path_metadata and node.path_metadata.is_dir:
-            cls._move_directory_to_staging(node, dest_path)
-        elif node.path_metadata and node.path_metadata.is_file:
-            cls._move_file_to_staging(node, dest_path)
+        return linked
 
     @classmethod
-    def _move_directory_to_staging(cls, node: Node, dest_path: Path) -> None:
-        if not cls._create_directory(dest_path):
+    def _cleanup_linked_torrents(cls) -> None:
+        """
+        Remove originals of torrents staged as hardlinks, once they are removed from the client.
+        """
+        torrent_paths = cls._link_manifest.get_torrent_paths()
+        if not torrent_paths:
             return
 
-        for child in node.children_nodes:
-            cls._move_to_staging(child)
+        if cls._client_torrents is None:
+            cls._get_logger().warning(
+                f'qBittorrent BT_backup not found ({QBITTORRENT_BT_BACKUP_PATH or "QBITTORRENT_BT_BACKUP_PATH not set"}), '
+                f'keeping originals of {len(torrent_paths)} linked torrents'
+            )
+            return
+
+        # A torrent whose files could not be read may still be in the client
+        if cls._client_backup is not None and cls._client_backup.errors:
+            cls._get_logger().warning(
+                f'Unable to read {len(cls._client_backup.errors)} client torrents, keeping originals of {len(torrent_paths)} linked torrents'
+            )
+            return
+
+        for torrent_path in torrent_paths:
+            if not torrent_path.exists():
+                cls._link_manifest.remove(torrent_path)
+                continue
+
+            if cls._client_torrents.find(torrent_path) is not None:
+                continue
+
+            cls._get_logger().info(f'Torrent removed from client, removing original: {torrent_path}')
+            if cls._remove_path(torrent_path) and not cls._dry_run:
+                cls._link_manifest.remove(torrent_path)
 
     @classmethod
-    def _move_file_to_staging(cls, node: Node, dest_path: Path) -> None:
-        # CHANGED: This now moves files instead of copying them
-        cls._copy_file(node.original_path, dest_path)
+    def _read_client_torrents(cls) -> ClientTorrents | None:
+        """
+        Returns torrents of the client's BT_backup directory, None if not configured or not found
+        """
+        if cls._client_backup is None:
+            return None
 
+        try:
+            client_torrents = cls._client_backup.read()
+        except OSError as e:
+            cls._get_logger().warning(f'Unable to read qBittorrent BT_backup: {e}')
+            return None
+
+        for error in cls._client_backup.errors:
+            cls._get_logger().warning(f'Unable to read client torrent {error}')
+        return client_torrents
 
     @classmethod
-    def cleanup_original(cls, node: Node) -> bool:
-        return cls._remove_path(node.original_path)
+    def _skip_incomplete(cls, entries: list[tuple[Path, Fingerprint | None]]) -> list[tuple[Path, Fingerprint | None]]:
+        """
+        Drops torrents the client has not finished downloading, they are not recorded in the ledger
+        so they are processed once complete. Entries unknown to the client are kept.
+        Returns:
+            entries to process
+        """
+        if cls._client_torrents is None:
+            return entries
+
+        complete = []
+        for path, fingerprint in entries:
+            torrent = cls._client_torrents.find(path)
+            if torrent is not None and not torrent.complete:
+                cls._get_logger().info(f'Still downloading, skipping: {path}')
+                cls.stats.increment('incomplete')
+                continue
+            complete.append((path, fingerprint))
+        return complete
 
-    
     @classmethod
-    def _validate_required_children(cls, node: Node, required_classifications: set[str] | list[str]) -> bool:
-        for classification in required_classifications:
-            res = False
+    def _plan_incomplete(cls, entries: list[tuple[Path, Fingerprint | None]]) -> None:
+        """
+        Plans torrents the client is still downloading, see _plan_ahead
+        """
+        if not PLAN_AHEAD or cls._client_torrents is None:
+            return
 
-            for child in node.children_nodes:
-                if child.classification == classification:
-                    res = True
-                    break
+        for path, _ in entries:
+            torrent = cls._client_torrents.find(path)
+            if torrent is not None and not torrent.complete and torrent.files:
+                cls._plan_ahead(path, torrent)
 
-            if not res:
-                cls._get_logger().error(f'Child classification {classification} not found in node {node.classification}')
-                return False
+    @classmethod
+    def _plan_ahead(cls, path: Path, torrent: ClientTorrent) -> None:
+        """
+        Builds node tree of torrent from its metainfo, classifies and plans it, and saves the plan until the torrent is complete.
+        Failed plans are saved too so they are not planned again every run, the torrent is planned from disk once complete.
+        """
+        files = cls._get_torrent_files(path, torrent)
+        signature = PlanCache.get_signature(files)
+        if not files or cls._plan_cache.has(path, signature):
+            return
 
-        return True
+        try:
+            cls._get_logger().info(f'Planning ahead of completion: {path}')
+            with cls._tuned_gc():
+                head = Parser.parse_file_list(path, [file for file, _ in files])
+                if head is None:
+                    return
+                head = NodeClassifier.classify(head)
+            plan = cls._plan_moves(head)
+            cls._plan_cache.put(path, signature, plan)
+            cls.stats.increment('planned_ahead')
+        except Exception as e:
+            cls._get_logger().warning(f'Unable to plan {path} ahead of completion: {e}')
 
     @classmethod
-    def _process_children(cls, node: Node, handlers: Dict[str, Callable]) -> bool:
-        
-        for child in node.children_nodes:
-            handler = handlers.get(child.classification)
+    def _take_planned(cls, path: Path) -> MovePlan | None:
+        """
+        Returns plan made while torrent was downloading, if its files are unchanged and all on disk
+        """
+        torrent = cls._client_torrents.find(path) if cls._client_torrents is not None else None
+        if torrent is None or not torrent.files:
+            return None
 
-            if not handler:
-                cls._get_logger().error(f' Unexpected node type {child.classification} for {node.classification}')
-                return False
+        plan = cls._plan_cache.take(path, PlanCache.get_signature(cls._get_torrent_files(path, torrent)))
+        if plan is None or plan.failure:
+            return None
 
-            if not handler(child):
-                return False
+        missing = [operation.source for operation in plan.operations if not operation.is_dir and not operation.source.exists()]
+        if missing:
+            cls._get_logger().warning(f'{len(missing)} planned files not found, planning from disk: {path}')
+            return None
+        return plan
 
-        return True
+    @classmethod
+    def _get_torrent_files(cls, path: Path, torrent: ClientTorrent) -> list[tuple[Path, int]]:
+        """
+        Returns files of torrent under top-level entry path, the client may see the download path under another path
+        """
+        content_path = torrent.save_path / path.name
+        return [
+            (path / file.relative_to(content_path), size)
+            for file, size in torrent.files
+            if file.is_relative_to(content_path)
+        ]
 
+    @classmethod
+    def _get_staging_dest(cls, new_path: Path) -> Path:
+        # Calculate the full destination path
+        relative_new_path = new_path
+        if str(relative_new_path).startswith('/'):
+            relative_new_path = Path(str(relative_new_path)[1:])
+        
+        return cls._staging_path / relative_new_path
+
+    @classmethod
+    def cleanup_original(cls, node: Node) -> bool:
+        return cls._remove_path(node.original_path)
+
+    
     @classmethod
     def _get_formatted_folder_name(cls, node: Node) -> str:
         meta = node.media_metadata
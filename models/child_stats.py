@@ -0,0 +1,57 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tree.node import Node
+
+
+class ChildStats:
+    """
+    Number of children of a directory node by type, computed once bottom-up
+    """
+    __slots__ = (
+        'num_video',
+        'num_subtitle',
+        'num_season_dir',
+        'num_filtered',
+    )
+
+    def __init__(self, num_video: int = 0, num_subtitle: int = 0, num_season_dir: int = 0, num_filtered: int | None = None) -> None:
+        self.num_video: int = num_video # Video files
+        self.num_subtitle: int = num_subtitle # Subtitle files
+        self.num_season_dir: int = num_season_dir # Directories with season pattern and no episode pattern
+        self.num_filtered: int | None = num_filtered # Directory entries dropped by the parser, None if unknown
+
+    @classmethod
+    def from_children(cls, children_nodes: list[Node], num_filtered: int | None = None) -> ChildStats:
+        """
+        Counts children, stats of child directories are read from (or computed once on) the children
+        Parameters:
+            - num_filtered: entries of the directory the parser dropped (unknown files, directories without known files)
+        """
+        stats = cls(num_filtered=num_filtered)
+
+        for child_node in children_nodes:
+            if child_node.path_metadata.is_file:
+                if child_node.path_metadata.format_type == 'VIDEO':
+                    stats.num_video += 1
+                elif child_node.path_metadata.format_type == 'SUBTITLE':
+                    stats.num_subtitle += 1
+
+            elif cls.is_season_dir(child_node):
+                stats.num_season_dir += 1
+
+        return stats
+
+    @classmethod
+    def is_season_dir(cls, node: Node) -> bool:
+        """
+        Directory with season pattern or number, no episode number and at least one video file,
+        counted in num_season_dir of its parent and classified as SEASON_FOLDER by NodeClassifier
+        """
+        return bool(
+            node.path_metadata.is_dir and
+            (node.media_metadata.season_patterns or node.media_metadata.season) and
+            not node.media_metadata.episode and
+            node.get_child_stats().num_video >= 1
+        )
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+
+class ClientTorrent:
+    """
+    Torrent known to the torrent client, read from its resume data and metainfo
+    """
+    __slots__ = (
+        'info_hash',
+        'name',
+        'save_path',
+        'content_paths',
+        'files',
+        'complete',
+    )
+
+    def __init__(
+        self,
+        info_hash: str,
+        name: str,
+        save_path: Path,
+        content_paths: list[Path],
+        files: list[tuple[Path, int]],
+        complete: bool,
+    ) -> None:
+        self.info_hash: str = info_hash
+        self.name: str = name
+        self.save_path: Path = save_path # Directory the client downloads the torrent to
+        self.content_paths: list[Path] = content_paths # Top-level entries of the torrent in save_path
+        self.files: list[tuple[Path, int]] = files # Path and size of wanted files, empty until metadata is known
+        self.complete: bool = complete # Every piece of wanted files is downloaded
@@ -0,0 +1,44 @@
+import sys
+from typing import Any
+
+
+class CompactModel:
+    """
+    Base of slotted metadata models.
+    Categorical string fields are interned so each distinct value is stored once,
+    frozen models are shared through the extractor cache and must not be modified.
+    """
+    __slots__ = ('_frozen',)
+
+    # Fields holding small categorical strings (e.g. resolution, format type)
+    _interned_fields: frozenset[str] = frozenset()
+
+    def __init__(self) -> None:
+        object.__setattr__(self, '_frozen', False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if self._frozen:
+            raise AttributeError(f'Cannot set {name}, {type(self).__name__} is frozen')
+        object.__setattr__(self, name, self._intern(name, value))
+
+    def freeze(self) -> Any:
+        object.__setattr__(self, '_frozen', True)
+        return self
+
+    @classmethod
+    def _intern(cls, name: str, value: Any) -> Any:
+        if name in cls._interned_fields and isinstance(value, str):
+            return sys.intern(value)
+        return value
+
+    @classmethod
+    def _get_fields(cls) -> list[str]:
+        return [name for klass in reversed(cls.__mro__) for name in getattr(klass, '__slots__', ())]
+
+    # Pickling (e.g. results of extraction processes) bypasses frozen check and re-interns values
+    def __getstate__(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self._get_fields() if hasattr(self, name)}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, self._intern(name, value))
@@ -1,27 +1,47 @@
 import re
-
-
-class MediaMetadata:
-    # Show, movie, or extra descriptors
-    title: str | None = None
-    year: int | None = None
-    season: int | None = None
-    episode: int | None = None
-
-    # Media descriptors
-    resolution: str | None = None
-    codec: str | None = None
-    source: str | None = None
-    audio: str | None = None
-
-    language: str | None = None
-
-    # Booleans to describe if certain patterns have matches, extensible for future use
-    # To add more patterns, add variable, then add pattern to constants.py, then add matching to bottom of MediaExtractor.extract()
-    season_patterns: bool = False
-    episode_patterns: bool = False
-    extras_patterns: bool = False
-
+from models.compact_model import CompactModel
+
+
+class MediaMetadata(CompactModel):
+    __slots__ = (
+        'title',
+        'year',
+        'season',
+        'episode',
+        'resolution',
+        'codec',
+        'source',
+        'audio',
+        'language',
+        'season_patterns',
+        'episode_patterns',
+        'extras_patterns',
+    )
+
+    _interned_fields = frozenset({'resolution', 'codec', 'source', 'audio', 'language'})
+
+    def __init__(self) -> None:
+        super().__init__()
+
+        # Show, movie, or extra descriptors
+        self.title: str | None = None
+        self.year: int | None = None
+        self.season: int | None = None
+        self.episode: int | None = None
+
+        # Media descriptors
+        self.resolution: str | None = None
+        self.codec: str | None = None
+        self.source: str | None = None
+        self.audio: str | None = None
+
+        self.language: str | None = None
+
+        # Booleans to describe if certain patterns have matches, extensible for future use
+        # To add more patterns, add variable, then add pattern to constants.py, then add matching to bottom of MediaExtractor.extract()
+        self.season_patterns: bool = False
+        self.episode_patterns: bool = False
+        self.extras_patterns: bool = False
 
     def __str__(self):
         parts = []
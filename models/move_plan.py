@@ -0,0 +1,38 @@
+from pathlib import Path
+from config.types import PlanFailure
+
+
+class MoveOperation:
+    """
+    Move of one node to staging
+    """
+    __slots__ = (
+        'source',
+        'new_path',
+        'is_dir',
+        'parent',
+        'is_complete',
+        'rename',
+    )
+
+    def __init__(self, source: Path, new_path: Path, is_dir: bool, parent: int = -1, is_complete: bool = False) -> None:
+        self.source: Path = source # Original path of node, or its path after an ancestor directory was renamed
+        self.new_path: Path = new_path # Path of node relative to staging (starting with '/')
+        self.is_dir: bool = is_dir # Directories are created, files are moved
+        self.parent: int = parent # Index of parent directory's operation in plan, -1 for root
+        self.is_complete: bool = is_complete # Directory holds nothing but the planned children (parser dropped no entries)
+        self.rename: bool = False # Directory is renamed with its contents instead of created
+
+
+class MovePlan:
+    """
+    Staging moves of a torrent in tree pre-order, parents before their children
+    """
+    __slots__ = (
+        'operations',
+        'failure',
+    )
+
+    def __init__(self) -> None:
+        self.operations: list[MoveOperation] = []
+        self.failure: PlanFailure | None = None # Set if torrent must be moved to error dir instead
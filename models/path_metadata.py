@@ -1,9 +1,18 @@
 from config.types import FormatType
+from models.compact_model import CompactModel
 
 
-class PathMetadata:
+class PathMetadata(CompactModel):
+    __slots__ = (
+        'is_dir',
+        'is_file',
+        'format_type',
+        'ext',
+    )
+
+    _interned_fields = frozenset({'format_type', 'ext'})
+
     is_dir: bool
     is_file: bool
     format_type: FormatType
     ext: str
-
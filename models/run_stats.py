@@ -0,0 +1,27 @@
+from threading import Lock
+
+
+class RunStats:
+    """
+    Counters of a processing run, safe to update from concurrently processed torrents
+    """
+    __slots__ = (
+        '_counts',
+        '_lock',
+    )
+
+    def __init__(self, *keys: str) -> None:
+        self._counts: dict[str, int] = dict.fromkeys(keys, 0)
+        self._lock = Lock()
+
+    def increment(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[key] += amount
+
+    def __getitem__(self, key: str) -> int:
+        with self._lock:
+            return self._counts[key]
+
+    def as_dict(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
@@ -0,0 +1,17 @@
+from config.types import FormatType
+
+
+class SanitizedName:
+    """
+    Sanitized filename split into parts, with its extension detected once for all extractors
+    """
+    name: str | None = None # Uppercase name with special characters replaced by '.'
+    parts: list[str] # Name parts including ext
+    stem_parts: list[str] # Name parts without ext
+    format_type: FormatType = 'UNKNOWN'
+    ext: str = ''
+
+    def __init__(self, name: str | None = None, parts: list[str] | None = None) -> None:
+        self.name = name
+        self.parts = parts if parts is not None else []
+        self.stem_parts = self.parts
@@ -1,5 +1,23 @@
+import argparse
+import signal
+from threading import Event
 from manager.torrent_manager import TorrentManager
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Stage completed torrents for the media library')
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='keep running and process torrents as their files change (Linux inotify)',
+    )
+    args = parser.parse_args()
+
     manager = TorrentManager()
-    manager.process_torrents()
+    if args.daemon:
+        # Stop between batches rather than in the middle of a move
+        stop = Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        manager.watch(stop)
+    else:
+        manager.process_torrents()
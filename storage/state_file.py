@@ -0,0 +1,27 @@
+import hashlib
+import os
+from pathlib import Path
+
+
+class StateFile:
+    """
+    Files persisting state between runs (parser snapshots, move plans, link manifest)
+    """
+
+    @classmethod
+    def write(cls, path: Path, data: bytes) -> None:
+        """
+        Writes data through a temporary file replacing path, so an interrupted run never leaves a truncated file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def get_key(cls, path: Path) -> str:
+        """
+        Returns file name for state of path, names that are not valid UTF-8 included
+        """
+        return hashlib.sha1(str(path).encode('utf-8', 'surrogateescape')).hexdigest()
@@ -0,0 +1,39 @@
+from extractor.base_extractor import BaseExtractor
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+
+
+def test_video_ext():
+    name = BaseExtractor.sanitize(Path('/downloads/Movie (2020).mkv'))
+    assert name.name == 'MOVIE.2020.MKV'
+    assert name.parts == ['MOVIE', '2020', 'MKV']
+    assert name.stem_parts == ['MOVIE', '2020']
+    assert name.format_type == 'VIDEO'
+    assert name.ext == 'MKV'
+
+def test_subtitle_ext():
+    name = BaseExtractor.sanitize(Path('/downloads/movie.en.srt'))
+    assert name.stem_parts == ['MOVIE', 'EN']
+    assert name.format_type == 'SUBTITLE'
+    assert name.ext == 'SRT'
+
+def test_unknown_ext():
+    name = BaseExtractor.sanitize(Path('/downloads/movie.nfo'))
+    assert name.stem_parts == ['MOVIE', 'NFO']
+    assert name.format_type == 'UNKNOWN'
+    assert name.ext == ''
+
+def test_only_last_part_is_ext():
+    name = BaseExtractor.sanitize(Path('/downloads/movie.mkv.part'))
+    assert name.format_type == 'UNKNOWN'
+
+def test_empty_name():
+    name = BaseExtractor.sanitize(Path('/downloads/___'))
+    assert name.name is None
+    assert name.parts == []
+    assert name.format_type == 'UNKNOWN'
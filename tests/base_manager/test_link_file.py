@@ -0,0 +1,54 @@
+from manager.base_manager import BaseManager
+from manager.link_manifest import LinkManifest
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def manager_paths(mocker, tmp_path):
+    mocker.patch('manager.base_manager.Logger.get_logger', return_value=Mock())
+    mocker.patch.object(BaseManager, '_logger', None)
+    mocker.patch.object(BaseManager, '_dry_run', False)
+    mocker.patch.object(BaseManager, '_staging_path', tmp_path / 'staging')
+    mocker.patch.object(BaseManager, '_media_path', tmp_path / 'media')
+    mocker.patch.object(BaseManager, '_link_manifest', LinkManifest(tmp_path / 'links.json'))
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'downloads' / 'Movie.2020.mkv'
+    path.parent.mkdir()
+    path.write_text('movie')
+    return path
+
+def test_link_keeps_original(tmp_path, source):
+    dest = tmp_path / 'staging' / 'Movie.2020' / 'Movie.2020.mkv'
+
+    assert BaseManager._link_file(source, dest)
+    assert source.exists()
+    assert dest.stat().st_ino == source.stat().st_ino
+
+def test_find_linked_by_inode(tmp_path, source):
+    assert BaseManager._find_linked(source) is None
+
+    dest = tmp_path / 'staging' / 'Movie.2020.mkv'
+    BaseManager._link_file(source, dest)
+    BaseManager._link_manifest.add(source, [dest])
+    assert BaseManager._find_linked(source) == dest
+
+def test_find_link_moved_to_library(tmp_path, source):
+    dest = tmp_path / 'staging' / 'Movie.2020.mkv'
+    BaseManager._link_file(source, dest)
+    BaseManager._link_manifest.add(source, [dest])
+
+    # Moved into the library by the media server, found without scanning the library
+    library_path = tmp_path / 'media' / 'movies' / 'Movie.2020.mkv'
+    library_path.parent.mkdir(parents=True)
+    dest.rename(library_path)
+    assert BaseManager._find_linked(source) == dest
+
+def test_deleted_link_not_found(tmp_path, source):
+    dest = tmp_path / 'staging' / 'Movie.2020.mkv'
+    BaseManager._link_file(source, dest)
+    BaseManager._link_manifest.add(source, [dest])
+    dest.unlink()
+
+    assert BaseManager._find_linked(source) is None
@@ -0,0 +1,37 @@
+from manager.base_manager import BaseManager
+from manager.staging_index import StagingIndex
+import pytest
+
+@pytest.fixture(autouse=True)
+def staging_index(mocker):
+    mocker.patch.object(BaseManager, '_staging_index', StagingIndex())
+
+
+def test_reserved_path_not_reused(tmp_path):
+    path = tmp_path / 'Show.S01E01.mkv'
+
+    assert BaseManager._reserve_path(path) == path
+    assert BaseManager._reserve_path(path) == tmp_path / 'Show.S01E01_1.mkv'
+
+def test_existing_path_not_reused(tmp_path):
+    path = tmp_path / 'Show.S01E01.mkv'
+    path.write_text('')
+
+    assert BaseManager._reserve_path(path) == tmp_path / 'Show.S01E01_1.mkv'
+
+def test_moved_away_path_reused(mocker, tmp_path):
+    mocker.patch.object(BaseManager, '_dry_run', False)
+    mocker.patch('manager.base_manager.Logger.get_logger')
+    mocker.patch.object(BaseManager, '_logger', None)
+    path = tmp_path / 'Show.S01E01.mkv'
+    path.write_text('')
+    BaseManager._reserve_path(path)
+
+    assert BaseManager._copy_file(path, tmp_path / 'moved' / path.name)
+    assert BaseManager._reserve_path(path) == path
+
+def test_exact_path(tmp_path):
+    path = tmp_path / 'Show'
+
+    assert BaseManager._reserve_exact_path(path)
+    assert not BaseManager._reserve_exact_path(path)
@@ -0,0 +1,14 @@
+from manager.base_manager import BaseManager
+import builtins
+
+
+def test_current_rss_read():
+    rss = BaseManager._get_rss()
+
+    assert rss > 0
+    assert rss % 4096 == 0
+
+def test_current_rss_without_proc(mocker):
+    mocker.patch.object(builtins, 'open', side_effect=FileNotFoundError)
+
+    assert BaseManager._get_rss() == 0
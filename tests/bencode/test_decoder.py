@@ -0,0 +1,48 @@
+from client.bencode import BencodeDecoder, BencodeError
+import io
+import pytest
+
+def decode(data: bytes, skip=frozenset()):
+    return BencodeDecoder(io.BytesIO(data), skip).decode()
+
+
+def test_values_decoded():
+    assert decode(b'd4:listli1ei-20e3:abce4:name5:Movie4:sizei0ee') == {
+        b'list': [1, -20, b'abc'],
+        b'name': b'Movie',
+        b'size': 0,
+    }
+
+def test_strings_longer_than_buffer():
+    payload = b'x' * (200 * 1024)
+
+    assert decode(b'l' + str(len(payload)).encode() + b':' + payload + b'i7ee') == [payload, 7]
+
+@pytest.mark.parametrize('seekable', [True, False])
+def test_skipped_key_paths_not_kept(seekable):
+    data = b'd4:infod6:lengthi5e6:pieces100000:' + b'h' * 100000 + b'e6:piecesl1:xee'
+    stream = io.BytesIO(data)
+    if not seekable:
+        stream.seekable = lambda: False
+
+    # Only the path given is skipped, same key elsewhere is kept
+    assert BencodeDecoder(stream, frozenset({(b'info', b'pieces')})).decode() == {
+        b'info': {b'length': 5},
+        b'pieces': [b'x'],
+    }
+
+@pytest.mark.parametrize('data', [
+    b'd4:name5:Mov',
+    b'li1e',
+    b'i12x',
+    b'x',
+    b'',
+    b'd4:infod6:pieces9:abc',
+])
+def test_malformed_data_rejected(data):
+    with pytest.raises(BencodeError):
+        decode(data, frozenset({(b'info', b'pieces')}))
+
+def test_deep_nesting_rejected():
+    with pytest.raises(BencodeError):
+        decode(b'l' * 1000 + b'e' * 1000)
@@ -0,0 +1,64 @@
+from models.child_stats import ChildStats
+from classifier.node_classifier import NodeClassifier
+from models.media_metadata import MediaMetadata
+from models.path_metadata import PathMetadata
+from tree.node import Node
+from pathlib import Path
+
+
+def create_node(name: str, is_dir: bool, format_type: str = 'UNKNOWN', season: int | None = None, episode: int | None = None) -> Node:
+    media_metadata = MediaMetadata()
+    media_metadata.season = season
+    media_metadata.episode = episode
+
+    path_metadata = PathMetadata()
+    path_metadata.is_dir = is_dir
+    path_metadata.is_file = not is_dir
+    path_metadata.format_type = format_type
+    path_metadata.ext = ''
+
+    return Node(Path('/') / name, media_metadata, path_metadata)
+
+def test_counts_files_by_format():
+    stats = ChildStats.from_children([
+        create_node('video', False, 'VIDEO'),
+        create_node('video', False, 'VIDEO'),
+        create_node('subtitle', False, 'SUBTITLE'),
+        create_node('other', False),
+    ])
+
+    assert stats.num_video == 2
+    assert stats.num_subtitle == 1
+    assert stats.num_season_dir == 0
+
+def test_counts_season_dirs_with_video():
+    season_dir = create_node('season', True, season=1)
+    season_dir.children_nodes = [create_node('video', False, 'VIDEO')]
+    empty_season_dir = create_node('season', True, season=2)
+    empty_season_dir.children_nodes = [create_node('subtitle', False, 'SUBTITLE')]
+    episode_dir = create_node('episode', True, season=1, episode=1)
+    episode_dir.children_nodes = [create_node('video', False, 'VIDEO')]
+
+    stats = ChildStats.from_children([season_dir, empty_season_dir, episode_dir])
+
+    assert stats.num_season_dir == 1
+    assert stats.num_video == 0
+
+def test_node_stats_computed_once():
+    node = create_node('dir', True)
+    node.children_nodes = [create_node('video', False, 'VIDEO')]
+
+    stats = node.get_child_stats()
+    node.children_nodes = []
+    assert node.get_child_stats() is stats
+    assert stats.num_video == 1
+
+def test_season_dirs_counted_as_classified():
+    nodes = []
+    for season, episode, child_format in [(1, None, 'VIDEO'), (2, None, 'SUBTITLE'), (1, 1, 'VIDEO'), (None, None, 'VIDEO')]:
+        node = create_node('dir', True, season=season, episode=episode)
+        node.children_nodes = [create_node('child', False, child_format)]
+        nodes.append(node)
+
+    assert [NodeClassifier._is_season_dir(node) for node in nodes] == [True, False, False, False]
+    assert ChildStats.from_children(nodes).num_season_dir == 1
@@ -0,0 +1,154 @@
+from manager.copy_engine import CopyEngine
+from unittest.mock import Mock
+import errno
+import mmap
+import os
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('manager.copy_engine.Logger.get_logger', return_value=Mock())
+    mocker.patch('manager.copy_engine.COPY_CHUNK_SIZE', 1000)
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'Movie.2020.mkv'
+    path.write_bytes(os.urandom(4500))
+    os.utime(path, (1_000_000, 1_000_000))
+    return path
+
+def test_copies_data_and_metadata(tmp_path, source):
+    dest = tmp_path / 'dest.mkv'
+    assert CopyEngine.copy(source, dest) == dest
+
+    assert dest.read_bytes() == source.read_bytes()
+    assert dest.stat().st_mtime == source.stat().st_mtime
+
+def test_copies_into_directory(tmp_path, source):
+    dest_dir = tmp_path / 'dest'
+    dest_dir.mkdir()
+    CopyEngine.copy(source, dest_dir)
+
+    assert (dest_dir / source.name).read_bytes() == source.read_bytes()
+
+def test_empty_file(tmp_path):
+    source = tmp_path / 'empty.srt'
+    source.write_bytes(b'')
+    CopyEngine.copy(source, tmp_path / 'dest.srt')
+
+    assert (tmp_path / 'dest.srt').read_bytes() == b''
+
+@pytest.mark.parametrize('unsupported, method', [
+    ([], 'copy_file_range'),
+    (['_copy_file_range'], 'sendfile'),
+    (['_copy_file_range', '_sendfile'], 'buffered'),
+])
+def test_falls_back_to_next_method(mocker, tmp_path, source, unsupported, method):
+    mocker.patch.object(CopyEngine, '_reflink', return_value=False)
+    for name in unsupported:
+        mocker.patch.object(CopyEngine, name, side_effect=OSError(errno.EXDEV, 'Cross-device link'))
+
+    with open(source, 'rb') as source_file, open(tmp_path / 'dest.mkv', 'wb') as dest_file:
+        assert CopyEngine._copy_data(source_file.fileno(), dest_file.fileno(), 4500, source.name, 0) == method
+
+    assert (tmp_path / 'dest.mkv').read_bytes() == source.read_bytes()
+
+def test_other_errors_not_retried(mocker, tmp_path, source):
+    mocker.patch.object(CopyEngine, '_reflink', return_value=False)
+    mocker.patch.object(CopyEngine, '_copy_file_range', side_effect=OSError(errno.ENOSPC, 'No space left on device'))
+    sendfile = mocker.patch.object(CopyEngine, '_sendfile')
+
+    with pytest.raises(OSError):
+        CopyEngine.copy(source, tmp_path / 'dest.mkv')
+    sendfile.assert_not_called()
+
+def test_dontneed_drops_every_chunk(mocker, tmp_path, source):
+    mocker.patch.object(CopyEngine, '_reflink', return_value=False)
+    drop_cache = mocker.spy(CopyEngine, '_drop_cache')
+    CopyEngine.copy(source, tmp_path / 'dest.mkv', cache_mode='dontneed')
+
+    assert (tmp_path / 'dest.mkv').read_bytes() == source.read_bytes()
+    # Chunks are page aligned, so every dropped range but the last starts and ends on a page boundary
+    ranges = [(call.args[2], call.args[3]) for call in drop_cache.call_args_list]
+    assert sum(length for _, length in ranges) == source.stat().st_size
+    assert all(offset % mmap.PAGESIZE == 0 for offset, _ in ranges)
+
+def test_io_priority_restored(mocker, tmp_path, source):
+    mocker.patch('manager.copy_engine.COPY_IO_PRIORITY', 'idle')
+    libc = mocker.patch('manager.copy_engine.ctypes.CDLL').return_value
+    libc.syscall.side_effect = lambda number, *args: 4 if len(args) == 2 else 0
+    mocker.patch('manager.copy_engine.platform.machine', return_value='x86_64')
+    CopyEngine.copy(source, tmp_path / 'dest.mkv')
+
+    set_calls = [call.args for call in libc.syscall.call_args_list if len(call.args) == 4]
+    assert [args[3] for args in set_calls] == [3 << 13, 4]
+
+def test_copies_throttled_and_counted(mocker, tmp_path, source):
+    mocker.patch.object(CopyEngine, '_reflink', return_value=False)
+    consume = mocker.patch.object(CopyEngine._throttle, 'consume', return_value=0.5)
+    CopyEngine.reset_stats()
+    CopyEngine.copy(source, tmp_path / 'dest.mkv')
+
+    assert sum(call.args[0] for call in consume.call_args_list) == source.stat().st_size
+    stats = CopyEngine.get_stats()
+    assert stats['files_copied'] == 1
+    assert stats['bytes_copied'] == source.stat().st_size
+    assert stats['throttled_seconds'] == 0.5 * consume.call_count
+    assert stats['copy_seconds'] > 0
+
+def test_throttled_chunks_capped_to_rate(mocker):
+    mocker.patch('manager.copy_engine.COPY_CHUNK_SIZE', 64 * 2**20)
+
+    assert CopyEngine._get_chunk_size(0) == 64 * 2**20
+    chunk_size = CopyEngine._get_chunk_size(50 * 10**6)
+    assert chunk_size <= 50 * 10**6 // 4 and chunk_size % mmap.PAGESIZE == 0
+
+@pytest.mark.parametrize('zero_methods, method', [
+    (['_copy_file_range'], 'sendfile'),
+    (['_copy_file_range', '_sendfile'], 'buffered'),
+])
+def test_no_data_copied_falls_back(mocker, tmp_path, source, zero_methods, method):
+    mocker.patch.object(CopyEngine, '_reflink', return_value=False)
+    for name in zero_methods:
+        mocker.patch.object(CopyEngine, name, return_value=0)
+
+    with open(source, 'rb') as source_file, open(tmp_path / 'dest.mkv', 'wb') as dest_file:
+        assert CopyEngine._copy_data(source_file.fileno(), dest_file.fileno(), 4500, source.name, 0) == method
+
+    assert (tmp_path / 'dest.mkv').read_bytes() == source.read_bytes()
+
+def test_short_copy_fails(mocker, tmp_path, source):
+    mocker.patch.object(CopyEngine, '_reflink', return_value=False)
+    # Stops after the first chunk
+    mocker.patch.object(CopyEngine, '_copy_file_range', side_effect=[1000, 0])
+    sendfile = mocker.patch.object(CopyEngine, '_sendfile')
+
+    with pytest.raises(OSError):
+        CopyEngine.copy(source, tmp_path / 'dest.mkv')
+    sendfile.assert_not_called()
+
+def test_preallocated_with_fallocate(mocker, tmp_path, source):
+    mocker.patch.object(CopyEngine, '_reflink', return_value=False)
+    posix_fallocate = mocker.patch('manager.copy_engine.os.posix_fallocate')
+    fallocate = mocker.patch('manager.copy_engine._fallocate', return_value=0)
+    CopyEngine.copy(source, tmp_path / 'dest.mkv')
+
+    assert (tmp_path / 'dest.mkv').read_bytes() == source.read_bytes()
+    assert fallocate.call_args.args[1:] == (0, 0, source.stat().st_size)
+    posix_fallocate.assert_not_called()
+
+@pytest.mark.parametrize('error, fails', [
+    (errno.EOPNOTSUPP, False),
+    (errno.ENOSPC, True),
+])
+def test_unsupported_preallocation_skipped(mocker, tmp_path, source, error, fails):
+    mocker.patch.object(CopyEngine, '_reflink', return_value=False)
+    mocker.patch('manager.copy_engine._fallocate', return_value=-1)
+    mocker.patch('manager.copy_engine.ctypes.get_errno', return_value=error)
+
+    if fails:
+        with pytest.raises(OSError):
+            CopyEngine.copy(source, tmp_path / 'dest.mkv')
+    else:
+        CopyEngine.copy(source, tmp_path / 'dest.mkv')
+        assert (tmp_path / 'dest.mkv').read_bytes() == source.read_bytes()
@@ -0,0 +1,86 @@
+from manager.inotify_watcher import InotifyWatcher
+import os
+import pytest
+
+@pytest.fixture
+def watcher(tmp_path):
+    watcher = InotifyWatcher(tmp_path)
+    yield watcher
+    watcher.close()
+
+
+def test_no_events(watcher):
+    assert watcher.read(timeout=0) == set()
+
+def test_written_file_reported(tmp_path, watcher):
+    (tmp_path / 'Movie.2020.mkv').write_text('movie')
+
+    assert watcher.read(timeout=1) == {tmp_path / 'Movie.2020.mkv'}
+
+def test_nested_changes_reported_as_top_level(tmp_path):
+    (tmp_path / 'Show.S01' / 'Extras').mkdir(parents=True)
+    watcher = InotifyWatcher(tmp_path)
+    try:
+        (tmp_path / 'Show.S01' / 'Extras' / 'Featurette.mkv').write_text('extra')
+
+        assert watcher.read(timeout=1) == {tmp_path / 'Show.S01'}
+    finally:
+        watcher.close()
+
+def test_created_directories_watched(tmp_path, watcher):
+    (tmp_path / 'Show.S01').mkdir()
+    assert watcher.read(timeout=1) == {tmp_path / 'Show.S01'}
+
+    (tmp_path / 'Show.S01' / 'Show.S01E01.mkv').write_text('episode')
+
+    assert watcher.read(timeout=1) == {tmp_path / 'Show.S01'}
+
+def test_moved_in_tree_watched(tmp_path, watcher):
+    outside = tmp_path.parent / (tmp_path.name + '_incomplete')
+    (outside / 'Season 1').mkdir(parents=True)
+    os.rename(outside, tmp_path / 'Show')
+    assert watcher.read(timeout=1) == {tmp_path / 'Show'}
+
+    (tmp_path / 'Show' / 'Season 1' / 'Show.S01E01.mkv').write_text('episode')
+
+    assert watcher.read(timeout=1) == {tmp_path / 'Show'}
+
+def test_moved_out_directories_unwatched(tmp_path, watcher):
+    (tmp_path / 'Show.S01').mkdir()
+    watcher.read(timeout=1)
+    watches = watcher.get_num_watches()
+
+    staged = tmp_path.parent / (tmp_path.name + '_staged')
+    os.rename(tmp_path / 'Show.S01', staged)
+    watcher.read(timeout=1)
+    (staged / 'Show.S01E01.mkv').write_text('episode')
+
+    assert watcher.read(timeout=0.1) == set()
+    assert watcher.get_num_watches() == watches - 1
+
+def test_writes_to_open_file_reported(tmp_path):
+    (tmp_path / 'Show.S01').mkdir()
+    watcher = InotifyWatcher(tmp_path)
+    try:
+        # Downloading file stays open, so it is never closed after a write
+        with open(tmp_path / 'Show.S01' / 'Show.S01E01.mkv', 'wb', buffering=0) as file:
+            file.write(b'piece')
+            assert watcher.read(timeout=1) == {tmp_path / 'Show.S01'}
+
+            for _ in range(100):
+                file.write(b'piece')
+            assert watcher.read(timeout=1) == {tmp_path / 'Show.S01'}
+    finally:
+        watcher.close()
+
+def test_overflow_watches_missed_directories(mocker, tmp_path, watcher):
+    # Creation of the directories is lost in the overflow
+    mocker.patch.object(watcher, '_handle_events', return_value=True)
+    (tmp_path / 'Show.S01' / 'Season 1').mkdir(parents=True)
+    assert watcher.read(timeout=1) == {tmp_path / 'Show.S01'}
+    mocker.stopall()
+
+    (tmp_path / 'Show.S01' / 'Season 1' / 'Show.S01E01.mkv').write_text('episode')
+
+    assert watcher.read(timeout=1) == {tmp_path / 'Show.S01'}
+    assert watcher.get_num_watches() == 3
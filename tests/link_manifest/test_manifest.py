@@ -0,0 +1,64 @@
+import json
+from manager.link_manifest import LinkManifest
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('manager.link_manifest.Logger.get_logger', return_value=Mock())
+
+
+def test_add_and_reload(tmp_path):
+    manifest_path = tmp_path / 'links.json'
+    LinkManifest(manifest_path).add(Path('/downloads/Movie'), [Path('/staging/Movie/Movie.mkv')])
+
+    manifest = LinkManifest(manifest_path)
+    assert manifest.get_torrent_paths() == [Path('/downloads/Movie')]
+
+def test_remove(tmp_path):
+    manifest_path = tmp_path / 'links.json'
+    manifest = LinkManifest(manifest_path)
+    manifest.add(Path('/downloads/Movie'), [Path('/staging/Movie/Movie.mkv')])
+    manifest.add(Path('/downloads/Show'), [Path('/staging/Show/S01/Show.S01.E001.mkv')])
+    manifest.remove(Path('/downloads/Movie'))
+
+    assert LinkManifest(manifest_path).get_torrent_paths() == [Path('/downloads/Show')]
+
+def test_missing_manifest_is_empty(tmp_path):
+    assert LinkManifest(tmp_path / 'links.json').get_torrent_paths() == []
+
+@pytest.mark.parametrize('content', ['{"/downloads/Movie": ["/staging/Mo', '["/downloads/Movie"]'])
+def test_corrupt_manifest_moved_aside(tmp_path, content):
+    manifest_path = tmp_path / 'links.json'
+    manifest_path.write_text(content)
+
+    assert LinkManifest(manifest_path).get_torrent_paths() == []
+    assert (tmp_path / 'links.json.corrupt').read_text() == content
+    assert not manifest_path.exists()
+
+def test_inodes_indexed_and_reloaded(tmp_path):
+    staged = tmp_path / 'staging' / 'Movie.mkv'
+    staged.parent.mkdir()
+    staged.write_text('movie')
+    staged_stat = staged.stat()
+    manifest_path = tmp_path / 'links.json'
+    LinkManifest(manifest_path).add(Path('/downloads/Movie'), [staged])
+
+    manifest = LinkManifest(manifest_path)
+    assert manifest.find_linked(staged_stat.st_dev, staged_stat.st_ino) == staged
+
+    manifest.remove(Path('/downloads/Movie'))
+    assert manifest.find_linked(staged_stat.st_dev, staged_stat.st_ino) is None
+
+def test_paths_only_manifest_migrated(tmp_path):
+    staged = tmp_path / 'staging' / 'Movie.mkv'
+    staged.parent.mkdir()
+    staged.write_text('movie')
+    manifest_path = tmp_path / 'links.json'
+    manifest_path.write_text(json.dumps({'/downloads/Movie': [str(staged), str(tmp_path / 'gone.mkv')]}))
+
+    manifest = LinkManifest(manifest_path)
+
+    assert manifest.find_linked(staged.stat().st_dev, staged.stat().st_ino) == staged
+    assert json.loads(manifest_path.read_text())['/downloads/Movie'][1] == [str(tmp_path / 'gone.mkv'), None, None]
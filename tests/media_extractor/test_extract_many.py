@@ -0,0 +1,46 @@
+from extractor.media_extractor import MediaExtractor
+from extractor.metadata_cache import MetadataCache
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+
+@pytest.fixture(autouse=True)
+def empty_cache(mocker):
+    mocker.patch.object(MediaExtractor, '_cache', MetadataCache(16))
+
+@pytest.fixture
+def paths():
+    return [
+        Path('/downloads/Show.S01E01.1080p.mkv'),
+        Path('/downloads/Show.S01E02.1080p.mkv'),
+        Path('/downloads/Show S01E01 1080p.mkv'),
+        Path('/downloads/Movie.2020.srt'),
+    ]
+
+
+def test_in_process_batch(paths):
+    metadata = MediaExtractor.extract_many(paths)
+    assert [m.episode for m in metadata] == [1, 2, 1, None]
+    assert metadata[3].year == 2020
+
+def test_same_name_extracted_once(paths):
+    metadata = MediaExtractor.extract_many(paths)
+    assert metadata[0] is metadata[2]
+    assert MediaExtractor.get_cache_stats()['size'] == 3
+
+def test_process_pool_batch(mocker, paths):
+    mocker.patch('extractor.base_extractor.EXTRACTION_PROCESS_THRESHOLD', 0)
+    mocker.patch('extractor.base_extractor.EXTRACTION_PROCESS_WORKERS', 2)
+
+    metadata = MediaExtractor.extract_many(paths)
+    assert [str(m) for m in metadata] == ['Show.S01.E001.1080p', 'Show.S01.E002.1080p', 'Show.S01.E001.1080p', 'Movie.2020']
+
+def test_batch_uses_cache(paths):
+    first = MediaExtractor.extract_metadata(paths[0])
+    metadata = MediaExtractor.extract_many(paths)
+    assert metadata[0] is first
+    assert MediaExtractor.get_cache_stats()['hits'] == 2
@@ -0,0 +1,43 @@
+from models.media_metadata import MediaMetadata
+import pickle
+import pytest
+
+
+def test_mutable_before_freeze():
+    metadata = MediaMetadata()
+    metadata.title = 'TITLE'
+    assert metadata.title == 'TITLE'
+
+def test_frozen_metadata_cannot_be_modified():
+    metadata = MediaMetadata()
+    metadata.title = 'TITLE'
+    metadata.freeze()
+
+    with pytest.raises(AttributeError):
+        metadata.title = 'OTHER'
+    assert metadata.title == 'TITLE'
+
+def test_freeze_returns_metadata():
+    metadata = MediaMetadata()
+    assert metadata.freeze() is metadata
+
+def test_frozen_metadata_can_be_pickled():
+    metadata = MediaMetadata()
+    metadata.title = 'TITLE'
+    metadata.resolution = '1080P'
+    metadata.freeze()
+
+    copy = pickle.loads(pickle.dumps(metadata))
+    assert copy.title == 'TITLE'
+    assert copy.resolution is metadata.resolution
+    with pytest.raises(AttributeError):
+        copy.title = 'OTHER'
+
+def test_categorical_values_are_interned():
+    first, second = MediaMetadata(), MediaMetadata()
+    first.codec = ''.join(['X', '265'])
+    second.codec = ''.join(['X2', '65'])
+    assert first.codec is second.codec
+
+def test_no_instance_dict():
+    assert not hasattr(MediaMetadata(), '__dict__')
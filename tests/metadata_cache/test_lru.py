@@ -0,0 +1,39 @@
+from extractor.metadata_cache import MetadataCache
+
+
+def test_hit_and_miss():
+    cache = MetadataCache(2)
+    assert cache.get('A') is None
+    cache.put('A', 1)
+    assert cache.get('A') == 1
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+def test_evicts_least_recently_used():
+    cache = MetadataCache(2)
+    cache.put('A', 1)
+    cache.put('B', 2)
+    cache.get('A')
+    cache.put('C', 3)
+
+    assert cache.get('B') is None
+    assert cache.get('A') == 1
+    assert cache.get('C') == 3
+    assert cache.evictions == 1
+
+def test_zero_capacity_disables_cache():
+    cache = MetadataCache(0)
+    cache.put('A', 1)
+    assert cache.get('A') is None
+    assert cache.get_stats()['size'] == 0
+
+def test_stats():
+    cache = MetadataCache(1)
+    cache.put('A', 1)
+    cache.get('A')
+    cache.get('B')
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+    assert stats['capacity'] == 1
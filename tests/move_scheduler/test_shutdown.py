@@ -0,0 +1,32 @@
+from manager.move_scheduler import MoveScheduler
+from pathlib import Path
+from threading import current_thread, enumerate as enumerate_threads
+
+
+def _move_threads():
+    return [thread for thread in enumerate_threads() if thread.name.startswith('move-1-2')]
+
+def test_shutdown_stops_copy_threads(mocker):
+    mocker.patch.object(MoveScheduler, '_get_devices', return_value=(1, 2))
+    scheduler = MoveScheduler(2)
+    futures = [scheduler.submit(Path('/source'), Path('/dest'), current_thread) for _ in range(4)]
+
+    scheduler.shutdown()
+
+    assert all(future.done() for future in futures)
+    assert not _move_threads()
+    # Device pairs of earlier copies are still counted
+    assert scheduler.get_stats() == {'renames': 0, 'copies': 4, 'device_pairs': 1}
+
+def test_copies_after_shutdown_use_new_queue(mocker):
+    mocker.patch.object(MoveScheduler, '_get_devices', return_value=(1, 2))
+    scheduler = MoveScheduler(1)
+    first = scheduler.submit(Path('/source'), Path('/dest'), current_thread).result()
+    scheduler.shutdown()
+
+    second = scheduler.submit(Path('/source'), Path('/dest'), current_thread).result()
+    scheduler.shutdown()
+
+    assert second is not first
+    assert not _move_threads()
+    assert scheduler.get_stats() == {'renames': 0, 'copies': 2, 'device_pairs': 1}
@@ -0,0 +1,48 @@
+from manager.move_scheduler import MoveScheduler
+from pathlib import Path
+from threading import Lock, current_thread
+import time
+
+
+def test_same_device_move_runs_immediately(tmp_path):
+    source = tmp_path / 'source.mkv'
+    source.write_text('')
+    scheduler = MoveScheduler(1)
+
+    future = scheduler.submit(source, tmp_path / 'dest.mkv', lambda: current_thread())
+
+    assert future.done()
+    assert future.result() is current_thread()
+    assert scheduler.get_stats() == {'renames': 1, 'copies': 0, 'device_pairs': 0}
+
+def test_cross_device_moves_limited_per_device_pair(mocker):
+    mocker.patch.object(MoveScheduler, '_get_devices', return_value=(1, 2))
+    scheduler = MoveScheduler(2)
+    lock = Lock()
+    running = [0]
+    max_running = [0]
+
+    def move():
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return current_thread()
+
+    futures = [scheduler.submit(Path('/source'), Path('/dest'), move) for _ in range(8)]
+
+    assert all(future.result() is not current_thread() for future in futures)
+    assert max_running[0] <= 2
+    assert scheduler.get_stats() == {'renames': 0, 'copies': 8, 'device_pairs': 1}
+
+def test_move_exception_set_on_future(tmp_path):
+    source = tmp_path / 'source.mkv'
+    source.write_text('')
+
+    def move():
+        raise OSError('failed')
+
+    future = MoveScheduler(1).submit(source, tmp_path / 'dest.mkv', move)
+    assert isinstance(future.exception(), OSError)
@@ -17,3 +17,14 @@ def test_init(mocker):
     assert node.parent_node is None
     assert not node.children_nodes
     assert node.classification == 'UNKNOWN'
+
+def test_children_not_shared(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+
+    mocker.patch('tree.node.MediaExtractor.extract_metadata', return_value=Mock())
+    mocker.patch('tree.node.PathExtractor.extract_metadata', return_value=Mock())
+    first, second = Node(Path('/first')), Node(Path('/second'))
+    first.children_nodes.append(second)
+
+    assert not second.children_nodes
+    assert not hasattr(first, '__dict__')
@@ -0,0 +1,32 @@
+from tree.node import Node
+from pathlib import Path
+from unittest.mock import Mock
+import weakref
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def mock_extractors(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+    mocker.patch('tree.node.MediaExtractor.extract_metadata', return_value=Mock())
+    mocker.patch('tree.node.PathExtractor.extract_metadata', return_value=Mock())
+
+def test_parent_node():
+    parent, child = Node(Path('/parent')), Node(Path('/parent/child'))
+    child.parent_node = parent
+    parent.children_nodes.append(child)
+
+    assert child.parent_node is parent
+
+    child.parent_node = None
+    assert child.parent_node is None
+
+def test_tree_freed_without_cyclic_gc():
+    parent, child = Node(Path('/parent')), Node(Path('/parent/child'))
+    child.parent_node = parent
+    parent.children_nodes.append(child)
+    parent_ref = weakref.ref(parent)
+
+    del parent
+    assert parent_ref() is None
+    assert child.parent_node is None
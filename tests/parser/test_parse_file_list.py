@@ -0,0 +1,60 @@
+from tree.parser import Parser
+from tree.node import Node
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+
+FILES = [
+    'Show.S01-S02/Season 1/Show.S01E01.mkv',
+    'Show.S01-S02/Season 1/Show.S01E01.en.srt',
+    'Show.S01-S02/Season 1/notes.txt',
+    'Show.S01-S02/Season 2/Show.S02E01.mkv',
+    'Show.S01-S02/Empty/readme.nfo',
+    'Show.S01-S02/info.nfo',
+]
+
+def _as_tuple(node: Node):
+    return (
+        node.original_path,
+        node.path_metadata.is_dir,
+        node.path_metadata.format_type,
+        node.media_metadata.season,
+        node.parent_node.original_path if node.parent_node else None,
+        sorted(_as_tuple(child) for child in node.children_nodes),
+    )
+
+
+def test_same_tree_as_disk(tmp_path):
+    for file in FILES:
+        path = tmp_path / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(file)
+    disk_tree = Parser.process_nodes_scandir(tmp_path / 'Show.S01-S02')
+
+    # Payload not downloaded yet
+    for path in sorted((tmp_path / 'Show.S01-S02').rglob('*'), reverse=True):
+        path.unlink() if path.is_file() else path.rmdir()
+    file_list_tree = Parser.parse_file_list(tmp_path / 'Show.S01-S02', [tmp_path / file for file in FILES])
+
+    assert _as_tuple(file_list_tree) == _as_tuple(disk_tree)
+
+def test_dropped_entries_unknown():
+    head = Parser.parse_file_list(Path('/downloads/Show.S01'), [
+        Path('/downloads/Show.S01/Show.S01E01.mkv'),
+        Path('/downloads/Show.S01/Subs/Show.S01E01.srt'),
+    ])
+
+    assert all(node.get_child_stats().num_filtered is None for node in head.iter_tree() if node.path_metadata.is_dir)
+    assert [node.original_path.name for node in head.iter_tree()] == ['Show.S01', 'Show.S01E01.mkv', 'Subs', 'Show.S01E01.srt']
+
+def test_single_file():
+    path = Path('/downloads/Movie.2020.1080p.mkv')
+
+    head = Parser.parse_file_list(path, [path])
+
+    assert head.path_metadata.is_file and head.path_metadata.format_type == 'VIDEO'
+    assert Parser.parse_file_list(Path('/downloads/notes.txt'), [Path('/downloads/notes.txt')]) is None
@@ -0,0 +1,105 @@
+from tree.parser import Parser
+from tree.node import Node
+from pathlib import Path
+from unittest.mock import Mock
+import inspect
+import sys
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+
+@pytest.fixture
+def torrent_path(tmp_path):
+    files = [
+        'Show.S01-S02/Season 1/Show.S01E01.mkv',
+        'Show.S01-S02/Season 1/Show.S01E01.en.srt',
+        'Show.S01-S02/Season 1/notes.txt',
+        'Show.S01-S02/Season 2/Show.S02E01.mkv',
+        'Show.S01-S02/Empty/readme.nfo',
+        'Show.S01-S02/info.nfo',
+    ]
+    for file in files:
+        path = tmp_path / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(file)
+    return tmp_path / 'Show.S01-S02'
+
+def _as_tuple(node: Node):
+    return (
+        node.original_path,
+        node.path_metadata.is_dir,
+        node.path_metadata.format_type,
+        node.parent_node.original_path if node.parent_node else None,
+        sorted(_as_tuple(child) for child in node.children_nodes),
+    )
+
+
+def test_same_tree_as_walk(torrent_path):
+    walk_tree = Parser.process_nodes(None, torrent_path)
+    scandir_tree = Parser.process_nodes_scandir(torrent_path)
+    assert _as_tuple(scandir_tree) == _as_tuple(walk_tree)
+
+def test_filters_unknown_files_and_empty_dirs(torrent_path):
+    head = Parser.process_nodes_scandir(torrent_path)
+    names = sorted(child.original_path.name for child in head.children_nodes)
+    assert names == ['Season 1', 'Season 2']
+
+    season_1 = next(child for child in head.children_nodes if child.original_path.name == 'Season 1')
+    assert sorted(child.original_path.name for child in season_1.children_nodes) == ['Show.S01E01.en.srt', 'Show.S01E01.mkv']
+
+def test_child_stats_counted_while_parsing(torrent_path):
+    head = Parser.process_nodes_scandir(torrent_path)
+    season_1 = next(child for child in head.children_nodes if child.original_path.name == 'Season 1')
+
+    assert head.child_stats is not None and head.child_stats.num_season_dir == 2
+    assert season_1.child_stats is not None and season_1.child_stats.num_video == 1
+    assert season_1.child_stats.num_subtitle == 1
+
+def test_file_types_not_stated(mocker, torrent_path):
+    is_dir = mocker.spy(Path, 'is_dir')
+    is_file = mocker.spy(Path, 'is_file')
+    Parser.process_nodes_scandir(torrent_path)
+
+    # Only the root path is stat'ed, children use directory entry types
+    assert is_dir.call_count == 1
+    assert is_file.call_count == 1
+
+def test_single_file(torrent_path):
+    path = torrent_path / 'Season 1' / 'Show.S01E01.mkv'
+    assert Parser.process_nodes_scandir(path).original_path == path
+    assert Parser.process_nodes_scandir(torrent_path / 'info.nfo') is None
+
+def test_deep_tree(tmp_path):
+    # Lower recursion limit to just above current stack, tree is deeper than the limit
+    depth = 200
+    recursion_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack()) + 100)
+
+    leaf = tmp_path / 'Deep'
+    leaf.mkdir()
+    try:
+        for _ in range(depth):
+            leaf = leaf / 'd'
+            leaf.mkdir()
+        (leaf / 'Movie.mkv').write_text('movie')
+
+        node = Parser.process_nodes_scandir(tmp_path / 'Deep')
+    finally:
+        sys.setrecursionlimit(recursion_limit)
+
+    for _ in range(depth):
+        node = node.children_nodes[0]
+    assert node.children_nodes[0].original_path == leaf / 'Movie.mkv'
+
+@pytest.mark.parametrize('parse', [Parser.process_nodes_scandir, lambda path: Parser.process_nodes(None, path)])
+def test_filtered_entries_counted(torrent_path, parse):
+    head = parse(torrent_path)
+    season_1 = next(child for child in head.children_nodes if child.original_path.name == 'Season 1')
+    season_2 = next(child for child in head.children_nodes if child.original_path.name == 'Season 2')
+
+    # info.nfo and Empty (only unknown files)
+    assert head.child_stats.num_filtered == 2
+    assert season_1.child_stats.num_filtered == 1
+    assert season_2.child_stats.num_filtered == 0
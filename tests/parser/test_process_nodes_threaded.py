@@ -0,0 +1,62 @@
+from tree.parser import Parser
+from tree.node import Node
+from pathlib import Path
+from unittest.mock import Mock
+from threading import Lock
+import time
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+
+@pytest.fixture
+def torrent_path(tmp_path):
+    files = [
+        'Show.S01-S03/Season 1/Show.S01E01.mkv',
+        'Show.S01-S03/Season 1/Subs/Show.S01E01.en.srt',
+        'Show.S01-S03/Season 2/Show.S02E01.mkv',
+        'Show.S01-S03/Season 2/Show.S02E02.mkv',
+        'Show.S01-S03/Season 3/Show.S03E01.mkv',
+        'Show.S01-S03/Season 3/notes.txt',
+        'Show.S01-S03/Empty/readme.nfo',
+    ]
+    for file in files:
+        path = tmp_path / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(file)
+    return tmp_path / 'Show.S01-S03'
+
+def _as_tuple(node: Node):
+    return (
+        node.original_path,
+        node.path_metadata.is_dir,
+        node.path_metadata.format_type,
+        node.parent_node.original_path if node.parent_node else None,
+        [_as_tuple(child) for child in node.children_nodes],
+    )
+
+
+def test_same_tree_as_scandir(torrent_path):
+    assert _as_tuple(Parser.process_nodes_threaded(torrent_path)) == _as_tuple(Parser.process_nodes_scandir(torrent_path))
+
+def test_torrent_cap(mocker, torrent_path):
+    mocker.patch('tree.parser.PARSER_WALK_TORRENT_CAP', 2)
+    scan_directory = Parser._scan_directory
+    lock = Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+
+    def slow_scan_directory(path: Path):
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return scan_directory(path)
+
+    mocker.patch.object(Parser, '_scan_directory', side_effect=slow_scan_directory)
+    Parser.process_nodes_threaded(torrent_path)
+
+    assert max_in_flight[0] == 2
@@ -0,0 +1,97 @@
+from tree.parser import Parser
+from tree.snapshot import ParserSnapshot
+from extractor.media_extractor import MediaExtractor
+from unittest.mock import Mock
+import os
+import time
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+
+@pytest.fixture
+def torrent_path(tmp_path):
+    files = [
+        'Show.S01-S02/Season 1/Show.S01E01.mkv',
+        'Show.S01-S02/Season 1/Show.S01E01.en.srt',
+        'Show.S01-S02/Season 2/Show.S02E01.mkv',
+        'Show.S01-S02/info.nfo',
+    ]
+    for file in files:
+        path = tmp_path / 'downloads' / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(file)
+
+    # Directories last modified well before the snapshot, so their listings are not racy
+    past_ns = time.time_ns() - 60 * 10**9
+    for path in (tmp_path / 'downloads' / 'Show.S01-S02').rglob('*'):
+        if path.is_dir():
+            os.utime(path, ns=(past_ns, past_ns))
+    os.utime(tmp_path / 'downloads' / 'Show.S01-S02', ns=(past_ns, past_ns))
+    return tmp_path / 'downloads' / 'Show.S01-S02'
+
+def _snapshot(tmp_path, torrent_path) -> ParserSnapshot:
+    current = ParserSnapshot(torrent_path)
+    Parser.process_nodes_scandir(torrent_path, ParserSnapshot(torrent_path), current)
+    current.save(tmp_path / 'snapshots')
+    return ParserSnapshot.load(tmp_path / 'snapshots', torrent_path)
+
+def _as_tuple(node):
+    return (
+        node.original_path,
+        node.path_metadata.format_type,
+        str(node.media_metadata),
+        sorted(_as_tuple(child) for child in node.children_nodes),
+    )
+
+
+def test_unchanged_directories_reused(mocker, tmp_path, torrent_path):
+    previous = _snapshot(tmp_path, torrent_path)
+    assert len(previous.directories) == 3
+    expected = _as_tuple(Parser.process_nodes_scandir(torrent_path))
+
+    scan_directory = mocker.spy(Parser, '_scan_directory')
+    extract_many = mocker.spy(MediaExtractor, 'extract_many')
+    head = Parser.process_nodes_scandir(torrent_path, previous, ParserSnapshot(torrent_path))
+
+    assert _as_tuple(head) == expected
+    scan_directory.assert_not_called()
+    extract_many.assert_not_called()
+
+def test_only_new_entries_extracted(mocker, tmp_path, torrent_path):
+    previous = _snapshot(tmp_path, torrent_path)
+    (torrent_path / 'Season 2' / 'Show.S02E02.mkv').write_text('new episode')
+    expected = _as_tuple(Parser.process_nodes_scandir(torrent_path))
+
+    scan_directory = mocker.spy(Parser, '_scan_directory')
+    extract_many = mocker.spy(MediaExtractor, 'extract_many')
+    current = ParserSnapshot(torrent_path)
+    head = Parser.process_nodes_scandir(torrent_path, previous, current)
+
+    assert _as_tuple(head) == expected
+    assert scan_directory.call_args_list[0].args[0] == torrent_path / 'Season 2'
+    assert [path.name for path in extract_many.call_args_list[0].args[0]] == ['Show.S02E02.mkv']
+    assert len(current.directories['Season 2'][1]) == 2
+
+def test_racy_listing_not_reused(tmp_path, torrent_path):
+    previous = _snapshot(tmp_path, torrent_path)
+    mtime_ns = (torrent_path / 'Season 1').stat().st_mtime_ns
+
+    assert previous.get_listing(torrent_path / 'Season 1', mtime_ns) is not None
+    previous.created_ns = mtime_ns + 1
+    assert previous.get_listing(torrent_path / 'Season 1', mtime_ns) is None
+
+def test_load_missing_or_corrupt(tmp_path, torrent_path):
+    assert not ParserSnapshot.load(tmp_path / 'snapshots', torrent_path).directories
+
+    (tmp_path / 'snapshots').mkdir()
+    ParserSnapshot.get_path(tmp_path / 'snapshots', torrent_path).write_bytes(b'not a pickle')
+    assert not ParserSnapshot.load(tmp_path / 'snapshots', torrent_path).directories
+
+def test_prune(tmp_path, torrent_path):
+    _snapshot(tmp_path, torrent_path)
+
+    assert ParserSnapshot.prune(tmp_path / 'snapshots', [torrent_path]) == 0
+    assert ParserSnapshot.prune(tmp_path / 'snapshots', []) == 1
+    assert not list((tmp_path / 'snapshots').iterdir())
@@ -0,0 +1,57 @@
+from extractor.pattern_engine import PatternEngine
+import pytest
+
+@pytest.fixture
+def dict_engine():
+    return PatternEngine({
+        'DTS-HD': [r'DTS\.HD\.MA', r'DTSHD'],
+        'DTS': [r'DTS'],
+        '5.1': [r'5\.1', r'51'],
+    })
+
+@pytest.fixture
+def list_engine():
+    return PatternEngine([
+        r'S(\d+)',
+        r'SEASON',
+        r'S(\d+)E\d+',
+    ])
+
+
+def test_single_part_match(dict_engine):
+    assert dict_engine.match(0, ['DTSHD']) == ('DTS-HD', None)
+
+def test_multi_part_match(dict_engine):
+    assert dict_engine.match(1, ['TITLE', 'DTS', 'HD', 'MA']) == ('DTS-HD', None)
+
+def test_priority_across_widths(dict_engine):
+    # DTS-HD is listed before DTS, so the 3 part window wins over the 1 part window
+    assert dict_engine.match(0, ['DTS', 'HD', 'MA']) == ('DTS-HD', None)
+
+def test_shorter_window_at_end(dict_engine):
+    assert dict_engine.match(1, ['TITLE', 'DTS']) == ('DTS', None)
+
+def test_no_match(dict_engine):
+    assert dict_engine.match(0, ['TITLE', 'DTS']) is None
+
+def test_capture_group(list_engine):
+    assert list_engine.match(0, ['S01']) == (r'S(\d+)', '01')
+    assert list_engine.match(0, ['S01E02']) == (r'S(\d+)E\d+', '01')
+
+def test_no_capture_group(list_engine):
+    assert list_engine.match(0, ['SEASON']) == ('SEASON', None)
+
+def test_search_returns_first_index(dict_engine):
+    assert dict_engine.search(['TITLE', '51', 'DTS']) == ('5.1', None)
+    assert dict_engine.search(['TITLE']) is None
+
+def test_literal_character_class():
+    engine = PatternEngine({'1080p': [r'1080[PI]?']})
+    assert engine.match(0, ['1080']) == ('1080p', None)
+    assert engine.match(0, ['1080I']) == ('1080p', None)
+    assert engine.match(0, ['1080X']) is None
+
+def test_literal_and_regex_priority():
+    engine = PatternEngine([r'EP(\d+)', r'EP'])
+    assert engine.match(0, ['EP']) == ('EP', None)
+    assert engine.match(0, ['EP3']) == (r'EP(\d+)', '3')
@@ -0,0 +1,49 @@
+from manager.plan_cache import PlanCache
+from models.move_plan import MovePlan, MoveOperation
+from pathlib import Path
+import pytest
+
+@pytest.fixture
+def cache(tmp_path):
+    return PlanCache(tmp_path / 'plans')
+
+def _plan() -> MovePlan:
+    plan = MovePlan()
+    plan.operations = [MoveOperation(Path('/downloads/Movie.2020.mkv'), Path('/Movie.2020/Movie.2020.mkv'), False)]
+    return plan
+
+FILES = [(Path('/downloads/Movie.2020.mkv'), 100)]
+
+
+def test_plan_taken_once(cache):
+    signature = PlanCache.get_signature(FILES)
+    cache.put(Path('/downloads/Movie.2020.mkv'), signature, _plan())
+
+    assert cache.has(Path('/downloads/Movie.2020.mkv'), signature)
+    plan = cache.take(Path('/downloads/Movie.2020.mkv'), signature)
+    assert [(operation.source, operation.new_path) for operation in plan.operations] == [
+        (Path('/downloads/Movie.2020.mkv'), Path('/Movie.2020/Movie.2020.mkv')),
+    ]
+    assert cache.take(Path('/downloads/Movie.2020.mkv'), signature) is None
+
+def test_plan_of_other_file_list_not_used(cache):
+    cache.put(Path('/downloads/Movie.2020.mkv'), PlanCache.get_signature(FILES), _plan())
+    resized = PlanCache.get_signature([(Path('/downloads/Movie.2020.mkv'), 200)])
+
+    assert not cache.has(Path('/downloads/Movie.2020.mkv'), resized)
+    assert cache.take(Path('/downloads/Movie.2020.mkv'), resized) is None
+
+def test_newer_plan_replaces_older(cache, tmp_path):
+    cache.put(Path('/downloads/Movie.2020.mkv'), 'a', _plan())
+    cache.put(Path('/downloads/Movie.2020.mkv'), 'b', _plan())
+
+    assert len(list((tmp_path / 'plans').iterdir())) == 1
+    assert cache.has(Path('/downloads/Movie.2020.mkv'), 'b')
+
+def test_plans_of_removed_torrents_pruned(cache):
+    cache.put(Path('/downloads/Movie.2020.mkv'), 'a', _plan())
+    cache.put(Path('/downloads/Movie.2021.mkv'), 'a', _plan())
+
+    assert cache.prune([Path('/downloads/Movie.2021.mkv')]) == 1
+    assert not cache.has(Path('/downloads/Movie.2020.mkv'), 'a')
+    assert cache.has(Path('/downloads/Movie.2021.mkv'), 'a')
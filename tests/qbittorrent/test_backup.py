@@ -0,0 +1,145 @@
+from client.qbittorrent import QBittorrentBackup
+from pathlib import Path
+import os
+import pytest
+
+def encode(value) -> bytes:
+    if isinstance(value, int):
+        return b'i%de' % value
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        return b'%d:%s' % (len(value), value)
+    if isinstance(value, list):
+        return b'l' + b''.join(encode(item) for item in value) + b'e'
+    return b'd' + b''.join(encode(key) + encode(value[key]) for key in sorted(value)) + b'e'
+
+def write_torrent(bt_backup: Path, info_hash: str, resume: dict, info: dict | None = None) -> None:
+    (bt_backup / f'{info_hash}.fastresume').write_bytes(encode(resume))
+    if info is not None:
+        (bt_backup / f'{info_hash}.torrent').write_bytes(encode({'announce': 'http://tracker', 'info': info}))
+
+SERIES_INFO = {
+    'name': 'Show.S01',
+    'piece length': 16,
+    'pieces': b'h' * 20 * 4,
+    'files': [
+        {'length': 20, 'path': ['Show.S01E01.mkv']},
+        {'length': 20, 'path': ['Show.S01E02.mkv']},
+        {'length': 10, 'path': ['Extras', 'Featurette.mkv']},
+    ],
+}
+
+@pytest.fixture
+def bt_backup(tmp_path):
+    path = tmp_path / 'BT_backup'
+    path.mkdir()
+    return path
+
+
+def test_complete_torrent(bt_backup):
+    write_torrent(bt_backup, 'aaaa', {'save_path': '/downloads', 'pieces': b'\x01' * 4}, SERIES_INFO)
+
+    torrent = QBittorrentBackup(bt_backup).read().find(Path('/downloads/Show.S01'))
+
+    assert torrent.complete
+    assert torrent.info_hash == 'aaaa'
+    assert torrent.content_paths == [Path('/downloads/Show.S01')]
+    assert torrent.files == [
+        (Path('/downloads/Show.S01/Show.S01E01.mkv'), 20),
+        (Path('/downloads/Show.S01/Show.S01E02.mkv'), 20),
+        (Path('/downloads/Show.S01/Extras/Featurette.mkv'), 10),
+    ]
+
+def test_missing_piece_incomplete(bt_backup):
+    write_torrent(bt_backup, 'aaaa', {'save_path': '/downloads', 'pieces': b'\x01\x01\x00\x01'}, SERIES_INFO)
+
+    assert not QBittorrentBackup(bt_backup).read().find(Path('/downloads/Show.S01')).complete
+
+def test_skipped_files_not_expected(bt_backup):
+    # Extras are not wanted, its last piece is not downloaded
+    resume = {'save_path': '/downloads', 'pieces': b'\x01\x01\x01\x00', 'file_priority': [4, 1, 0]}
+    write_torrent(bt_backup, 'aaaa', resume, SERIES_INFO)
+
+    torrent = QBittorrentBackup(bt_backup).read().find(Path('/downloads/Show.S01'))
+
+    assert torrent.complete
+    assert [path.name for path, _ in torrent.files] == ['Show.S01E01.mkv', 'Show.S01E02.mkv']
+
+def test_single_file_with_embedded_info(bt_backup):
+    info = {'name': 'Movie.2020.mkv', 'piece length': 16, 'length': 40, 'pieces': b'h' * 60}
+    write_torrent(bt_backup, 'bbbb', {'save_path': '/downloads', 'pieces': b'\x01\x01\x01', 'info': info})
+
+    torrent = QBittorrentBackup(bt_backup).read().find(Path('/downloads/Movie.2020.mkv'))
+
+    assert torrent.complete
+    assert torrent.files == [(Path('/downloads/Movie.2020.mkv'), 40)]
+
+def test_mapped_files_without_top_folder(bt_backup):
+    resume = {
+        'save_path': '/downloads',
+        'pieces': b'\x01' * 4,
+        'mapped_files': ['Show.S01E01.mkv', 'Show.S01E02.mkv', 'Extras/Featurette.mkv'],
+    }
+    write_torrent(bt_backup, 'aaaa', resume, SERIES_INFO)
+
+    torrents = QBittorrentBackup(bt_backup).read()
+
+    assert torrents.find(Path('/downloads/Show.S01')) is None
+    assert torrents.find(Path('/downloads/Extras')).content_paths == [
+        Path('/downloads/Show.S01E01.mkv'), Path('/downloads/Show.S01E02.mkv'), Path('/downloads/Extras'),
+    ]
+
+def test_v2_files_aligned_to_pieces(bt_backup):
+    info = {
+        'name': 'Show.S01',
+        'piece length': 16,
+        'meta version': 2,
+        'file tree': {
+            'Show.S01E01.mkv': {'': {'length': 20, 'pieces root': b'r' * 32}},
+            'Show.S01E02.mkv': {'': {'length': 10, 'pieces root': b'r' * 32}},
+        },
+    }
+    # Second file starts at piece 2, piece 3 is not part of the torrent
+    write_torrent(bt_backup, 'cccc', {'save_path': '/downloads', 'pieces': b'\x01\x01\x00'}, info)
+
+    torrent = QBittorrentBackup(bt_backup).read().find(Path('/downloads/Show.S01'))
+
+    assert not torrent.complete
+    assert [path.name for path, _ in torrent.files] == ['Show.S01E01.mkv', 'Show.S01E02.mkv']
+
+def test_magnet_without_metadata_incomplete(bt_backup):
+    write_torrent(bt_backup, 'dddd', {'save_path': '/downloads', 'name': 'Movie.2021'})
+
+    torrent = QBittorrentBackup(bt_backup).read().find(Path('/downloads/Movie.2021'))
+
+    assert not torrent.complete
+    assert torrent.files == []
+
+def test_found_by_name_under_other_save_path(bt_backup):
+    write_torrent(bt_backup, 'aaaa', {'save_path': '/data/torrents', 'pieces': b'\x01' * 4}, SERIES_INFO)
+
+    assert QBittorrentBackup(bt_backup).read().find(Path('/downloads/Show.S01')).info_hash == 'aaaa'
+
+def test_unchanged_files_not_parsed_again(bt_backup, mocker):
+    write_torrent(bt_backup, 'aaaa', {'save_path': '/downloads', 'pieces': b'\x01' * 4}, SERIES_INFO)
+    backup = QBittorrentBackup(bt_backup)
+    backup.read()
+    parse = mocker.spy(QBittorrentBackup, 'parse')
+
+    assert len(backup.read()) == 1
+    parse.assert_not_called()
+
+    write_torrent(bt_backup, 'aaaa', {'save_path': '/downloads', 'pieces': b'\x01\x00\x01\x01'}, SERIES_INFO)
+    os.utime(bt_backup / 'aaaa.fastresume', ns=(0, 1))
+
+    assert not backup.read().find(Path('/downloads/Show.S01')).complete
+    assert parse.call_count == 1
+
+def test_corrupt_resume_data_reported(bt_backup):
+    write_torrent(bt_backup, 'aaaa', {'save_path': '/downloads', 'pieces': b'\x01' * 4}, SERIES_INFO)
+    (bt_backup / 'eeee.fastresume').write_bytes(b'd9:save_path')
+    backup = QBittorrentBackup(bt_backup)
+
+    assert len(backup.read()) == 1
+    assert len(backup.errors) == 1 and 'eeee.fastresume' in backup.errors[0]
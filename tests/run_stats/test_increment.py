@@ -0,0 +1,19 @@
+from models.run_stats import RunStats
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_increment():
+    stats = RunStats('processed', 'skipped')
+    stats.increment('processed')
+    stats.increment('processed', 2)
+
+    assert stats['processed'] == 3
+    assert stats['skipped'] == 0
+    assert stats.as_dict() == {'processed': 3, 'skipped': 0}
+
+def test_concurrent_increments():
+    stats = RunStats('processed')
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: [stats.increment('processed') for _ in range(1000)], range(8)))
+
+    assert stats['processed'] == 8000
@@ -0,0 +1,58 @@
+from manager.staging_index import StagingIndex
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+
+
+def test_directory_listed_once(mocker, tmp_path):
+    for name in ('subtitle_en', 'subtitle_en_1', 'Subtitles'):
+        (tmp_path / name).write_text('')
+    scandir = mocker.spy(os, 'scandir')
+    exists = mocker.spy(Path, 'exists')
+    index = StagingIndex()
+
+    assert index.reserve(tmp_path / 'subtitle_en') == tmp_path / 'subtitle_en_2'
+    assert index.reserve(tmp_path / 'subtitle_en') == tmp_path / 'subtitle_en_3'
+    assert index.reserve(tmp_path / 'Subtitles') == tmp_path / 'Subtitles_1'
+    assert index.reserve(tmp_path / 'Extras') == tmp_path / 'Extras'
+
+    assert scandir.call_count == 1
+    assert exists.call_count == 0
+    assert index.get_stats() == {'scans': 1, 'directories': 1}
+
+def test_counter_kept_per_name(tmp_path):
+    index = StagingIndex()
+    for _ in range(50):
+        index.reserve(tmp_path / 'Movie.mkv')
+
+    assert index.reserve(tmp_path / 'Movie.mkv') == tmp_path / 'Movie_50.mkv'
+    assert index.reserve(tmp_path / 'Other.mkv') == tmp_path / 'Other.mkv'
+
+def test_missing_directory(tmp_path):
+    index = StagingIndex()
+    assert index.reserve(tmp_path / 'new' / 'Movie.mkv') == tmp_path / 'new' / 'Movie.mkv'
+    assert index.reserve(tmp_path / 'new' / 'Movie.mkv') == tmp_path / 'new' / 'Movie_1.mkv'
+
+def test_removed_path_free(tmp_path):
+    index = StagingIndex()
+    path = index.reserve(tmp_path / 'Movie.mkv')
+    index.remove(path)
+
+    assert index.reserve_exact(path)
+
+def test_invalidated_directories_listed_again(tmp_path):
+    index = StagingIndex()
+    index.reserve(tmp_path / 'Show' / 'S01' / 'Episode.mkv')
+    (tmp_path / 'Show' / 'S01').mkdir(parents=True)
+    (tmp_path / 'Show' / 'S01' / 'Other.mkv').write_text('')
+
+    index.invalidate(tmp_path / 'Show')
+    assert not index.reserve_exact(tmp_path / 'Show' / 'S01' / 'Other.mkv')
+    assert index.reserve_exact(tmp_path / 'Show' / 'S01' / 'Episode.mkv')
+
+def test_concurrent_reservations_unique(tmp_path):
+    index = StagingIndex()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        paths = list(pool.map(lambda _: index.reserve(tmp_path / 'Subtitles'), range(200)))
+
+    assert len(set(paths)) == 200
@@ -0,0 +1,28 @@
+from storage.state_file import StateFile
+from pathlib import Path
+import os
+import pytest
+
+
+def test_write_creates_parent(tmp_path):
+    path = tmp_path / 'manager' / 'plans' / 'plan.pickle'
+    StateFile.write(path, b'plan')
+
+    assert path.read_bytes() == b'plan'
+    assert os.listdir(path.parent) == ['plan.pickle']
+
+def test_interrupted_write_keeps_previous_file(mocker, tmp_path):
+    path = tmp_path / 'links.json'
+    StateFile.write(path, b'{}')
+
+    mocker.patch('storage.state_file.os.replace', side_effect=KeyboardInterrupt)
+    with pytest.raises(KeyboardInterrupt):
+        StateFile.write(path, b'{"partial"')
+
+    assert path.read_bytes() == b'{}'
+
+def test_key_of_undecodable_path():
+    path = Path(os.fsdecode(b'/downloads/Movie.\xff.2020'))
+
+    assert StateFile.get_key(path) != StateFile.get_key(Path('/downloads/Movie.2020'))
+    assert len(StateFile.get_key(path)) == 40
@@ -0,0 +1,60 @@
+from manager.token_bucket import BandwidthSchedule, TokenBucket
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pytest
+import time
+
+
+@pytest.mark.parametrize('rate, expected', [
+    ('0', 0),
+    ('1024', 1024),
+    ('50M', 50 * 10**6),
+    ('1.5 GB', 15 * 10**8),
+    ('200k', 200 * 10**3),
+])
+def test_parse_rate(rate, expected):
+    assert BandwidthSchedule.parse_rate(rate) == expected
+
+@pytest.mark.parametrize('value', ['fast', '-1', '10T'])
+def test_parse_invalid_rate(value):
+    with pytest.raises(ValueError):
+        BandwidthSchedule.parse_rate(value)
+
+@pytest.mark.parametrize('hour, minute, expected', [
+    (12, 0, 100 * 10**6),
+    (18, 0, 50 * 10**6),
+    (22, 59, 50 * 10**6),
+    (23, 0, 0),
+    (3, 30, 0),
+    (7, 0, 100 * 10**6),
+])
+def test_schedule_windows(hour, minute, expected):
+    schedule = BandwidthSchedule('100M', '18:00-23:00=50M, 23:00-07:00=0')
+    assert schedule.get_rate(datetime(2024, 1, 1, hour, minute)) == expected
+
+def test_invalid_schedule():
+    with pytest.raises(ValueError):
+        BandwidthSchedule('0', '18:00=50M')
+
+def test_unlimited_never_waits():
+    bucket = TokenBucket(lambda: 0)
+    assert bucket.consume(10**12) == 0
+
+def test_burst_then_rate_limited():
+    bucket = TokenBucket(lambda: 100_000)
+    time.sleep(0.05)
+
+    # Bucket has refilled for 50ms, the rest of the request waits for the rate
+    waited = bucket.consume(10_000)
+    assert 0.03 < waited < 0.07
+
+def test_shared_between_threads():
+    rate = 200_000
+    bucket = TokenBucket(lambda: rate)
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda _: bucket.consume(10_000), range(8)))
+
+    # 80KB at 200KB/s across all threads, not per thread
+    assert time.monotonic() - start >= 0.35
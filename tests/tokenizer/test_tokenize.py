@@ -0,0 +1,42 @@
+from extractor.tokenizer import Tokenizer
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+
+
+def test_one_token_per_part():
+    parts = ['TITLE', '2020', '1080P']
+    tokens = Tokenizer.tokenize(parts)
+    assert [token.part for token in tokens] == parts
+
+def test_plain_word():
+    token = Tokenizer.tokenize(['TITLE'])[0]
+    assert not token.is_terminator
+    assert not (token.is_quality or token.year or token.language or token.extras)
+
+def test_quality_tags():
+    tokens = Tokenizer.tokenize(['1080P', 'X265', 'WEBRIP', 'DTS', 'HD', 'MA'])
+    assert tokens[0].resolution == '1080p'
+    assert tokens[1].codec == 'x265'
+    assert tokens[2].source == 'WEBRip'
+    assert tokens[3].audio == 'DTS-HD'
+    assert all(token.is_terminator for token in tokens[:4])
+
+def test_season_and_episode_tags():
+    tokens = Tokenizer.tokenize(['S01E02', 'SEASON'])
+    assert tokens[0].season_match and tokens[0].season == 1
+    assert tokens[0].episode_match and tokens[0].episode == 2
+    assert tokens[1].season_match and tokens[1].season is None
+
+def test_year_tag():
+    tokens = Tokenizer.tokenize(['1899', '2020', '3000'])
+    assert [token.year for token in tokens] == [None, 2020, None]
+
+def test_language_and_extras_tags():
+    tokens = Tokenizer.tokenize(['ENGLISH', 'BEHIND', 'THE', 'SCENES'])
+    assert tokens[0].language == 'ENGLISH'
+    assert tokens[1].extras
+    assert not tokens[0].is_terminator
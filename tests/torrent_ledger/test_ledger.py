@@ -0,0 +1,29 @@
+from manager.torrent_ledger import TorrentLedger
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pytest
+
+@pytest.fixture
+def ledger(tmp_path):
+    return TorrentLedger(tmp_path / 'manager' / 'ledger.sqlite3')
+
+
+def test_record_persisted(tmp_path, ledger):
+    ledger.record(Path('/downloads/Movie.2020'), (1, 4096, 123), 'failed_validation')
+    ledger.record(Path('/downloads/Movie.2020'), (1, 4096, 456), 'processed')
+
+    reopened = TorrentLedger(tmp_path / 'manager' / 'ledger.sqlite3')
+    assert reopened.get_fingerprints() == {Path('/downloads/Movie.2020'): (1, 4096, 456)}
+
+def test_prune_removed_torrents(ledger):
+    ledger.record(Path('/downloads/Kept'), (1, 0, 0), 'processed')
+    ledger.record(Path('/downloads/Removed'), (2, 0, 0), 'failed_validation')
+
+    assert ledger.prune([Path('/downloads/Kept'), Path('/downloads/New')]) == 1
+    assert list(ledger.get_fingerprints()) == [Path('/downloads/Kept')]
+
+def test_concurrent_records(ledger):
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda i: ledger.record(Path(f'/downloads/{i}'), (i, 0, 0), 'processed'), range(50)))
+
+    assert len(ledger.get_fingerprints()) == 50
@@ -0,0 +1,27 @@
+from manager.torrent_manager import TorrentManager
+from manager.base_manager import BaseManager
+from unittest.mock import Mock
+import gc
+import pytest
+
+@pytest.fixture(autouse=True)
+def manager_state(mocker):
+    mocker.patch('manager.base_manager.Logger.get_logger', return_value=Mock())
+    mocker.patch.object(TorrentManager, '_logger', None)
+    mocker.patch('manager.base_manager.GC_MODE', 'tuned')
+    mocker.patch.object(BaseManager, '_gc_frozen', False)
+    mocker.patch.object(TorrentManager, '_client_backup', None)
+    yield
+    gc.unfreeze()
+
+
+def test_gc_frozen_once_across_runs():
+    TorrentManager._begin_run()
+    frozen = gc.get_freeze_count()
+
+    # Objects left over by the first run (e.g. a daemon batch) are not frozen by the next
+    garbage = [[object()] for _ in range(1000)]
+    TorrentManager._begin_run()
+
+    assert gc.get_freeze_count() <= frozen
+    del garbage
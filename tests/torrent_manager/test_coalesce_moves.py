@@ -0,0 +1,102 @@
+from manager.torrent_manager import TorrentManager
+from manager.staging_index import StagingIndex
+from models.move_plan import MovePlan, MoveOperation
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def manager_paths(mocker, tmp_path):
+    mocker.patch('manager.base_manager.Logger.get_logger', return_value=Mock())
+    mocker.patch.object(TorrentManager, '_logger', None)
+    mocker.patch.object(TorrentManager, '_dry_run', False)
+    mocker.patch.object(TorrentManager, '_staging_path', tmp_path / 'staging')
+    mocker.patch.object(TorrentManager, '_staging_index', StagingIndex())
+    (tmp_path / 'staging').mkdir()
+
+@pytest.fixture
+def source(tmp_path):
+    files = [
+        'Show.S01/Season 1/Show.S01E01.mkv',
+        'Show.S01/Season 1/Show.S01E02.mkv',
+    ]
+    for file in files:
+        path = tmp_path / 'downloads' / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(file)
+    return tmp_path / 'downloads' / 'Show.S01'
+
+def _plan(source: Path, is_complete: bool = True, episode_names: tuple[str, str] = ('Show.S01E01.mkv', 'Show.S01E02.mkv')) -> MovePlan:
+    plan = MovePlan()
+    plan.operations = [
+        MoveOperation(source, Path('/Show'), True, -1, is_complete),
+        MoveOperation(source / 'Season 1', Path('/Show/S01'), True, 0, is_complete),
+        MoveOperation(source / 'Season 1' / 'Show.S01E01.mkv', Path('/Show/S01') / episode_names[0], False, 1),
+        MoveOperation(source / 'Season 1' / 'Show.S01E02.mkv', Path('/Show/S01') / episode_names[1], False, 1),
+    ]
+    return plan
+
+def _staged_files(tmp_path):
+    return sorted(str(path.relative_to(tmp_path / 'staging')) for path in (tmp_path / 'staging').rglob('*') if path.is_file())
+
+
+def test_subtree_renamed_as_one_directory(mocker, tmp_path, source):
+    rename = mocker.spy(TorrentManager, '_rename')
+    copy_file = mocker.spy(TorrentManager, '_copy_file')
+    plan = _plan(source, episode_names=('Show.S01E01.mkv', 'Episode.2.mkv'))
+
+    assert TorrentManager._execute_plan(plan)
+    assert _staged_files(tmp_path) == ['Show/S01/Episode.2.mkv', 'Show/S01/Show.S01E01.mkv']
+    assert not source.exists()
+
+    # Torrent directory, then season directory renamed in place, unchanged file is not moved
+    assert [call.args[0] for call in rename.call_args_list] == [source, tmp_path / 'staging' / 'Show' / 'Season 1']
+    assert [call.args[0] for call in copy_file.call_args_list] == [tmp_path / 'staging' / 'Show' / 'S01' / 'Show.S01E02.mkv']
+    assert TorrentManager._staging_index.reserve(tmp_path / 'staging' / 'Show') == tmp_path / 'staging' / 'Show_1'
+
+def test_filtered_entries_moved_per_file(mocker, tmp_path, source):
+    rename = mocker.spy(TorrentManager, '_rename')
+    plan = _plan(source, is_complete=False)
+
+    TorrentManager._execute_plan(plan)
+    assert _staged_files(tmp_path) == ['Show/S01/Show.S01E01.mkv', 'Show/S01/Show.S01E02.mkv']
+    rename.assert_not_called()
+    assert (source / 'Season 1').is_dir()
+
+@pytest.mark.parametrize('episode_names', [
+    # Same new name twice
+    ('Episode.mkv', 'Episode.mkv'),
+    # Renamed to name of a sibling not renamed yet
+    ('Show.S01E02.mkv', 'Show.S01E03.mkv'),
+])
+def test_clashing_names_moved_per_file(mocker, source, episode_names):
+    plan = _plan(source, episode_names=episode_names)
+    TorrentManager._coalesce_moves(plan)
+
+    assert not any(operation.rename for operation in plan.operations[1:])
+
+def test_taken_destination_moved_per_file(tmp_path, source):
+    (tmp_path / 'staging' / 'Show').mkdir()
+    plan = _plan(source)
+    TorrentManager._coalesce_moves(plan)
+
+    assert not plan.operations[0].rename
+    assert plan.operations[1].rename
+
+def test_other_device_moved_per_file(mocker, source):
+    mocker.patch.object(Path, 'stat', side_effect=[Mock(st_dev=1), Mock(st_dev=2), Mock(st_dev=2)])
+    plan = _plan(source)
+    TorrentManager._coalesce_moves(plan)
+
+    assert not any(operation.rename for operation in plan.operations)
+
+def test_coalesced_into_new_staging_directory(mocker, tmp_path, source):
+    (tmp_path / 'staging').rmdir()
+    mocker.patch.object(TorrentManager, '_staging_index', StagingIndex())
+    reserve_exact_path = mocker.spy(TorrentManager, '_reserve_exact_path')
+
+    assert TorrentManager._execute_plan(_plan(source))
+
+    reserve_exact_path.assert_any_call(tmp_path / 'staging' / 'Show')
+    assert _staged_files(tmp_path) == ['Show/S01/Show.S01E01.mkv', 'Show/S01/Show.S01E02.mkv']
+    assert not source.exists()
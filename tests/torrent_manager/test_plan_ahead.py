@@ -0,0 +1,77 @@
+from manager.torrent_manager import TorrentManager
+from manager.plan_cache import PlanCache
+from tree.parser import Parser
+from classifier.node_classifier import NodeClassifier
+from client.qbittorrent import ClientTorrents
+from models.client_torrent import ClientTorrent
+from models.run_stats import RunStats
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+
+FILES = [
+    'Show.S01/Show.S01E01.mkv',
+    'Show.S01/Show.S01E02.mkv',
+    'Show.S01/Subs/Show.S01E01.en.srt',
+]
+
+@pytest.fixture(autouse=True)
+def manager_paths(mocker, tmp_path):
+    mocker.patch('manager.base_manager.Logger.get_logger', return_value=Mock())
+    mocker.patch('extractor.base_extractor.Logger.get_logger', return_value=Mock())
+    mocker.patch.object(TorrentManager, '_logger', None)
+    mocker.patch.object(TorrentManager, '_plan_cache', PlanCache(tmp_path / 'plans'))
+    mocker.patch.object(TorrentManager, 'stats', RunStats('planned_ahead', 'plans_used'), create=True)
+    (tmp_path / 'downloads').mkdir()
+
+def set_client(mocker, complete: bool) -> None:
+    # Client sees the download path under another path
+    files = [(Path('/data/torrents') / file, 10) for file in FILES]
+    torrent = ClientTorrent('aaaa', 'Show.S01', Path('/data/torrents'), [Path('/data/torrents/Show.S01')], files, complete)
+    mocker.patch.object(TorrentManager, '_client_torrents', ClientTorrents([torrent]))
+
+def write_payload(tmp_path) -> None:
+    for file in FILES:
+        path = tmp_path / 'downloads' / file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(file)
+
+def _operations(plan):
+    return [(operation.source, operation.new_path, operation.is_dir) for operation in plan.operations]
+
+
+def test_planned_while_downloading_same_as_from_disk(mocker, tmp_path):
+    torrent_path = tmp_path / 'downloads' / 'Show.S01'
+    set_client(mocker, complete=False)
+    TorrentManager._plan_incomplete([(torrent_path, None)])
+    assert TorrentManager.stats['planned_ahead'] == 1
+
+    write_payload(tmp_path)
+    set_client(mocker, complete=True)
+    plan = TorrentManager._take_planned(torrent_path)
+
+    disk_plan = TorrentManager._plan_moves(NodeClassifier.classify(Parser.process_nodes_scandir(torrent_path)))
+    assert sorted(_operations(plan)) == sorted(_operations(disk_plan))
+    # Used once
+    assert TorrentManager._take_planned(torrent_path) is None
+
+def test_not_planned_again(mocker, tmp_path):
+    torrent_path = tmp_path / 'downloads' / 'Show.S01'
+    set_client(mocker, complete=False)
+    TorrentManager._plan_incomplete([(torrent_path, None)])
+    plan_moves = mocker.spy(TorrentManager, '_plan_moves')
+
+    TorrentManager._plan_incomplete([(torrent_path, None)])
+
+    plan_moves.assert_not_called()
+
+def test_plan_with_missing_files_not_used(mocker, tmp_path):
+    torrent_path = tmp_path / 'downloads' / 'Show.S01'
+    set_client(mocker, complete=False)
+    TorrentManager._plan_incomplete([(torrent_path, None)])
+
+    write_payload(tmp_path)
+    (torrent_path / 'Show.S01E02.mkv').unlink()
+    set_client(mocker, complete=True)
+
+    assert TorrentManager._take_planned(torrent_path) is None
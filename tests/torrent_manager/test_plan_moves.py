@@ -0,0 +1,125 @@
+from manager.torrent_manager import TorrentManager
+from models.media_metadata import MediaMetadata
+from models.path_metadata import PathMetadata
+from tree.node import Node
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def logger(mocker):
+    mocker.patch('manager.base_manager.Logger.get_logger', return_value=Mock())
+    mocker.patch.object(TorrentManager, '_logger', None)
+
+def node(name: str, classification: str, *children: Node, **media) -> Node:
+    path_metadata = PathMetadata()
+    path_metadata.is_dir = bool(children) or classification.endswith('_FOLDER')
+    path_metadata.is_file = not path_metadata.is_dir
+    path_metadata.format_type = None
+    path_metadata.ext = name.rpartition('.')[2] if path_metadata.is_file else ''
+    media_metadata = MediaMetadata()
+    for field, value in media.items():
+        setattr(media_metadata, field, value)
+
+    tree_node = Node(Path('/downloads') / name, media_metadata, path_metadata)
+    tree_node.classification = classification
+    for child in children:
+        child.original_path = tree_node.original_path / child.original_path.name
+        child.parent_node = tree_node
+        tree_node.children_nodes.append(child)
+    return tree_node
+
+# Planning replaced by _plan_moves: whole tree validated first, then paths assigned by the handler chain
+_HANDLED_CHILDREN = {classification: allowed for classification, (_, allowed) in TorrentManager._folder_children.items()}
+
+def validate(tree_node: Node) -> bool:
+    if tree_node.classification == 'UNKNOWN':
+        return False
+    if not tree_node.parent_node and tree_node.classification in {'SUBTITLE_FOLDER', 'EXTRAS_FOLDER', 'SUBTITLE_FILE', 'EXTRAS_FILE'}:
+        return False
+    return all(validate(child) for child in tree_node.children_nodes)
+
+def process(tree_node: Node, assigned: list[tuple[Path, Path]]) -> bool:
+    TorrentManager._assign_path(tree_node)
+    assigned.append((tree_node.original_path, tree_node.new_path))
+    required, _ = TorrentManager._folder_children.get(tree_node.classification, (set(), set()))
+    if not required <= {child.classification for child in tree_node.children_nodes}:
+        return False
+    for child in tree_node.children_nodes:
+        if child.classification not in _HANDLED_CHILDREN.get(tree_node.classification, set()):
+            return False
+        if not process(child, assigned):
+            return False
+    return True
+
+def validate_then_process(head: Node) -> tuple[str | None, list[tuple[Path, Path]]]:
+    if not validate(head):
+        return 'VALIDATION', []
+    assigned: list[tuple[Path, Path]] = []
+    if head.classification not in TorrentManager._root_classifications or not process(head, assigned):
+        return 'PROCESSING', []
+    return None, assigned
+
+
+def movie():
+    return node('Movie.2010', 'MOVIE_FOLDER',
+        node('Movie.2010.1080p.mkv', 'MOVIE_FILE', title='movie', year=2010, resolution='1080p'),
+        node('Subs', 'SUBTITLE_FOLDER', node('English.srt', 'SUBTITLE_FILE', language='en'), node('Other.srt', 'SUBTITLE_FILE')),
+        node('Extras', 'EXTRAS_FOLDER', node('Behind The Scenes.mkv', 'EXTRAS_FILE')),
+        title='movie', year=2010,
+    )
+
+def series(*season_children: Node):
+    episodes = season_children or (
+        node('Show.S01E01.mkv', 'EPISODE_FILE', title='show', season=1, episode=1),
+        node('Show.S01E02.mkv', 'EPISODE_FILE', title='show', season=1, episode=2),
+    )
+    return node('Show', 'SERIES_FOLDER',
+        node('Season 1', 'SEASON_FOLDER', *episodes, season=1),
+        node('Extras', 'EXTRAS_FOLDER', node('Season 2', 'SEASON_FOLDER', node('Show.S02E01.mkv', 'EPISODE_FILE', title='show', season=2, episode=1), season=2)),
+        title='show',
+    )
+
+TREES = {
+    'movie': movie,
+    'series': series,
+    'episode': lambda: node('Show.S01E01.mkv', 'EPISODE_FILE', title='show', season=1, episode=1),
+    # Validation failures
+    'unknown child': lambda: series(node('Sample.mkv', 'UNKNOWN')),
+    'child only root': lambda: node('Subs', 'SUBTITLE_FOLDER', node('English.srt', 'SUBTITLE_FILE')),
+    'unknown root': lambda: node('Readme.txt', 'UNKNOWN'),
+    # Processing failures
+    'missing required child': lambda: node('Movie.2010', 'MOVIE_FOLDER', node('Subs', 'SUBTITLE_FOLDER', node('English.srt', 'SUBTITLE_FILE')), title='movie'),
+    'unexpected child': lambda: series(node('Show.S01E01.mkv', 'EPISODE_FILE', title='show'), node('Movie.2010.mkv', 'MOVIE_FILE', title='movie')),
+    # Processing fails before the unknown node is visited
+    'unknown after processing failure': lambda: node('Movie.2010', 'MOVIE_FOLDER',
+        node('Show.S01E01.mkv', 'EPISODE_FILE'), node('Subs', 'SUBTITLE_FOLDER', node('Sample.srt', 'UNKNOWN')), title='movie'),
+    'unknown in unexpected child': lambda: series(node('Show.S01E01.mkv', 'EPISODE_FILE'), node('Bonus', 'MOVIE_FOLDER', node('Sample.mkv', 'UNKNOWN'))),
+}
+
+
+@pytest.mark.parametrize('name', TREES)
+def test_same_as_validate_then_process(name):
+    failure, assigned = validate_then_process(TREES[name]())
+
+    plan = TorrentManager._plan_moves(TREES[name]())
+
+    assert plan.failure == failure
+    if failure is None:
+        assert [(operation.source, operation.new_path) for operation in plan.operations] == assigned
+
+def test_planned_paths():
+    plan = TorrentManager._plan_moves(movie())
+
+    assert plan.failure is None
+    assert [str(operation.new_path) for operation in plan.operations] == [
+        '/Movie.2010',
+        '/Movie.2010/Movie.2010.1080p.mkv',
+        '/Movie.2010/Subtitles',
+        '/Movie.2010/Subtitles/subtitle_en',
+        '/Movie.2010/Subtitles/Other.srt',
+        '/Movie.2010/Extras',
+        '/Movie.2010/Extras/Behind.The.Scenes.mkv',
+    ]
+    # Parents before children
+    assert [operation.parent for operation in plan.operations] == [-1, 0, 0, 2, 2, 0, 5]
@@ -0,0 +1,34 @@
+from manager.torrent_manager import TorrentManager
+from client.qbittorrent import ClientTorrents
+from models.client_torrent import ClientTorrent
+from models.run_stats import RunStats
+from pathlib import Path
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('manager.base_manager.Logger.get_logger', return_value=Mock())
+    mocker.patch.object(TorrentManager, '_logger', None)
+    mocker.patch.object(TorrentManager, 'stats', RunStats('incomplete'), create=True)
+
+def client_torrent(path: Path, complete: bool) -> ClientTorrent:
+    return ClientTorrent('aaaa', path.name, path.parent, [path], [], complete)
+
+
+def test_incomplete_torrents_skipped(mocker):
+    downloading, seeding = Path('/downloads/Show.S01'), Path('/downloads/Movie.2020.mkv')
+    mocker.patch.object(TorrentManager, '_client_torrents', ClientTorrents([
+        client_torrent(downloading, complete=False),
+        client_torrent(seeding, complete=True),
+    ]))
+    entries = [(downloading, (1, 2, 3)), (seeding, (4, 5, 6)), (Path('/downloads/Manual.2019'), None)]
+
+    assert TorrentManager._skip_incomplete(entries) == entries[1:]
+    assert TorrentManager.stats['incomplete'] == 1
+
+def test_all_processed_without_client(mocker):
+    mocker.patch.object(TorrentManager, '_client_torrents', None)
+    entries = [(Path('/downloads/Show.S01'), None)]
+
+    assert TorrentManager._skip_incomplete(entries) == entries
@@ -0,0 +1,57 @@
+from manager.torrent_manager import TorrentManager
+from manager.torrent_ledger import TorrentLedger
+from models.run_stats import RunStats
+from unittest.mock import Mock
+import os
+import pytest
+
+@pytest.fixture(autouse=True)
+def manager_paths(mocker, tmp_path):
+    mocker.patch('manager.base_manager.Logger.get_logger', return_value=Mock())
+    mocker.patch.object(TorrentManager, '_logger', None)
+    mocker.patch.object(TorrentManager, '_torrent_path', tmp_path / 'downloads')
+    mocker.patch.object(TorrentManager, 'stats', RunStats('unchanged'), create=True)
+    (tmp_path / 'downloads' / 'Show.S01').mkdir(parents=True)
+    (tmp_path / 'downloads' / 'Movie.2020.mkv').write_text('movie')
+
+@pytest.fixture
+def ledger(tmp_path):
+    return TorrentLedger(tmp_path / 'ledger.sqlite3')
+
+
+def test_directories_listed_first(tmp_path):
+    entries = TorrentManager._scan_torrent_path()
+
+    assert [path.name for path, _ in entries] == ['Show.S01', 'Movie.2020.mkv']
+    movie_stat = (tmp_path / 'downloads' / 'Movie.2020.mkv').stat()
+    assert entries[1][1] == (movie_stat.st_ino, movie_stat.st_size, movie_stat.st_mtime_ns)
+
+def test_unchanged_torrents_skipped(tmp_path, ledger):
+    for path, fingerprint in TorrentManager._scan_torrent_path():
+        ledger.record(path, fingerprint, 'processed')
+
+    # File grew since it was recorded
+    movie = tmp_path / 'downloads' / 'Movie.2020.mkv'
+    movie.write_text('movie, complete')
+    os.utime(movie, ns=(0, 1))
+
+    entries = TorrentManager._skip_unchanged(ledger, TorrentManager._scan_torrent_path())
+    assert [path.name for path, _ in entries] == ['Movie.2020.mkv']
+    assert TorrentManager.stats['unchanged'] == 1
+
+def test_outcome_recorded(mocker, tmp_path, ledger):
+    mocker.patch.object(TorrentManager, '_process_torrent', return_value='failed_validation')
+    entries = TorrentManager._scan_torrent_path()
+    TorrentManager._process_torrent_paths(entries, ledger)
+
+    assert ledger.get_fingerprints() == dict(entries)
+    # Failed torrents are not processed again until they change
+    assert TorrentManager._skip_unchanged(ledger, TorrentManager._scan_torrent_path()) == []
+
+def test_skipped_torrents_not_recorded(mocker, tmp_path, ledger):
+    # Exception processing torrent, retried by the next run
+    mocker.patch.object(TorrentManager, '_process_torrent', return_value='skipped')
+    TorrentManager._process_torrent_paths(TorrentManager._scan_torrent_path(), ledger)
+
+    assert ledger.get_fingerprints() == {}
+    assert len(TorrentManager._skip_unchanged(ledger, TorrentManager._scan_torrent_path())) == 2
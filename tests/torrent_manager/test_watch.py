@@ -0,0 +1,72 @@
+from manager.torrent_manager import TorrentManager
+from pathlib import Path
+from threading import Event, Timer
+from unittest.mock import Mock
+import pytest
+
+@pytest.fixture(autouse=True)
+def mock_logger(mocker):
+    mocker.patch('manager.base_manager.Logger.get_logger', return_value=Mock())
+    mocker.patch.object(TorrentManager, '_logger', None)
+
+
+def test_quiet_paths_popped_oldest_first():
+    pending = {Path('/downloads/b'): 5.0, Path('/downloads/a'): 2.0, Path('/downloads/busy'): 50.0}
+
+    ready = TorrentManager._pop_quiet(pending, now=60.0, quiet_period=30.0)
+
+    assert ready == [Path('/downloads/a'), Path('/downloads/b')]
+    assert pending == {Path('/downloads/busy'): 50.0}
+
+def test_changed_torrents_processed_without_ledger_skip(mocker, tmp_path):
+    mocker.patch.object(TorrentManager, '_begin_run', return_value=0)
+    mocker.patch.object(TorrentManager, '_log_summary')
+    ledger = Mock()
+    mocker.patch.object(TorrentManager, '_get_run_ledger', return_value=ledger)
+    process = mocker.patch.object(TorrentManager, '_process_torrent_paths')
+    shutdown = mocker.patch.object(TorrentManager._move_scheduler, 'shutdown')
+    movie = tmp_path / 'Movie.2020.mkv'
+    movie.write_text('movie')
+
+    TorrentManager._process_changed([movie, tmp_path / 'Removed.2021.mkv'])
+
+    movie_stat = movie.stat()
+    process.assert_called_once_with([(movie, (movie_stat.st_ino, movie_stat.st_size, movie_stat.st_mtime_ns))], ledger)
+    ledger.get_fingerprints.assert_not_called()
+    # Copy threads stopped at the end of the run
+    shutdown.assert_called_once_with()
+
+def test_changed_fingerprint_same_as_scanned(mocker, tmp_path):
+    mocker.patch.object(TorrentManager, '_begin_run', return_value=0)
+    mocker.patch.object(TorrentManager, '_log_summary')
+    mocker.patch.object(TorrentManager, '_get_run_ledger', return_value=None)
+    mocker.patch.object(TorrentManager, '_torrent_path', tmp_path / 'downloads')
+    process = mocker.patch.object(TorrentManager, '_process_torrent_paths')
+    (tmp_path / 'downloads').mkdir()
+    (tmp_path / 'Movie.2020.mkv').write_text('movie')
+    # Torrent symlinked into the download path, and a dangling symlink
+    (tmp_path / 'downloads' / 'Movie.2020.mkv').symlink_to(tmp_path / 'Movie.2020.mkv')
+    (tmp_path / 'downloads' / 'Removed.2021.mkv').symlink_to(tmp_path / 'Removed.2021.mkv')
+    scanned = sorted(TorrentManager._scan_torrent_path())
+
+    TorrentManager._process_changed([path for path, _ in scanned])
+
+    assert process.call_args.args[0] == scanned
+    assert scanned[0][1] == TorrentManager._get_fingerprint(tmp_path / 'Movie.2020.mkv')
+    assert scanned[1][1] is None
+
+def test_torrents_added_during_initial_run_processed(mocker, tmp_path):
+    mocker.patch.object(TorrentManager, '_torrent_path', tmp_path)
+    mocker.patch('manager.torrent_manager.WATCH_QUIET_PERIOD', 0)
+    stop = Event()
+    movie = tmp_path / 'Movie.2020.mkv'
+    mocker.patch.object(TorrentManager, 'process_torrents', side_effect=lambda: movie.write_text('movie'))
+    process_changed = mocker.patch.object(TorrentManager, '_process_changed', side_effect=lambda paths: stop.set())
+    # Stops waiting if the new torrent is never reported
+    timeout = Timer(5, stop.set)
+    timeout.start()
+
+    TorrentManager.watch(stop)
+    timeout.cancel()
+
+    process_changed.assert_called_once_with([movie])
@@ -1,24 +1,113 @@
 from __future__ import annotations
+import sys
+import weakref
 from pathlib import Path
+from typing import Iterator
+from extractor.base_extractor import BaseExtractor
 from extractor.media_extractor import MediaExtractor
 from extractor.path_extractor import PathExtractor
 from models.path_metadata import PathMetadata
 from models.media_metadata import MediaMetadata
+from models.child_stats import ChildStats
 from config.types import NodeType
 
+
+class _DictBacked:
+    """
+    Instance layout of an object without __slots__, used to estimate the memory saved by slots
+    """
+
+
 class Node:
-    original_path: Path = Path('/') # Path to original file
-    new_path: Path = Path('/') # Path to original file
+    __slots__ = (
+        'original_path',
+        'new_path',
+        'media_metadata',
+        'path_metadata',
+        '_parent_ref',
+        'children_nodes',
+        'child_stats',
+        'classification',
+        '__weakref__',
+    )
+
+    original_path: Path # Path to original file
+    new_path: Path # Path to original file
 
     media_metadata: MediaMetadata # Metadata regarding media
     path_metadata: PathMetadata # Metadata regarding file
 
-    parent_node: Node | None = None # Parent node
-    children_nodes: list[Node] = [] # Children nodes
+    _parent_ref: weakref.ref[Node] | None # Weak reference to parent node, see parent_node
+    children_nodes: list[Node] # Children nodes
+    child_stats: ChildStats | None # Counts of children by type, see get_child_stats
 
-    classification: NodeType = 'UNKNOWN' # Classification of node (file or directory type)
+    classification: NodeType # Classification of node (file or directory type)
 
-    def __init__(self, path: Path = Path('/')) -> None:
+    def __init__(
+        self,
+        path: Path = Path('/'),
+        media_metadata: MediaMetadata | None = None,
+        path_metadata: PathMetadata | None = None,
+    ) -> None:
         self.original_path = path
-        self.media_metadata = MediaExtractor.extract_metadata(path)
-        self.path_metadata = PathExtractor.extract_metadata(path)
+        self.new_path = Path('/')
+        self._parent_ref = None
+        self.children_nodes = []
+        self.child_stats = None
+        self.classification = 'UNKNOWN'
+
+        # Metadata may be extracted beforehand in a batch (see Parser)
+        if media_metadata and path_metadata:
+            self.media_metadata = media_metadata
+            self.path_metadata = path_metadata
+            return
+
+        # Name is sanitized and its extension detected once, for both extractors
+        name = BaseExtractor.sanitize(path)
+        self.media_metadata = media_metadata or MediaExtractor.extract_metadata(path, name)
+        self.path_metadata = path_metadata or PathExtractor.extract_metadata(path, name)
+
+    @property
+    def parent_node(self) -> Node | None:
+        return self._parent_ref() if self._parent_ref else None
+
+    @parent_node.setter
+    def parent_node(self, node: Node | None) -> None:
+        # Parent is referenced weakly, so a tree has no reference cycles and is freed by reference
+        # counting as soon as its head node is released, without waiting for the cyclic GC
+        self._parent_ref = weakref.ref(node) if node else None
+
+    def get_child_stats(self) -> ChildStats:
+        """
+        Returns counts of children by type, computed by Parser once children are final,
+        or on first use for trees built elsewhere
+        """
+        if self.child_stats is None:
+            self.child_stats = ChildStats.from_children(self.children_nodes)
+        return self.child_stats
+
+    def iter_tree(self) -> Iterator[Node]:
+        """
+        Yields node and all of its descendants in pre-order, without recursion
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children_nodes))
+
+    def get_memory_size(self) -> tuple[int, int]:
+        """
+        Returns:
+            (size, estimated dict-backed size) in bytes of node and its metadata objects, the estimate is the size of
+            an empty object without __slots__ plus a dict of the same fields, not a measurement of such objects
+        """
+        size = 0
+        dict_backed_size = 0
+
+        for obj in (self, self.media_metadata, self.path_metadata):
+            fields = [name for cls in type(obj).__mro__ for name in getattr(cls, '__slots__', ())]
+            size += sys.getsizeof(obj)
+            dict_backed_size += sys.getsizeof(_DictBacked()) + sys.getsizeof(dict.fromkeys(fields))
+
+        return size, dict_backed_size
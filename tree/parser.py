@@ -1,9 +1,58 @@
-from os import walk
+from os import walk, scandir, stat
 from os.path import join
 from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
 from tree.node import Node
+from models.child_stats import ChildStats
+from models.run_stats import RunStats
+from tree.snapshot import ParserSnapshot, SnapshotEntry
+from extractor.base_extractor import BaseExtractor
+from extractor.media_extractor import MediaExtractor
+from extractor.path_extractor import PathExtractor
+from config.settings import PARSER_MODE, PARSER_WALK_WORKERS, PARSER_WALK_TORRENT_CAP, PARSER_SNAPSHOTS, MANAGER_PATH
+
+# Directory listing: (mtime_ns or None if not snapshotted, snapshot listing if unchanged, scanned entries otherwise)
+Listing = tuple[int | None, list[SnapshotEntry] | None, list[tuple[Path, bool, bool]]]
 
 class Parser:
+
+    # Thread pool shared by all torrents for listing directories in threaded mode
+    _walk_pool: ThreadPoolExecutor | None = None
+    _walk_pool_lock = Lock()
+
+    # Snapshots of parsed torrents, see ParserSnapshot
+    _snapshot_dir = Path(MANAGER_PATH) / 'snapshots'
+    snapshot_stats = RunStats('dirs_reused', 'dirs_listed', 'entries_reused', 'entries_extracted')
+
+    @classmethod
+    def parse(cls, path: Path) -> Node | None:
+        """
+        Parses node tree of path with the parser mode set in settings.
+        With PARSER_SNAPSHOTS, directories unchanged since the torrent's last snapshot are not listed or
+        extracted again, and entries still listed keep their metadata.
+        """
+        if PARSER_MODE == 'walk':
+            return cls.process_nodes(None, path)
+
+        previous = current = None
+        if PARSER_SNAPSHOTS:
+            previous = ParserSnapshot.load(cls._snapshot_dir, path)
+            current = ParserSnapshot(path)
+
+        if PARSER_MODE == 'threaded':
+            node = cls.process_nodes_threaded(path, previous, current)
+        else:
+            node = cls.process_nodes_scandir(path, previous, current)
+
+        if current is not None and current.directories:
+            try:
+                current.save(cls._snapshot_dir)
+            except OSError:
+                # Snapshot is only a cache, torrent is parsed from scratch next time
+                pass
+        return node
+
     @classmethod
     def process_nodes(cls, node: Node | None, path: Path) -> Node | None:
         # If current node DNE, create head node
@@ -19,14 +68,20 @@ class Parser:
         # Parse children nodes and add them to parent node 
         children_nodes = []
         
-        for file in filenames:
-            file_path = Path(join(root, file))
-            child_node = Node(file_path)
+        # Extract metadata of all files in directory as one batch
+        file_paths = [Path(join(root, file)) for file in filenames]
+        names = [BaseExtractor.sanitize(file_path) for file_path in file_paths]
+        media_metadata = MediaExtractor.extract_many(file_paths, names)
+        path_metadata = PathExtractor.extract_many(file_paths, names)
+
+        for i, file_path in enumerate(file_paths):
+            child_node = Node(file_path, media_metadata[i], path_metadata[i])
             
             # Only append file to child nodes if recognized file format
             if child_node.path_metadata.format_type != 'UNKNOWN':
                 child_node.parent_node = node
                 children_nodes.append(child_node)
+        num_filtered = len(filenames) - len(children_nodes)
         
         for dir in dirnames:
             dir_path = Path(join(root, dir)) 
@@ -39,6 +94,285 @@ class Parser:
             if processed_child and processed_child.children_nodes:
                 processed_child.parent_node = node
                 children_nodes.append(processed_child)
+            else:
+                num_filtered += 1
         
         node.children_nodes = children_nodes
+        node.child_stats = ChildStats.from_children(children_nodes, num_filtered)
+        return node
+
+    @classmethod
+    def process_nodes_scandir(cls, path: Path, previous: ParserSnapshot | None = None, current: ParserSnapshot | None = None) -> Node | None:
+        """
+        Builds the same node tree as process_nodes, reading file types from os.scandir entries
+        instead of stat'ing every path, and traversing with an explicit stack instead of recursion
+        Parameters:
+            - previous: snapshot of the last parse of path, unchanged directories are reused from it
+            - current: snapshot the listings of this parse are recorded in
+        """
+        node = Node(path)
+
+        # only return files if known file ext
+        if node.path_metadata.is_file:
+            return node if node.path_metadata.format_type != 'UNKNOWN' else None
+
+        # Directories in pre-order, so reversed order visits children before their parents
+        dir_nodes = []
+        stack = [node]
+
+        while stack:
+            dir_node = stack.pop()
+            dir_nodes.append(dir_node)
+
+            listing = cls._list_directory(dir_node.original_path, previous)
+            file_nodes, child_dir_nodes = cls._build_child_nodes(dir_node.original_path, listing, previous, current)
+            dir_node.children_nodes = file_nodes + child_dir_nodes
+
+            # Reversed so directories are popped in listing order
+            stack.extend(reversed(child_dir_nodes))
+
+        cls._filter_children(dir_nodes)
+        return node
+
+    @classmethod
+    def process_nodes_threaded(cls, path: Path, previous: ParserSnapshot | None = None, current: ParserSnapshot | None = None) -> Node | None:
+        """
+        Builds the same node tree as process_nodes, listing all directories of a tree level
+        concurrently, for storage where each listing is a slow round-trip (NFS/SMB).
+        At most PARSER_WALK_TORRENT_CAP listings of one torrent are in flight at a time.
+        Parameters:
+            - previous, current: snapshots, see process_nodes_scandir
+        """
+        node = Node(path)
+
+        # only return files if known file ext
+        if node.path_metadata.is_file:
+            return node if node.path_metadata.format_type != 'UNKNOWN' else None
+
+        # Directories in level order, so reversed order visits children before their parents
+        dir_nodes = []
+        level = [node]
+
+        while level:
+            dir_nodes.extend(level)
+            listings = cls._scan_directories([dir_node.original_path for dir_node in level], previous)
+
+            # Nodes are assembled in listing order regardless of which listing finished first
+            next_level = []
+            for dir_node, listing in zip(level, listings):
+                file_nodes, child_dir_nodes = cls._build_child_nodes(dir_node.original_path, listing, previous, current)
+                dir_node.children_nodes = file_nodes + child_dir_nodes
+                next_level.extend(child_dir_nodes)
+            level = next_level
+
+        cls._filter_children(dir_nodes)
         return node
+
+    @classmethod
+    def parse_file_list(cls, path: Path, files: list[Path]) -> Node | None:
+        """
+        Builds the node tree path will have on disk from the paths of its files (e.g. a torrent's metainfo),
+        without touching the filesystem, directories are implied by the file paths.
+        Entries not in files may still exist on disk, so dropped entries of directories are unknown
+        (num_filtered is None) and their moves are never coalesced into renames.
+        """
+        is_file = files == [path]
+        [node] = cls._extract_nodes([(path, not is_file, is_file)])
+
+        # only return files if known file ext
+        if is_file:
+            return node if node.path_metadata.format_type != 'UNKNOWN' else None
+
+        # Directory -> names of its entries (True if directory), in file list order
+        listings: dict[Path, dict[str, bool]] = {}
+        for file in files:
+            parts = file.relative_to(path).parts
+            for depth, name in enumerate(parts):
+                entries = listings.setdefault(path.joinpath(*parts[:depth]), {})
+                entries[name] = entries.get(name, False) or depth < len(parts) - 1
+
+        # Directories in pre-order, so reversed order visits children before their parents
+        dir_nodes = []
+        stack = [node]
+
+        while stack:
+            dir_node = stack.pop()
+            dir_nodes.append(dir_node)
+
+            entries = listings.get(dir_node.original_path, {})
+            # Files first like os.walk
+            children_nodes = cls._extract_nodes(
+                [(dir_node.original_path / name, False, True) for name, is_dir in entries.items() if not is_dir] +
+                [(dir_node.original_path / name, True, False) for name, is_dir in entries.items() if is_dir]
+            )
+            dir_node.children_nodes = children_nodes
+
+            # Reversed so directories are popped in file list order
+            stack.extend(reversed([child_node for child_node in children_nodes if child_node.path_metadata.is_dir]))
+
+        cls._filter_children(dir_nodes)
+        for dir_node in dir_nodes:
+            dir_node.get_child_stats().num_filtered = None
+        return node
+
+    @classmethod
+    def _get_walk_pool(cls) -> ThreadPoolExecutor:
+        with cls._walk_pool_lock:
+            if cls._walk_pool is None:
+                cls._walk_pool = ThreadPoolExecutor(max_workers=max(1, PARSER_WALK_WORKERS), thread_name_prefix='parser-walk')
+            return cls._walk_pool
+
+    @classmethod
+    def _scan_directories(cls, paths: list[Path], previous: ParserSnapshot | None = None) -> list[Listing]:
+        """
+        Lists directories on the shared walk pool, see _list_directory
+        Returns:
+            listing of each path, in the same order as paths
+        """
+        pool = cls._get_walk_pool()
+        in_flight = BoundedSemaphore(max(1, PARSER_WALK_TORRENT_CAP))
+        futures: list[Future] = []
+
+        for path in paths:
+            in_flight.acquire()
+            future = pool.submit(cls._list_directory, path, previous)
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append(future)
+
+        return [future.result() for future in futures]
+
+    @classmethod
+    def _filter_children(cls, dir_nodes: list[Node]) -> None:
+        """
+        Only keeps files with recognized format and directories with children (contains known files),
+        then counts the kept and dropped children, children are counted before their parents
+        Parameters:
+            - dir_nodes: directory nodes ordered so that children come after their parents
+        """
+        for dir_node in reversed(dir_nodes):
+            children_nodes = []
+            for child_node in dir_node.children_nodes:
+                if child_node.path_metadata.is_dir and not child_node.children_nodes:
+                    continue
+                if not child_node.path_metadata.is_dir and child_node.path_metadata.format_type == 'UNKNOWN':
+                    continue
+                child_node.parent_node = dir_node
+                children_nodes.append(child_node)
+            num_filtered = len(dir_node.children_nodes) - len(children_nodes)
+            dir_node.children_nodes = children_nodes
+            dir_node.child_stats = ChildStats.from_children(children_nodes, num_filtered)
+
+    @classmethod
+    def _list_directory(cls, path: Path, previous: ParserSnapshot | None = None) -> Listing:
+        """
+        Lists directory, or reuses its listing from previous snapshot if directory is unchanged
+        (only I/O, so listings can run on the walk pool)
+        """
+        if previous is None:
+            return None, None, cls._scan_directory(path)
+
+        # mtime is read before listing, a change during the listing is picked up by the next parse
+        mtime_ns = stat(path).st_mtime_ns
+        cached = previous.get_listing(path, mtime_ns)
+        if cached is not None:
+            return mtime_ns, cached, []
+        return mtime_ns, None, cls._scan_directory(path)
+
+    @classmethod
+    def _build_child_nodes(
+        cls,
+        path: Path,
+        listing: Listing,
+        previous: ParserSnapshot | None,
+        current: ParserSnapshot | None,
+    ) -> tuple[list[Node], list[Node]]:
+        """
+        Creates child nodes of directory path from its listing, metadata is only extracted for entries
+        not in previous snapshot, listing is recorded in current snapshot
+        Returns:
+            (file nodes, directory nodes), see _create_child_nodes
+        """
+        mtime_ns, cached, entries = listing
+
+        if cached is not None:
+            cls.snapshot_stats.increment('dirs_reused')
+            cls.snapshot_stats.increment('entries_reused', len(cached))
+            nodes = [Node(path / name, media_metadata, path_metadata) for name, _, _, media_metadata, path_metadata in cached]
+            num_files = sum(1 for _, is_dir, _, _, _ in cached if not is_dir)
+            file_nodes, dir_nodes = nodes[:num_files], nodes[num_files:]
+        else:
+            file_nodes, dir_nodes = cls._create_child_nodes(entries, previous.get_entries(path) if previous else None)
+
+        if current is not None and mtime_ns is not None:
+            current.put(path, mtime_ns, cached if cached is not None else [
+                (node.original_path.name, bool(node.path_metadata.is_dir), bool(node.path_metadata.is_file), node.media_metadata, node.path_metadata)
+                for node in file_nodes + dir_nodes
+            ])
+        return file_nodes, dir_nodes
+
+    @classmethod
+    def _scan_directory(cls, path: Path) -> list[tuple[Path, bool, bool]]:
+        """
+        Lists directory once, file types come from the directory entries (symlinks are followed like os.walk)
+        Returns:
+            list of (path, is_dir, is_file) in listing order
+        """
+        entries = []
+        with scandir(path) as iterator:
+            for entry in iterator:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                try:
+                    is_file = entry.is_file()
+                except OSError:
+                    is_file = False
+                entries.append((Path(entry.path), is_dir, is_file))
+
+        return entries
+
+    @classmethod
+    def _create_child_nodes(
+        cls,
+        entries: list[tuple[Path, bool, bool]],
+        known: dict[tuple[str, bool, bool], SnapshotEntry] | None = None,
+    ) -> tuple[list[Node], list[Node]]:
+        """
+        Creates file and directory nodes of listed entries, extracting metadata as one batch
+        Parameters:
+            - known: snapshot entries by (name, is_dir, is_file), their metadata is reused instead of extracted
+        Returns:
+            (file nodes, directory nodes), both in listing order, files first like os.walk
+        """
+        # Same split as os.walk, everything that is not a directory is listed as a file
+        ordered_entries = [entry for entry in entries if not entry[1]] + [entry for entry in entries if entry[1]]
+        num_files = sum(1 for entry in entries if not entry[1])
+
+        known = known or {}
+        reused = [known.get((entry_path.name, is_dir, is_file)) for entry_path, is_dir, is_file in ordered_entries]
+        new_entries = [entry for entry, snapshot_entry in zip(ordered_entries, reused) if snapshot_entry is None]
+
+        new_nodes = iter(cls._extract_nodes(new_entries))
+
+        cls.snapshot_stats.increment('dirs_listed')
+        cls.snapshot_stats.increment('entries_reused', len(ordered_entries) - len(new_entries))
+        cls.snapshot_stats.increment('entries_extracted', len(new_entries))
+
+        nodes = [
+            Node(entry_path, snapshot_entry[3], snapshot_entry[4]) if snapshot_entry is not None
+            else next(new_nodes)
+            for (entry_path, _, _), snapshot_entry in zip(ordered_entries, reused)
+        ]
+        return nodes[:num_files], nodes[num_files:]
+
+    @classmethod
+    def _extract_nodes(cls, entries: list[tuple[Path, bool, bool]]) -> list[Node]:
+        """
+        Creates nodes of (path, is_dir, is_file) entries, extracting metadata as one batch
+        """
+        paths = [entry_path for entry_path, _, _ in entries]
+        names = [BaseExtractor.sanitize(entry_path) for entry_path in paths]
+        media_metadata = MediaExtractor.extract_many(paths, names)
+        path_metadata = PathExtractor.extract_many(paths, names, [(is_dir, is_file) for _, is_dir, is_file in entries])
+        return [Node(entry_path, media, path) for entry_path, media, path in zip(paths, media_metadata, path_metadata)]
@@ -0,0 +1,99 @@
+import os
+import pickle
+import time
+from pathlib import Path
+from models.media_metadata import MediaMetadata
+from models.path_metadata import PathMetadata
+from storage.state_file import StateFile
+
+# (name, is_dir, is_file, media metadata, path metadata) of a listed directory entry, before filtering
+SnapshotEntry = tuple[str, bool, bool, MediaMetadata, PathMetadata]
+
+# Listings of directories modified this close to the snapshot are not trusted, a change within the
+# same mtime tick (coarse timestamps on some filesystems) would not change the directory's mtime
+_RACY_NS = 2 * 10**9
+
+
+class ParserSnapshot:
+    """
+    Listings and extracted metadata of every directory of a parsed torrent, keyed by directory mtime,
+    persisted between runs so unchanged directories are not listed or extracted again.
+    Metadata only depends on names and file types, which can only change by adding, removing or renaming
+    directory entries, all of which update the directory's mtime.
+    """
+
+    def __init__(self, root: Path, created_ns: int = 0) -> None:
+        self.root = root
+        self.created_ns = created_ns # When the snapshot was taken, listings as recent as this are racy
+        # Directory path relative to root -> (mtime_ns, entries)
+        self.directories: dict[str, tuple[int, list[SnapshotEntry]]] = {}
+
+    @classmethod
+    def load(cls, snapshot_dir: Path, root: Path) -> 'ParserSnapshot':
+        """
+        Returns saved snapshot of root, empty snapshot if none saved or unreadable
+        """
+        try:
+            with open(cls.get_path(snapshot_dir, root), 'rb') as file:
+                snapshot = pickle.load(file)
+            if isinstance(snapshot, cls) and snapshot.root == root:
+                return snapshot
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Stale format or truncated file, parsed from scratch and overwritten
+            pass
+        return cls(root)
+
+    @classmethod
+    def get_path(cls, snapshot_dir: Path, root: Path) -> Path:
+        return snapshot_dir / (StateFile.get_key(root) + '.pickle')
+
+    def get_listing(self, path: Path, mtime_ns: int) -> list[SnapshotEntry] | None:
+        """
+        Returns snapshot listing of directory, None if directory was modified since (or too close to) the snapshot
+        """
+        cached = self.directories.get(self._key(path))
+        if cached is None or cached[0] != mtime_ns or mtime_ns >= self.created_ns - _RACY_NS:
+            return None
+        return cached[1]
+
+    def get_entries(self, path: Path) -> dict[tuple[str, bool, bool], SnapshotEntry]:
+        """
+        Returns snapshot entries of directory by (name, is_dir, is_file), regardless of mtime,
+        entries still listed with the same name and type keep their metadata
+        """
+        cached = self.directories.get(self._key(path))
+        return {(entry[0], entry[1], entry[2]): entry for entry in cached[1]} if cached else {}
+
+    def put(self, path: Path, mtime_ns: int, entries: list[SnapshotEntry]) -> None:
+        self.directories[self._key(path)] = (mtime_ns, entries)
+
+    def save(self, snapshot_dir: Path) -> None:
+        """
+        Saves snapshot, replacing the previous one of its root
+        """
+        self.created_ns = time.time_ns()
+        StateFile.write(self.get_path(snapshot_dir, self.root), pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @classmethod
+    def prune(cls, snapshot_dir: Path, roots: list[Path]) -> int:
+        """
+        Removes snapshots of torrents other than roots
+        Returns:
+            number of snapshots removed
+        """
+        keep = {cls.get_path(snapshot_dir, root).name for root in roots}
+        removed = 0
+        try:
+            with os.scandir(snapshot_dir) as iterator:
+                for entry in iterator:
+                    if entry.name not in keep:
+                        os.unlink(entry.path)
+                        removed += 1
+        except FileNotFoundError:
+            pass
+        return removed
+
+    def _key(self, path: Path) -> str:
+        return str(path.relative_to(self.root))